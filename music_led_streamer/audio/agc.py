@@ -0,0 +1,45 @@
+import numpy as np
+
+AGC_WINDOW = 10  # Seconds of history behind the reference levels
+AGC_PERCENTILE = 95  # Percentile of the history that normalizes to 1
+AGC_UPDATE_INTERVAL = 8  # Analysis frames between reference level updates
+
+
+class GainControl:
+    """Automatic gain control by streaming percentile normalization.
+
+    The last AGC_WINDOW seconds of each feature are kept in a preallocated
+    history. Every few frames the reference level of each feature is updated
+    to its AGC_PERCENTILE percentile with a single partial sort, and the
+    features are divided by their reference and clipped to 0-1. A loud
+    transient only raises the reference for as long as it is in the window,
+    and quiet passages are brought back up once it has passed.
+    """
+
+    def __init__(self, floors, frame_rate, window=AGC_WINDOW, percentile=AGC_PERCENTILE,
+                 update_interval=AGC_UPDATE_INTERVAL):
+        # Reference levels never drop below the floors, so silence is not amplified
+        self.floors = np.asarray(floors, dtype=float)
+        self.history = np.zeros((max(1, int(window * frame_rate)), len(self.floors)))
+        self.scratch = np.empty_like(self.history)
+        self.percentile = percentile
+        self.update_interval = update_interval
+        self.references = self.floors.copy()
+        self.normalized = np.zeros(len(self.floors))
+        self.count = 0  # Frames seen
+
+    def update(self, values):
+        """Add the features of the next frame and return them normalized to 0-1."""
+        self.history[self.count % len(self.history)] = values
+        self.count += 1
+
+        if self.count % self.update_interval == 0:
+            # Only the part of the history that has been filled
+            filled = self.scratch[:min(self.count, len(self.history))]
+            np.copyto(filled, self.history[:len(filled)])
+            rank = int(round(self.percentile / 100 * (len(filled) - 1)))
+            filled.partition(rank, axis=0)
+            np.maximum(filled[rank], self.floors, out=self.references)
+
+        np.divide(values, self.references, out=self.normalized)
+        return np.clip(self.normalized, 0, 1, out=self.normalized)
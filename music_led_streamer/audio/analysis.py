@@ -0,0 +1,206 @@
+import numpy as np
+from music_led_streamer.audio.agc import GainControl
+from music_led_streamer.audio.beat import BeatTracker
+from music_led_streamer.audio.decimation import Decimator
+from music_led_streamer.audio.bands import get_band_mapper, band_edges, DEFAULT_LAYOUT
+from music_led_streamer.audio.frame import DEFAULT_NUM_BANDS, MIN_DOMINANT_FREQUENCY
+from music_led_streamer.audio.pitch import get_pitch_estimator
+from music_led_streamer.audio.stft import StftBuffer, get_window, DEFAULT_WINDOW, REFERENCE_FFT_SIZE
+
+# Frequency ranges shared by every show (Hz)
+# Bass (20-250 Hz), Midrange (250-4000 Hz), Treble (4000-20000 Hz)
+RANGE_EDGES = (20, 250, 4000, np.inf)
+
+SMOOTHING_FACTOR = 0.2  # Weight of the newest block in the smoothed features
+
+# Lowest reference levels of the volume, bass, midrange and treble normalization
+NORMALIZATION_FLOORS = (0.001, 0.1, 0.05, 0.01)
+
+# The bass range and the bands below it come from a long FFT of decimated audio
+BASS_DECIMATION = 8  # Decimation factor of the bass analysis, 1 disables it
+BASS_FFT_SIZE = 1024  # FFT size of the bass analysis, at the decimated samplerate
+BASS_CUTOFF = RANGE_EDGES[1]  # Bands entirely below this come from the bass FFT (Hz)
+
+
+class AudioAnalyzer:
+    """Computes the audio features of each analysis frame.
+
+    The analyzer is shared by all shows so the FFT and the derived features are
+    only computed once per frame, whichever show is reading them. Frames of
+    fft_size samples are taken every hop_size samples from a rolling buffer,
+    so the frequency resolution does not depend on the audio blocksize.
+
+    The bass is analyzed at a higher resolution: the audio is low-pass
+    filtered and decimated, and a long FFT of the decimated stream gives the
+    bass range and the bands below BASS_CUTOFF. This costs far less than a
+    full rate FFT of the same length, and treble keeps the short window.
+
+    Every channel is analyzed by one batched FFT. The mono features come from
+    the mid (average) signal, and the per-channel bands and stereo features
+    let shows react to the left and right channels separately.
+
+    The pitch is estimated from the harmonics of the mid spectrum, so it
+    follows the note being played rather than its loudest (often bass) bin.
+    """
+
+    def __init__(self, samplerate, channels=1, num_bands=DEFAULT_NUM_BANDS,
+                 fft_size=REFERENCE_FFT_SIZE, hop_size=None, window=DEFAULT_WINDOW,
+                 bass_decimation=BASS_DECIMATION):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.window_name = window
+        self.stft = StftBuffer(fft_size, hop_size or fft_size, channels)
+        self.beats = BeatTracker(num_bands, samplerate / self.stft.hop_size)
+        self.gain = GainControl(NORMALIZATION_FLOORS, samplerate / self.stft.hop_size)
+        self.levels = np.zeros(len(NORMALIZATION_FLOORS))
+
+        self.decimator = None
+        if bass_decimation > 1:
+            self.decimator = Decimator(bass_decimation, channels)
+            self.bass_samplerate = samplerate / bass_decimation
+            self.bass_buffer = StftBuffer(BASS_FFT_SIZE, BASS_FFT_SIZE, channels)
+            self.bass_window = get_window(window, BASS_FFT_SIZE)
+
+        self.fft_size = None
+        self.set_num_bands(num_bands)
+        self.set_fft_size(fft_size)
+
+    def set_num_bands(self, num_bands, layout=DEFAULT_LAYOUT):
+        """Change the number of bands and the band layout of the banded spectrum."""
+        self.num_bands = num_bands
+        self.layout = layout
+        self.band_frequencies = band_edges(num_bands, self.samplerate, layout)
+        self.beats.set_num_bands(num_bands)
+        self.reset()
+        if self.fft_size:
+            self.set_fft_size(self.fft_size)
+
+    def set_fft_size(self, fft_size):
+        """Look up the window and band mappers for a new FFT size."""
+        self.fft_size = fft_size
+        self.window = get_window(self.window_name, fft_size)
+        self.range_mapper = get_band_mapper(self.samplerate, fft_size, RANGE_EDGES)
+        self.pitch = get_pitch_estimator(self.samplerate, fft_size)
+
+        # Number of bands taken from the bass FFT
+        self.num_bass_bands = 0
+        if self.decimator:
+            self.num_bass_bands = int(np.searchsorted(self.band_frequencies[1:], BASS_CUTOFF, side="right"))
+            self.bass_range_mapper = get_band_mapper(self.bass_samplerate, BASS_FFT_SIZE, RANGE_EDGES[:2])
+            self.bass_band_mapper = get_band_mapper(
+                self.bass_samplerate, BASS_FFT_SIZE, self.band_frequencies[:self.num_bass_bands + 1], self.layout
+            )
+            # Band means of a tone shrink as the bins get narrower, scale each band as if it
+            # were the mean of the (at least one) full rate bins covering the same frequencies
+            resolution = (self.samplerate / fft_size) / (self.bass_samplerate / BASS_FFT_SIZE)
+            self.bass_range_level = np.minimum(resolution, np.maximum(self.bass_range_mapper.counts, 1))
+            self.bass_band_level = np.minimum(resolution, np.maximum(self.bass_band_mapper.counts, 1))
+
+        self.band_mapper = get_band_mapper(
+            self.samplerate, fft_size, self.band_frequencies[self.num_bass_bands:], self.layout
+        )
+
+    def reset(self):
+        """Forget the smoothed feature history."""
+        self.smoothed_ranges = np.zeros(3)
+        # Row 0 is the mid signal, followed by one row per channel
+        self.smoothed_bands = np.zeros((1 + self.channels, self.num_bands))
+
+    def push(self, block):
+        """Add a block of audio, yielding the block offset of each analysis frame that is ready."""
+        start = 0
+        for offset in self.stft.push(block):
+            self.push_bass(block[start:offset])
+            start = offset
+            yield offset
+        self.push_bass(block[start:])
+
+    def push_bass(self, chunk):
+        """Decimate samples into the bass analysis buffer."""
+        if self.decimator and len(chunk):
+            self.bass_buffer.append(self.decimator.process(chunk))
+
+    def process(self, samples, frame):
+        """Analyze one frame of audio samples and write the features into frame."""
+        if len(samples) != self.fft_size:
+            self.set_fft_size(len(samples))
+
+        # Calculate the volume
+        frame.volume = np.linalg.norm(samples) / np.sqrt(samples.size)
+        frame.mid_energy, frame.side_energy, frame.correlation, frame.balance = stereo_features(samples)
+
+        # Windowed FFT of every channel, row 0 is the mid (mono) spectrum
+        fft_data = magnitude_spectra(samples, self.window)
+
+        ranges = self.range_mapper.apply(fft_data[0], fill_empty=False)
+        if self.decimator:
+            bass_data = magnitude_spectra(self.bass_buffer.samples, self.bass_window)
+            ranges[0] = self.bass_range_mapper.apply(bass_data[0], fill_empty=False)[0] * self.bass_range_level[0]
+        frame.bass, frame.midrange, frame.treble = ranges
+
+        # Levels normalized against their recent loudness
+        self.levels[0] = frame.volume
+        self.levels[1:] = ranges
+        frame.volume_norm, frame.bass_norm, frame.midrange_norm, frame.treble_norm = self.gain.update(self.levels)
+
+        # Find the dominant frequency
+        frame.dominant_frequency = max(MIN_DOMINANT_FREQUENCY, self.range_mapper.freqs[np.argmax(fft_data[0])])
+        # The pitch of the note, from the harmonics in the same spectrum
+        frame.pitch_hz, frame.pitch_confidence = self.pitch.estimate(fft_data[0])
+
+        # Apply exponential moving average for smooth transitions
+        self.smoothed_ranges = SMOOTHING_FACTOR * ranges + (1 - SMOOTHING_FACTOR) * self.smoothed_ranges
+        frame.smoothed_bass, frame.smoothed_midrange, frame.smoothed_treble = self.smoothed_ranges
+
+        # Frequency band amplitudes of the mid signal and each channel,
+        # with empty bands interpolated from their neighbors
+        band_amplitudes = self.band_mapper.apply(fft_data)
+        if self.num_bass_bands:
+            bass_bands = self.bass_band_mapper.apply(bass_data) * self.bass_band_level
+            band_amplitudes = np.concatenate((bass_bands, band_amplitudes), axis=-1)
+        # Onsets and tempo, from the unsmoothed mid spectrum
+        frame.beat, frame.onset_strength = self.beats.update(band_amplitudes[0])
+        frame.beat_count = self.beats.beat_count
+        frame.bpm = self.beats.bpm()
+        frame.beat_phase = self.beats.phase()
+
+        self.smoothed_bands = SMOOTHING_FACTOR * band_amplitudes + (1 - SMOOTHING_FACTOR) * self.smoothed_bands
+        frame.set_band_amplitudes(self.smoothed_bands[0])
+        frame.set_channel_band_amplitudes(self.smoothed_bands[1:])
+        return frame
+
+
+def magnitude_spectra(samples, window):
+    """Return the magnitude spectrum of the mid signal followed by that of each channel.
+
+    All channels are transformed by a single rfft call, the mid spectrum is the
+    mean of the channel spectra.
+    """
+    spectra = np.fft.rfft(samples * window[:, np.newaxis], axis=0).T
+    return np.abs(np.vstack((spectra.mean(axis=0), spectra)))
+
+def stereo_features(samples):
+    """Return the mid and side RMS levels, the L/R correlation and the L/R balance.
+
+    Correlation is 1 for mono, 0 for unrelated and -1 for out of phase channels.
+    Balance is -1 for left only, 0 for centered and 1 for right only audio.
+    Single channel audio is treated as centered mono.
+    """
+    left = samples[:, 0]
+    right = samples[:, min(1, samples.shape[1] - 1)]
+
+    mid_energy = np.sqrt(np.mean(((left + right) / 2) ** 2))
+    side_energy = np.sqrt(np.mean(((left - right) / 2) ** 2))
+
+    left_power = np.dot(left, left)
+    right_power = np.dot(right, right)
+    correlation = 0.0
+    if left_power > 0 and right_power > 0:
+        correlation = np.dot(left, right) / np.sqrt(left_power * right_power)
+
+    left_level = np.sqrt(left_power)
+    right_level = np.sqrt(right_power)
+    balance = 0.0
+    if left_level + right_level > 0:
+        balance = (right_level - left_level) / (right_level + left_level)
+    return mid_energy, side_energy, correlation, balance
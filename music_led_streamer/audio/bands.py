@@ -0,0 +1,165 @@
+import functools
+import numpy as np
+
+LOWEST_FREQUENCY = 20  # Lower edge of the first band (Hz)
+
+# Band layouts of the banded spectrum:
+# geometric - geometrically spaced bands with hard edges
+# mel - mel spaced bands with overlapping triangular weights
+# constant_q - geometrically spaced bands with overlapping triangular weights (constant Q)
+LAYOUTS = ("geometric", "mel", "constant_q")
+DEFAULT_LAYOUT = "geometric"
+
+
+class BandMapper:
+    """Maps the bins of an rfft spectrum onto frequency bands.
+
+    The bin index tables are built once per (samplerate, FFT size, band edges),
+    so turning a spectrum into band means is a single vectorized reduction.
+    Bands are half open, a bin belongs to a band when lower <= freq < upper.
+    """
+
+    def __init__(self, samplerate, fft_size, band_edges):
+        self.samplerate = samplerate
+        self.fft_size = fft_size
+        self.band_edges = np.asarray(band_edges, dtype=float)
+        self.num_bands = len(self.band_edges) - 1
+        self.freqs = np.fft.rfftfreq(fft_size, 1 / samplerate)
+
+        # Bins are sorted by frequency, so every band is a contiguous run of bins
+        bounds = np.searchsorted(self.freqs, self.band_edges, side="left")
+        self.first_bin = bounds[0]
+        self.last_bin = bounds[-1]
+        self.counts = np.diff(bounds)
+
+        # Contiguous bands let reduceat sum every non-empty band in one call
+        self.filled = np.flatnonzero(self.counts > 0)
+        self.starts = bounds[self.filled] - self.first_bin
+        self.divisors = self.counts[self.filled]
+
+        # Empty bands between two non-empty bands are linearly interpolated
+        empty = np.flatnonzero(self.counts == 0)
+        if self.filled.size:
+            empty = empty[(empty > self.filled[0]) & (empty < self.filled[-1])]
+        else:
+            empty = empty[:0]
+        right = np.searchsorted(self.filled, empty)
+        self.empty = empty
+        self.left_neighbor = self.filled[right - 1]
+        self.right_neighbor = self.filled[right]
+        self.right_weight = (empty - self.left_neighbor) / (self.right_neighbor - self.left_neighbor)
+
+    def apply(self, spectrum, fill_empty=True):
+        """Return the mean of the spectrum in each band.
+
+        The spectrum may have leading dimensions (e.g. channels), the bins must
+        be on the last axis.
+        """
+        bands = np.zeros(spectrum.shape[:-1] + (self.num_bands,))
+        if self.filled.size == 0:
+            return bands
+
+        sums = np.add.reduceat(spectrum[..., self.first_bin:self.last_bin], self.starts, axis=-1)
+        bands[..., self.filled] = sums / self.divisors
+
+        if fill_empty and self.empty.size:
+            bands[..., self.empty] = (
+                bands[..., self.left_neighbor] * (1 - self.right_weight)
+                + bands[..., self.right_neighbor] * self.right_weight
+            )
+        return bands
+
+
+class Filterbank:
+    """Maps the bins of an rfft spectrum onto overlapping triangular bands.
+
+    The triangles are evenly spaced on a perceptual scale (mel or octaves).
+    Band i peaks halfway between band_edges[i] and band_edges[i + 1] on that
+    scale and falls to zero one band width either side, so neighboring bands
+    overlap. Bands narrower than a bin interpolate between the two bins
+    around their center.
+
+    The weights are precomputed as a dense matrix trimmed to the bins that
+    any band uses, so a band vector is a single matrix product.
+    """
+
+    def __init__(self, samplerate, fft_size, band_edges, layout):
+        self.samplerate = samplerate
+        self.fft_size = fft_size
+        self.band_edges = np.asarray(band_edges, dtype=float)
+        self.num_bands = len(self.band_edges) - 1
+        self.freqs = np.fft.rfftfreq(fft_size, 1 / samplerate)
+
+        to_scale = SCALES[layout][0]
+        edges = to_scale(self.band_edges)
+        centers = (edges[:-1] + edges[1:]) / 2
+        widths = np.diff(edges)
+        with np.errstate(divide="ignore"):
+            positions = to_scale(self.freqs)
+        weights = np.maximum(0, 1 - np.abs(positions - centers[:, np.newaxis]) / widths[:, np.newaxis])
+
+        # Bands that fall between two bins interpolate linearly between them
+        bin_spacing = samplerate / fft_size
+        for band in np.flatnonzero(weights.sum(axis=1) == 0):
+            position = SCALES[layout][1](centers[band]) / bin_spacing
+            lower = min(int(position), len(self.freqs) - 2)
+            weights[band, lower:lower + 2] = (lower + 1 - position, position - lower)
+
+        # Width of each band in bins, comparable with BandMapper.counts
+        self.counts = weights.sum(axis=1) / weights.max(axis=1)
+
+        # Weighted means, over the bins that are used
+        used = np.flatnonzero(weights.any(axis=0))
+        self.first_bin = used[0]
+        self.last_bin = used[-1] + 1
+        weights /= weights.sum(axis=1, keepdims=True)
+        self.weights = np.ascontiguousarray(weights[:, self.first_bin:self.last_bin].T)
+
+    def apply(self, spectrum, fill_empty=True):
+        """Return the weighted mean of the spectrum in each band.
+
+        The spectrum may have leading dimensions (e.g. channels), the bins must
+        be on the last axis. Triangular bands are never empty, so fill_empty
+        is only accepted for compatibility with BandMapper.
+        """
+        return spectrum[..., self.first_bin:self.last_bin] @ self.weights
+
+
+def hz_to_mel(frequency):
+    """Convert frequencies (Hz) to the mel scale."""
+    return 2595 * np.log10(1 + np.asarray(frequency) / 700)
+
+def mel_to_hz(mel):
+    """Convert mel values to frequencies (Hz)."""
+    return 700 * (10 ** (np.asarray(mel) / 2595) - 1)
+
+# Perceptual scales of the triangular layouts, as (from Hz, to Hz) conversions
+SCALES = {
+    "mel": (hz_to_mel, mel_to_hz),
+    "constant_q": (np.log2, np.exp2),
+}
+
+
+@functools.lru_cache(maxsize=32)
+def get_band_mapper(samplerate, fft_size, band_edges, layout=DEFAULT_LAYOUT):
+    """Return the (cached) band mapper for a samplerate, FFT size, band edges tuple and layout."""
+    if layout == "geometric":
+        return BandMapper(samplerate, fft_size, band_edges)
+    return Filterbank(samplerate, fft_size, band_edges, layout)
+
+def geometric_band_edges(num_bands, samplerate, lowest_frequency=LOWEST_FREQUENCY):
+    """Return num_bands + 1 geometrically spaced band edges up to the Nyquist frequency."""
+    return tuple(np.geomspace(lowest_frequency, samplerate / 2, num_bands + 1).tolist())
+
+def mel_band_edges(num_bands, samplerate, lowest_frequency=LOWEST_FREQUENCY):
+    """Return num_bands + 1 mel spaced band edges up to the Nyquist frequency."""
+    mels = np.linspace(hz_to_mel(lowest_frequency), hz_to_mel(samplerate / 2), num_bands + 1)
+    return tuple(mel_to_hz(mels).tolist())
+
+def band_edges(num_bands, samplerate, layout=DEFAULT_LAYOUT):
+    """Return the num_bands + 1 band edges of a layout."""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown band layout '{layout}', expected one of {', '.join(LAYOUTS)}")
+    if layout == "mel":
+        return mel_band_edges(num_bands, samplerate)
+    return geometric_band_edges(num_bands, samplerate)
@@ -0,0 +1,124 @@
+import numpy as np
+
+THRESHOLD_WINDOW = 1.0  # Seconds of spectral flux history behind the adaptive threshold
+THRESHOLD_DEVIATIONS = 1.5  # Onsets rise this many standard deviations above the mean flux
+MIN_ONSET_STRENGTH = 0.1  # Flux below this is never an onset (silence, noise)
+
+# Tempos are folded into one octave, so half and double time count as the same tempo
+MIN_BPM = 80
+MAX_BPM = 2 * MIN_BPM
+DEFAULT_BPM = 120
+TEMPO_DECAY = 0.9  # Weight kept by the tempo histogram each time an onset is added
+ONSET_HISTORY = 4  # Recent onsets whose intervals to a new onset are counted
+BEAT_GATE = 0.5  # Onsets closer than this fraction of a beat to the previous beat are not beats
+
+
+class BeatTracker:
+    """Streaming onset detection and tempo tracking.
+
+    Each analysis frame the positive spectral flux of the band spectrum is
+    compared with an adaptive threshold, the mean plus a few standard
+    deviations of the recent flux. The intervals between onsets vote in a
+    decaying histogram of beat periods, whose peak is the tempo.
+
+    All history lives in preallocated arrays, an update is O(bands) and the
+    tempo histogram is only touched when an onset is found.
+    """
+
+    def __init__(self, num_bands, frame_rate):
+        self.frame_rate = frame_rate  # Analysis frames per second
+
+        # Flux history, with running sums for the threshold
+        self.flux_history = np.zeros(max(2, int(THRESHOLD_WINDOW * frame_rate)))
+        self.flux_sum = 0.0
+        self.flux_squares = 0.0
+
+        # Candidate beat periods, in analysis frames
+        self.min_period = frame_rate * 60 / MAX_BPM
+        self.periods = np.arange(int(self.min_period), int(np.ceil(2 * self.min_period)) + 1)
+        self.tempo_histogram = np.zeros(len(self.periods))
+        self.period = frame_rate * 60 / DEFAULT_BPM
+
+        self.onsets = np.full(ONSET_HISTORY, -np.inf)  # Frame index of the recent onsets
+        self.onset_count = 0
+        self.position = 0  # Index of the latest analysis frame
+        self.last_beat = 0  # Frame index of the last beat
+        self.beat_count = 0
+        self.above_threshold = False  # The flux of the previous frame was above the threshold
+        self.set_num_bands(num_bands)
+
+    def set_num_bands(self, num_bands):
+        """Change the number of bands of the spectra passed to update."""
+        self.previous_bands = np.zeros(num_bands)
+        self.log_bands = np.zeros(num_bands)
+        self.rise = np.zeros(num_bands)
+
+    def update(self, band_amplitudes):
+        """Add the band spectrum of the next analysis frame.
+
+        Returns whether the frame is a beat and its onset strength, the
+        positive spectral flux of the log band amplitudes.
+        """
+        self.position += 1
+
+        # Positive spectral flux, only rising energy marks an onset
+        np.log1p(band_amplitudes, out=self.log_bands)
+        np.subtract(self.log_bands, self.previous_bands, out=self.rise)
+        onset_strength = float(np.maximum(self.rise, 0, out=self.rise).sum())
+        self.previous_bands, self.log_bands = self.log_bands, self.previous_bands
+
+        # Adaptive threshold from the flux of the last THRESHOLD_WINDOW seconds
+        size = len(self.flux_history)
+        mean = self.flux_sum / size
+        deviation = np.sqrt(max(0.0, self.flux_squares / size - mean * mean))
+        above_threshold = onset_strength > max(MIN_ONSET_STRENGTH, mean + THRESHOLD_DEVIATIONS * deviation)
+        self.record_flux(onset_strength)
+
+        # A long window sees the flux rise over several frames, only the first one is the onset
+        is_onset = above_threshold and not self.above_threshold
+        self.above_threshold = above_threshold
+
+        beat = False
+        if is_onset:
+            self.record_onset()
+            if self.position - self.last_beat >= BEAT_GATE * self.period:
+                beat = True
+                self.last_beat = self.position
+                self.beat_count += 1
+
+        return beat, onset_strength
+
+    def record_flux(self, flux):
+        """Replace the oldest flux in the history."""
+        index = self.position % len(self.flux_history)
+        oldest = self.flux_history[index]
+        self.flux_history[index] = flux
+        if index == 0:
+            # Recompute the sums once per window so rounding errors do not build up
+            self.flux_sum = self.flux_history.sum()
+            self.flux_squares = np.dot(self.flux_history, self.flux_history)
+        else:
+            self.flux_sum += flux - oldest
+            self.flux_squares += flux * flux - oldest * oldest
+
+    def record_onset(self):
+        """Vote for the beat periods between this onset and the recent ones."""
+        intervals = self.position - self.onsets
+        intervals = intervals[np.isfinite(intervals) & (intervals > 0)]
+        if intervals.size:
+            # Fold every interval into the [min_period, 2 * min_period) octave
+            octaves = np.floor(np.log2(intervals / self.min_period))
+            folded = np.rint(intervals / 2 ** octaves).astype(int) - self.periods[0]
+            self.tempo_histogram *= TEMPO_DECAY
+            np.add.at(self.tempo_histogram, np.clip(folded, 0, len(self.periods) - 1), 1)
+            self.period = self.periods[np.argmax(self.tempo_histogram)]
+        self.onsets[self.onset_count % ONSET_HISTORY] = self.position
+        self.onset_count += 1
+
+    def bpm(self):
+        """The current tempo estimate, in beats per minute."""
+        return 60 * self.frame_rate / self.period
+
+    def phase(self):
+        """Position within the current beat, 0 on the beat and rising towards 1."""
+        return (self.position - self.last_beat) / self.period % 1
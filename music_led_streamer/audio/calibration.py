@@ -0,0 +1,75 @@
+import itertools
+import time
+from music_led_streamer.audio.engine import AudioEngine
+from music_led_streamer.audio.source import DeviceSource
+
+# Stream settings tried by a calibration
+CALIBRATION_BLOCKSIZES = (256, 512, 1024, 2048)
+CALIBRATION_LATENCIES = (0.01, 0.05, 0.1)
+CALIBRATION_SECONDS = 3.0  # Seconds each combination is measured for
+
+# Settings are stable when they have no xruns and stay within these fractions of the block period
+MAX_STABLE_LOAD = 0.5  # Average callback plus analysis time
+MAX_STABLE_JITTER = 0.25  # Average callback arrival jitter
+
+
+def list_input_devices():
+    """Return (index, name, input channels, default samplerate) of every input device."""
+    import sounddevice as sd  # Only needed, and only installed with PortAudio, for live input
+
+    return [
+        (index, device["name"], device["max_input_channels"], device["default_samplerate"])
+        for index, device in enumerate(sd.query_devices())
+        if device["max_input_channels"] > 0
+    ]
+
+def default_input_device():
+    """Return the index of the default input device."""
+    import sounddevice as sd
+
+    return sd.default.device[0]
+
+def measure(source, seconds=CALIBRATION_SECONDS, analysis_worker=False):
+    """Analyze a source for a number of seconds and return the engine's AudioStats."""
+    engine = AudioEngine(source, analysis_worker=analysis_worker)
+    engine.start()
+    try:
+        time.sleep(seconds)
+    finally:
+        engine.stop()
+    return engine.stats
+
+def measure_settings(device_index, samplerate, channels, blocksizes=CALIBRATION_BLOCKSIZES,
+                     latencies=CALIBRATION_LATENCIES, seconds=CALIBRATION_SECONDS, analysis_worker=False):
+    """Measure an input device with every blocksize and latency, yielding (blocksize, latency, stats).
+
+    Combinations the device cannot open are reported and skipped.
+    """
+    for blocksize, latency in itertools.product(blocksizes, latencies):
+        source = DeviceSource(samplerate, channels, device_index, blocksize, latency)
+        try:
+            stats = measure(source, seconds, analysis_worker)
+        except Exception as e:
+            print(f"Could not open device {device_index} with blocksize {blocksize} and latency {latency} s: {e}")
+            continue
+        yield blocksize, latency, stats
+
+def is_stable(stats):
+    """Check that measured settings had no xruns and kept their timing within budget."""
+    period = stats.block_period()
+    return stats.xruns() == 0 and stats.load() < MAX_STABLE_LOAD and stats.jitter < MAX_STABLE_JITTER * period
+
+def best_settings(results):
+    """Return the (blocksize, latency) of the stable result with the least delay.
+
+    When no result is stable, the one with the fewest xruns and then the
+    lowest load is returned. results are (blocksize, latency, stats) tuples.
+    """
+    if not results:
+        return None
+    stable = [result for result in results if is_stable(result[2])]
+    if stable:
+        blocksize, latency, _ = min(stable, key=lambda result: result[2].block_period() + result[1])
+    else:
+        blocksize, latency, _ = min(results, key=lambda result: (result[2].xruns(), result[2].load()))
+    return blocksize, latency
@@ -0,0 +1,43 @@
+from functools import lru_cache
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_NUM_TAPS = 64  # Length of the anti-aliasing filter
+CUTOFF_RATIO = 0.8  # Filter cutoff as a fraction of the decimated Nyquist frequency
+
+
+@lru_cache(maxsize=8)
+def lowpass_taps(factor, num_taps=DEFAULT_NUM_TAPS):
+    """Return the windowed sinc low-pass filter used before decimating by factor."""
+    cutoff = CUTOFF_RATIO / factor  # Fraction of the input Nyquist frequency
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    taps = cutoff * np.sinc(cutoff * n) * np.blackman(num_taps)
+    taps /= taps.sum()  # Unity gain at DC
+    taps.flags.writeable = False
+    return taps
+
+
+class Decimator:
+    """Streaming FIR low-pass filter and decimator.
+
+    Only every factor-th output of the filter is computed. The last samples
+    of each block are kept, so blocks of any length can be pushed and the
+    output is the same as filtering one long stream.
+    """
+
+    def __init__(self, factor, channels, num_taps=DEFAULT_NUM_TAPS):
+        self.factor = factor
+        # Reversed, so each output is a dot product with a window of input samples
+        self.taps = lowpass_taps(factor, num_taps)[::-1].copy()
+        self.history = np.zeros((num_taps - 1, channels), dtype=np.float32)
+        self.phase = 0  # Index in the next block of the next sample to output
+
+    def process(self, block):
+        """Filter and decimate a block, returning the (possibly empty) decimated samples."""
+        data = np.concatenate((self.history, block))
+        self.history = data[len(data) - len(self.history):]
+
+        # windows[i] ends with block[i], keep the ones that line up with the output rate
+        windows = sliding_window_view(data, len(self.taps), axis=0)[self.phase::self.factor]
+        self.phase = (self.phase - len(block)) % self.factor
+        return windows @ self.taps
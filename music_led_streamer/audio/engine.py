@@ -0,0 +1,241 @@
+import time
+from music_led_streamer.audio.analysis import AudioAnalyzer
+from music_led_streamer.audio.bands import DEFAULT_LAYOUT
+from music_led_streamer.audio.frame import FeatureFrame, FrameBuffer, DEFAULT_NUM_BANDS
+from music_led_streamer.audio.latency import LatencyController
+from music_led_streamer.audio.recording import FeatureRecorder, ReplayEngine
+from music_led_streamer.audio.ring_buffer import RingBuffer
+from music_led_streamer.audio.source import create_source, DEFAULT_SOURCE
+from music_led_streamer.audio.stats import AudioStats
+from music_led_streamer.audio.stft import DEFAULT_WINDOW
+from music_led_streamer.audio.worker import AnalysisWorker
+
+DEFAULT_BLOCKSIZE = 1024  # Analysis block size when the stream uses variable blocks
+RING_BUFFER_BLOCKS = 16  # Capacity of the worker's ring buffer, in blocks
+
+
+class AudioEngine:
+    """Owns the audio source and publishes one FeatureFrame per analysis hop.
+
+    The source stays open for the lifetime of the engine, so shows can be
+    switched without closing and reopening the PortAudio stream.
+
+    By default each block is analyzed inside the audio callback. With
+    analysis_worker the callback only copies the samples into a ring buffer
+    and an AnalysisWorker thread does the spectral work, which keeps the
+    callback short enough for small block sizes.
+
+    With record_path every published frame is also appended to a feature
+    recording, which a ReplayEngine can play back without the analysis.
+
+    Input overflows, underflows and callback jitter are counted in the
+    stats. With adaptive_latency a LatencyController reopens the source with
+    a larger blocksize and latency when xruns happen, and a smaller one when
+    the system has been idle for a while.
+    """
+
+    def __init__(self, source, analysis_settings=None, analysis_worker=False, record_path=None,
+                 adaptive_latency=False):
+        self.source = source
+        self.channels = source.channels
+        self.blocksize = source.blocksize
+        self.analysis_settings = analysis_settings or (0, 0, DEFAULT_WINDOW)
+        self.analysis_worker = analysis_worker
+        self.frames = FrameBuffer(DEFAULT_NUM_BANDS, self.channels)
+        self.analyzer = self.create_analyzer(source.samplerate)
+        self.stats = AudioStats(source.samplerate, self.blocksize or DEFAULT_BLOCKSIZE)
+        self.ring = None
+        self.worker = None
+        self.record_path = record_path
+        self.recorder = None
+        self.latency_controller = LatencyController(self.blocksize or DEFAULT_BLOCKSIZE) if adaptive_latency else None
+
+        # Samples written to the ring buffer and the capture time of the last one
+        self.last_write = (0, 0.0)
+
+    def audio_callback(self, indata, capture_time, status):
+        """Analyze a block of audio, or queue it for the analysis worker."""
+        start = time.perf_counter()
+        self.stats.record_arrival(start, len(indata))
+        self.stats.record_status(status)
+
+        if self.ring:
+            self.ring.write(indata)
+            self.last_write = (self.ring.write_count, capture_time + len(indata) / self.analyzer.samplerate)
+        else:
+            self.analyze_block(indata, capture_time)
+
+        self.stats.record_callback(time.perf_counter() - start)
+
+    def create_analyzer(self, samplerate):
+        """Create an analyzer for the analysis settings, the FFT size defaults to the blocksize."""
+        fft_size, hop_size, window = self.analysis_settings
+        fft_size = fft_size or self.blocksize or DEFAULT_BLOCKSIZE
+        return AudioAnalyzer(samplerate, self.channels, self.frames.num_bands, fft_size, hop_size, window)
+
+    def analyze_block(self, indata, capture_time):
+        """Analyze a block of audio and publish the features of each completed hop."""
+        # Only one thread analyzes, band changes are applied here
+        frames = self.frames
+        if (frames.num_bands, frames.layout) != (self.analyzer.num_bands, self.analyzer.layout):
+            self.analyzer.set_num_bands(frames.num_bands, frames.layout)
+
+        for offset in self.analyzer.push(indata):
+            frame = frames.begin_write()
+            self.analyzer.process(self.analyzer.stft.samples, frame)
+            frames.publish(frame, capture_time + offset / self.analyzer.samplerate)
+            if self.recorder:
+                self.recorder.write(frame, frames.num_bands, frames.layout)
+
+    def set_num_bands(self, num_bands, layout=DEFAULT_LAYOUT):
+        """Change the number of bands and the band layout of the published banded spectrum.
+
+        Readers see frames of the new size straight away, the analyzing thread
+        switches the analyzer over on its next block.
+        """
+        if (num_bands, layout) != (self.frames.num_bands, self.frames.layout):
+            self.frames = FrameBuffer(num_bands, self.channels, layout)
+
+    def start(self):
+        """Open and start the audio source."""
+        if self.latency_controller:
+            self.configure_source(*self.latency_controller.settings())
+        self.source.open(self.audio_callback)
+
+        # Analyze at the samplerate the source actually opened with
+        if self.source.samplerate != self.analyzer.samplerate:
+            self.analyzer = self.create_analyzer(self.source.samplerate)
+        self.stats = AudioStats(self.source.samplerate, self.blocksize or DEFAULT_BLOCKSIZE)
+
+        if self.record_path:
+            self.recorder = FeatureRecorder(
+                self.record_path, self.frames.num_bands, self.channels, self.analyzer.samplerate, self.frames.layout
+            )
+        self.start_stream()
+
+    def start_stream(self):
+        """Start the analysis worker, if used, and the opened source."""
+        if self.analysis_worker:
+            blocksize = self.blocksize or DEFAULT_BLOCKSIZE
+            self.ring = RingBuffer(RING_BUFFER_BLOCKS * blocksize, self.channels)
+            self.worker = AnalysisWorker(self, self.ring, blocksize)
+            self.worker.start()
+
+        self.source.start()
+
+    def stop(self):
+        """Stop and close the audio source."""
+        self.stop_stream()
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def stop_stream(self):
+        """Stop the source and the analysis worker."""
+        self.source.stop()
+        if self.worker:
+            self.worker.stop()
+            self.worker = None
+            self.ring = None
+
+    def configure_source(self, blocksize, latency):
+        """Set the blocksize and latency the source opens with next."""
+        self.source.blocksize = blocksize
+        if hasattr(self.source, "latency"):
+            self.source.latency = latency
+        self.blocksize = blocksize
+
+    def maintain(self):
+        """Adapt the stream latency to the xruns seen, called regularly from the render loop.
+
+        The source is reopened from the caller's thread, never from the audio
+        callback. The stats are kept, only their block period changes, and the
+        controller counts xruns from the reopened stream on.
+        """
+        if not self.latency_controller:
+            return
+        settings = self.latency_controller.update(time.monotonic(), self.stats.xruns(), self.stats.load())
+        if settings is None:
+            return
+
+        blocksize, latency = settings
+        print(f"Adapting audio stream to blocksize {blocksize} and latency {latency} s "
+              f"after {self.stats.xruns()} xruns, load {self.stats.load():.0%}")
+        self.stop_stream()
+        self.configure_source(blocksize, latency)
+        self.source.open(self.audio_callback)
+        self.stats.blocksize = blocksize
+        self.stats.last_arrival = None
+        self.start_stream()
+        self.latency_controller.rebaseline(self.stats.xruns())
+
+    def current_frame(self):
+        """Return a consistent copy of the latest published frame."""
+        return self.frames.read()
+
+    def band_frequencies(self):
+        """Return the band edges (Hz) of the banded spectrum."""
+        return self.analyzer.band_frequencies
+
+
+# The engine shared by every show
+engine = None
+
+# Returned to shows while no engine is running
+empty_frame = FeatureFrame()
+
+
+def start(audio_settings, analysis_settings=None, analysis_worker=False, source_settings=None, record_path=None,
+          adaptive_latency=False):
+    """Start the shared audio engine, if it is not already running.
+
+    analysis_settings is a (fft_size, hop_size, window) tuple, 0 selects the
+    default size. source_settings is a (source, realtime, loop) tuple, see
+    create_source(), the default is the input device in audio_settings. A
+    'replay:<path>' source plays back a feature recording, made with
+    record_path, instead of analyzing audio. adaptive_latency lets the
+    engine change the blocksize and latency, see maintain().
+    """
+    global engine
+    if engine is None:
+        source, *options = source_settings or (DEFAULT_SOURCE,)
+        if source.startswith("replay:"):
+            engine = ReplayEngine(source.partition(":")[2], *options)
+        else:
+            source = create_source(audio_settings, source, *options)
+            engine = AudioEngine(source, analysis_settings=analysis_settings, analysis_worker=analysis_worker,
+                                 record_path=record_path, adaptive_latency=adaptive_latency)
+        engine.start()
+    return engine
+
+def stop():
+    """Stop the shared audio engine."""
+    global engine
+    if engine:
+        engine.stop()
+        engine = None
+
+def maintain():
+    """Let the shared engine adapt its stream, call this once per rendered frame."""
+    if engine:
+        engine.maintain()
+
+def current_frame():
+    """Return the latest FeatureFrame published by the shared engine.
+
+    The frame is a snapshot, copied and validated against the audio thread,
+    so every feature of it comes from the same block of audio until the next
+    read refills it. Read it once per render step.
+    """
+    if engine is None:
+        return empty_frame
+    return engine.current_frame()
+
+def set_num_bands(num_bands=DEFAULT_NUM_BANDS, layout=DEFAULT_LAYOUT):
+    """Select the number of bands and the band layout the current show wants in the banded spectrum."""
+    if engine:
+        engine.set_num_bands(num_bands, layout)
+
+def band_frequencies():
+    """Return the band edges (Hz) of the banded spectrum."""
+    return engine.band_frequencies()
@@ -0,0 +1,143 @@
+import time
+import numpy as np
+
+DEFAULT_NUM_BANDS = 25  # Number of frequency bands in the banded spectrum
+MIN_DOMINANT_FREQUENCY = 20  # Lowest dominant frequency reported (Hz)
+FRAME_SLOTS = 3  # Preallocated frames in a FrameBuffer
+
+
+def read_only_view(array):
+    """Return a view of the array that readers cannot write to."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class FeatureFrame:
+    """The audio features computed from a single block of audio.
+
+    Frames are preallocated and only ever filled by the audio thread, the
+    arrays handed out to readers are read-only views.
+    """
+
+    def __init__(self, num_bands=DEFAULT_NUM_BANDS, channels=1):
+        # Sequence number of the frame, 0 while the frame is being written
+        self.sequence = 0
+        # time.monotonic() at which the newest analyzed sample was captured
+        self.capture_time = 0.0
+
+        self.volume = 0
+        self.bass = 0
+        self.midrange = 0
+        self.treble = 0
+        self.dominant_frequency = MIN_DOMINANT_FREQUENCY
+
+        # Fundamental frequency of the note (Hz, 0 for silence) and how clearly
+        # the spectrum is one harmonic note (0-1)
+        self.pitch_hz = 0
+        self.pitch_confidence = 0
+
+        # Levels normalized to 0-1 against the 95th percentile of the last few seconds
+        self.volume_norm = 0
+        self.bass_norm = 0
+        self.midrange_norm = 0
+        self.treble_norm = 0
+
+        # Exponential moving averages of the band levels, used to prevent "jitter"
+        self.smoothed_bass = 0
+        self.smoothed_midrange = 0
+        self.smoothed_treble = 0
+
+        # Onsets and tempo. Frames are published faster than the render loop reads
+        # them, so shows should compare beat_count with the last count they saw
+        self.beat = False
+        self.beat_count = 0
+        self.onset_strength = 0
+        self.bpm = 0
+        self.beat_phase = 0
+
+        # Stereo image: mid/side RMS levels, L/R correlation (-1..1) and balance (-1 left..1 right)
+        self.mid_energy = 0
+        self.side_energy = 0
+        self.correlation = 0
+        self.balance = 0
+
+        # Smoothed amplitude of each frequency band, of the mid signal and of each channel
+        self._band_amplitudes = np.zeros(num_bands)
+        self.band_amplitudes = read_only_view(self._band_amplitudes)
+        self._channel_band_amplitudes = np.zeros((channels, num_bands))
+        self.channel_band_amplitudes = read_only_view(self._channel_band_amplitudes)
+
+    def set_band_amplitudes(self, values):
+        """Copy the band amplitudes into the frame's preallocated array."""
+        np.copyto(self._band_amplitudes, values)
+
+    def set_channel_band_amplitudes(self, values):
+        """Copy the per-channel band amplitudes into the frame's preallocated array."""
+        np.copyto(self._channel_band_amplitudes, values)
+
+    def copy_from(self, other):
+        """Copy every feature of another frame into this one."""
+        for name, value in vars(other).items():
+            if not isinstance(value, np.ndarray):
+                setattr(self, name, value)
+        np.copyto(self._band_amplitudes, other._band_amplitudes)
+        np.copyto(self._channel_band_amplitudes, other._channel_band_amplitudes)
+
+    def age(self):
+        """Seconds since the audio in this frame was captured."""
+        return time.monotonic() - self.capture_time
+
+
+class FrameBuffer:
+    """Tear-free handoff of FeatureFrames from the audio thread to the render loop.
+
+    The writer fills the oldest of a small ring of preallocated frames and then
+    publishes it with a single reference store, without taking a lock. Frames
+    are published faster than the render loop reads them, so the writer can
+    wrap around the ring and refill a frame while it is being read. read
+    therefore copies the latest frame into a preallocated snapshot owned by
+    the reader and validates the copy against the frame's sequence number,
+    retrying if it changed, like a seqlock reader.
+    """
+
+    def __init__(self, num_bands=DEFAULT_NUM_BANDS, channels=1, layout="geometric", slots=FRAME_SLOTS):
+        self.num_bands = num_bands
+        self.layout = layout  # Band layout of the banded spectrum
+        self.channels = channels
+        self.frames = [FeatureFrame(num_bands, channels) for _ in range(slots)]
+        self.sequence = 0
+        self.latest = self.frames[0]
+        self.snapshot = FeatureFrame(num_bands, channels)  # The reader's copy of the latest frame
+
+    def begin_write(self):
+        """Return the frame the writer fills next, marked as being written."""
+        frame = self.frames[(self.sequence + 1) % len(self.frames)]
+        frame.sequence = 0
+        return frame
+
+    def publish(self, frame, capture_time):
+        """Make a filled frame the latest one."""
+        frame.capture_time = capture_time
+        frame.sequence = self.sequence + 1
+        self.latest = frame
+        self.sequence = frame.sequence
+
+    def read(self):
+        """Return the reader's snapshot of the latest published frame, copied while the writer did not touch it.
+
+        The snapshot is the same preallocated frame on every read. The writer
+        never touches it, so it stays consistent until the next read.
+        """
+        snapshot = self.snapshot
+        while True:
+            frame = self.latest
+            sequence = frame.sequence  # 0 while the writer refills it, or before the first publish
+            snapshot.copy_from(frame)
+            if self.is_valid(frame, sequence) and (sequence or self.sequence == 0):
+                return snapshot
+
+    @staticmethod
+    def is_valid(frame, sequence):
+        """Check that a frame read with the given sequence number has not been reused."""
+        return frame.sequence == sequence
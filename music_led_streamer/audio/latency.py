@@ -0,0 +1,81 @@
+# Stream settings the controller steps through, as (blocksize, latency in seconds),
+# from the lowest latency to the most robust
+LATENCY_LADDER = (
+    (256, 0.01),
+    (512, 0.02),
+    (1024, 0.05),
+    (2048, 0.1),
+    (4096, 0.2),
+)
+
+CHECK_INTERVAL = 2.0  # Seconds between checks of the xrun count
+IDLE_SECONDS = 30.0  # Seconds without xruns before trying a lower latency
+IDLE_LOAD = 0.25  # Highest callback plus analysis load, per block period, that counts as idle
+MAX_HOLD_SECONDS = 600.0  # Longest wait before retrying a lower latency
+
+
+class LatencyController:
+    """Adapts the stream blocksize and latency to the xruns of the system.
+
+    Every CHECK_INTERVAL the xrun count is compared with the previous check.
+    Any new xruns step up the LATENCY_LADDER straight away. When there have
+    been none for the hold time and the audio work takes little of each
+    block period, the controller steps back down. A lower step that fails
+    again doubles the hold time, so the controller settles on the lowest
+    stable step instead of oscillating.
+    """
+
+    def __init__(self, blocksize, ladder=LATENCY_LADDER):
+        self.ladder = ladder
+        # Start at the first step that is at least as robust as the configured blocksize
+        self.level = next((i for i, (size, _) in enumerate(ladder) if size >= blocksize), len(ladder) - 1)
+        self.hold = IDLE_SECONDS
+        self.stepped_down = False  # The last change lowered the latency
+        self.last_check = None
+        self.last_change = 0.0
+        self.last_xruns = 0
+
+    def settings(self):
+        """Return the (blocksize, latency) of the current step."""
+        return self.ladder[self.level]
+
+    def rebaseline(self, xruns):
+        """Take xruns as the running total of the next check, such as after the stream was reopened."""
+        self.last_xruns = xruns
+
+    def update(self, now, xruns, load):
+        """Check the xrun count and load, returning new (blocksize, latency) settings or None.
+
+        xruns is a running total, a total lower than the previous one (after
+        the stream was reopened) counts from zero.
+        """
+        if self.last_check is None:
+            self.last_check = self.last_change = now
+            self.last_xruns = xruns
+            return None
+        if now - self.last_check < CHECK_INTERVAL:
+            return None
+        self.last_check = now
+
+        new_xruns = xruns - self.last_xruns if xruns >= self.last_xruns else xruns
+        self.last_xruns = xruns
+
+        if new_xruns:
+            if self.stepped_down:
+                # The lower step was not stable, wait longer before trying it again
+                self.hold = min(MAX_HOLD_SECONDS, self.hold * 2)
+            self.last_change = now
+            if self.level == len(self.ladder) - 1:
+                return None
+            return self.step(1, now)
+
+        if self.level > 0 and now - self.last_change >= self.hold and load < IDLE_LOAD:
+            return self.step(-1, now)
+        return None
+
+    def step(self, direction, now):
+        """Move one step up (1) or down (-1) the ladder and return its settings."""
+        self.level += direction
+        self.stepped_down = direction < 0
+        self.last_change = now
+        return self.settings()
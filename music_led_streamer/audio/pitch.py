@@ -0,0 +1,101 @@
+import functools
+import numpy as np
+
+# Range of fundamental frequencies searched for (Hz)
+MIN_PITCH = 60
+MAX_PITCH = 2000
+
+NUM_HARMONICS = 5  # Harmonics multiplied together by the harmonic product spectrum
+HARMONIC_DECAY = 0.6  # Weight of each harmonic relative to the one below it
+SPECTRUM_FLOOR = 0.01  # Floor added to the spectrum, relative to its peak, before taking logs
+MIN_CANDIDATE_BIN = 3  # Lower bins are smeared into their neighbors by the window
+MIN_PEAK = 1e-3  # Spectra whose peak is below this are silence and have no pitch
+CONFIDENCE_WIDTH = 1  # Bins either side of each harmonic counted as harmonic energy
+
+
+class PitchEstimator:
+    """Estimates the fundamental frequency from an rfft magnitude spectrum.
+
+    A harmonic product spectrum, computed as a weighted sum of log
+    magnitudes, scores every candidate bin by the energy at its first few
+    harmonics. The harmonics' bin index table is built once per (samplerate,
+    FFT size), so scoring every candidate is one gather and one matrix
+    product. The winning candidate is refined by parabolic interpolation of
+    its strongest harmonic, which gives a small fraction of a bin of
+    accuracy without a longer FFT.
+
+    The confidence is the fraction of the spectral energy, up to the last
+    harmonic, that lies on the harmonics of the pitch. It is close to 1 for a
+    clean note and close to 0 for noise or dense mixes.
+    """
+
+    def __init__(self, samplerate, fft_size, num_harmonics=NUM_HARMONICS,
+                 min_pitch=MIN_PITCH, max_pitch=MAX_PITCH):
+        self.samplerate = samplerate
+        self.fft_size = fft_size
+        self.bin_spacing = samplerate / fft_size
+        self.num_bins = fft_size // 2 + 1
+
+        first = max(MIN_CANDIDATE_BIN, int(np.ceil(min_pitch / self.bin_spacing)))
+        last = min(int(max_pitch / self.bin_spacing), self.num_bins - 2)
+        self.candidates = np.arange(first, last + 1)
+
+        # Bin of each harmonic (rows) of each candidate (columns), harmonics
+        # above the Nyquist frequency read the last bin
+        self.harmonics = np.arange(1, num_harmonics + 1)
+        self.harmonic_bins = np.minimum(self.harmonics[:, np.newaxis] * self.candidates, self.num_bins - 1)
+        self.weights = HARMONIC_DECAY ** np.arange(num_harmonics)
+
+    def estimate(self, spectrum):
+        """Return the pitch (Hz) and its confidence (0-1) of a magnitude spectrum, (0, 0) for silence."""
+        peak = spectrum.max()
+        if peak < MIN_PEAK or self.candidates.size == 0:
+            return 0.0, 0.0
+
+        log_spectrum = np.log(spectrum + SPECTRUM_FLOOR * peak)
+        salience = self.weights @ log_spectrum[self.harmonic_bins]
+        best = np.argmax(salience)
+        candidate = self.candidates[best]
+
+        # Refine the strongest harmonic, its error shrinks when divided by the harmonic number
+        bins = self.harmonic_bins[:, best]
+        strongest = np.argmax(np.where(bins < self.num_bins - 1, spectrum[bins], 0))
+        harmonic = self.harmonics[strongest]
+        # The harmonic lies within harmonic / 2 bins of harmonic * candidate, but never nearer its neighbors
+        width = min(int(np.ceil(harmonic / 2)), candidate // 2)
+        start = max(1, bins[strongest] - width)
+        stop = min(self.num_bins - 1, bins[strongest] + width + 1)
+        position = start + np.argmax(spectrum[start:stop])
+        position += parabolic_offset(log_spectrum, position)
+        pitch_bin = position / harmonic
+
+        return float(pitch_bin * self.bin_spacing), self.confidence(spectrum, pitch_bin)
+
+    def confidence(self, spectrum, pitch_bin):
+        """Return the fraction of the spectral energy on the harmonics of pitch_bin."""
+        limit = min(self.num_bins, int(np.ceil(pitch_bin * self.harmonics[-1])) + CONFIDENCE_WIDTH + 1)
+        power = spectrum[1:limit] ** 2
+        total = power.sum()
+        if total == 0:
+            return 0.0
+
+        # Each bin is counted once, even where the windows of low harmonics overlap
+        centers = np.rint(self.harmonics * pitch_bin).astype(int)
+        offsets = np.arange(-CONFIDENCE_WIDTH, CONFIDENCE_WIDTH + 1)
+        harmonic_bins = np.unique(centers[:, np.newaxis] + offsets)
+        harmonic_bins = harmonic_bins[(harmonic_bins >= 1) & (harmonic_bins < limit)]
+        return float(min(1.0, power[harmonic_bins - 1].sum() / total))
+
+
+def parabolic_offset(values, index):
+    """Return the offset (-0.5 to 0.5) of the vertex of a parabola through values[index - 1:index + 2]."""
+    left, center, right = values[index - 1], values[index], values[index + 1]
+    curvature = left - 2 * center + right
+    if curvature >= 0:
+        return 0.0
+    return float(np.clip(0.5 * (left - right) / curvature, -0.5, 0.5))
+
+@functools.lru_cache(maxsize=8)
+def get_pitch_estimator(samplerate, fft_size):
+    """Return the (cached) pitch estimator for a samplerate and FFT size."""
+    return PitchEstimator(samplerate, fft_size)
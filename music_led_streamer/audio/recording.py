@@ -0,0 +1,239 @@
+import queue
+import threading
+import time
+import numpy as np
+from music_led_streamer.audio.bands import band_edges, DEFAULT_LAYOUT
+from music_led_streamer.audio.frame import FrameBuffer, DEFAULT_NUM_BANDS
+
+RECORDING_MAGIC = b"MLSF"
+RECORDING_VERSION = 2
+
+# Fixed size header at the start of every recording, padded to 32 bytes
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("num_bands", "<u2"),
+    ("channels", "<u2"),
+    ("samplerate", "<u4"),
+    ("layout", "S18"),
+])
+
+# FeatureFrame attributes stored as float32
+FLOAT_FIELDS = (
+    "volume", "bass", "midrange", "treble", "dominant_frequency", "pitch_hz", "pitch_confidence",
+    "volume_norm", "bass_norm", "midrange_norm", "treble_norm",
+    "smoothed_bass", "smoothed_midrange", "smoothed_treble",
+    "onset_strength", "bpm", "beat_phase",
+    "mid_energy", "side_energy", "correlation", "balance",
+)
+
+
+def record_dtype(num_bands, channels):
+    """Return the dtype of one recorded frame."""
+    return np.dtype(
+        [("time", "<f8")]
+        + [(name, "<f4") for name in FLOAT_FIELDS]
+        + [
+            ("beat", "u1"),
+            ("beat_count", "<u4"),
+            ("band_amplitudes", "<f4", (num_bands,)),
+            ("channel_band_amplitudes", "<f4", (channels, num_bands)),
+        ]
+    )
+
+def resample_bands(values, from_edges, to_edges):
+    """Interpolate band amplitudes onto other bands, by their centers on a log frequency axis.
+
+    values may hold one spectrum per row, the last axis is the bands.
+    """
+    if np.array_equal(from_edges, to_edges):
+        return values
+    from_edges, to_edges = np.asarray(from_edges), np.asarray(to_edges)
+    from_centers = np.log(from_edges[:-1] * from_edges[1:]) / 2
+    to_centers = np.log(to_edges[:-1] * to_edges[1:]) / 2
+    values = np.asarray(values)
+    if values.ndim == 1:
+        return np.interp(to_centers, from_centers, values)
+    return np.array([np.interp(to_centers, from_centers, row) for row in values])
+
+
+class FeatureRecorder:
+    """Appends the published FeatureFrames to a file.
+
+    The file is a HEADER_DTYPE header followed by fixed size records, so
+    it can be memory-mapped as a structured array while it is still being
+    written. Frames whose band layout differs from the recording's (a show
+    switch) are resampled to the recorded bands.
+
+    write may be called from the realtime audio callback, so it only queues
+    the frame's features. A writer thread resamples the bands, packs the
+    records and does the file I/O.
+    """
+
+    def __init__(self, path, num_bands, channels, samplerate, layout=DEFAULT_LAYOUT):
+        self.path = path
+        self.num_bands = num_bands
+        self.layout = layout
+        self.samplerate = samplerate
+        self.edges = band_edges(num_bands, samplerate, layout)
+        self.record = np.zeros(1, dtype=record_dtype(num_bands, channels))[0]
+        self.start_time = None
+
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header[0] = (RECORDING_MAGIC, RECORDING_VERSION, num_bands, channels, samplerate, layout.encode())
+        self.file = open(path, "wb")
+        self.file.write(header.tobytes())
+
+        self.queue = queue.SimpleQueue()  # Frames waiting for the writer thread, None stops it
+        self.writer = threading.Thread(target=self.drain, name="FeatureRecorder", daemon=True)
+        self.writer.start()
+
+    def write(self, frame, num_bands, layout):
+        """Queue a frame that has num_bands bands in the given layout for the writer thread."""
+        if self.start_time is None:
+            self.start_time = frame.capture_time
+        features = tuple(getattr(frame, name) for name in FLOAT_FIELDS)
+        self.queue.put((
+            frame.capture_time - self.start_time, features, frame.beat, frame.beat_count,
+            frame.band_amplitudes.copy(), frame.channel_band_amplitudes.copy(), num_bands, layout,
+        ))
+
+    def pack(self, time, features, beat, beat_count, band_amplitudes, channel_band_amplitudes, num_bands, layout):
+        """Fill the record from a queued frame, resampling its bands to the recorded ones."""
+        record = self.record
+        record["time"] = time
+        for name, value in zip(FLOAT_FIELDS, features):
+            record[name] = value
+        record["beat"] = beat
+        record["beat_count"] = beat_count
+
+        if (num_bands, layout) != (self.num_bands, self.layout):
+            edges = band_edges(num_bands, self.samplerate, layout)
+            band_amplitudes = resample_bands(band_amplitudes, edges, self.edges)
+            channel_band_amplitudes = resample_bands(channel_band_amplitudes, edges, self.edges)
+        record["band_amplitudes"] = band_amplitudes
+        record["channel_band_amplitudes"] = channel_band_amplitudes
+        return record
+
+    def drain(self):
+        """Pack and write the queued frames to the file until close queues None."""
+        while True:
+            queued = self.queue.get()
+            if queued is None:
+                return
+            self.file.write(self.pack(*queued).tobytes())
+
+    def close(self):
+        """Write the queued records, then flush and close the file."""
+        self.queue.put(None)
+        self.writer.join()
+        self.file.close()
+
+
+def load_recording(path):
+    """Memory-map a recording, returning its header and its records.
+
+    A partly written last record, left by a recording that was cut short,
+    is ignored.
+    """
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header[0]["magic"] != RECORDING_MAGIC:
+        raise ValueError(f"'{path}' is not a feature recording")
+    header = header[0]
+    if header["version"] != RECORDING_VERSION:
+        raise ValueError(f"Unsupported feature recording version {header['version']} in '{path}'")
+
+    dtype = record_dtype(int(header["num_bands"]), int(header["channels"]))
+    with open(path, "rb") as file:
+        size = file.seek(0, 2)
+    count = (size - HEADER_DTYPE.itemsize) // dtype.itemsize
+    if count == 0:
+        raise ValueError(f"Feature recording '{path}' has no frames")
+    records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_DTYPE.itemsize, shape=(count,))
+    return header, records
+
+
+class ReplayEngine:
+    """Publishes recorded FeatureFrames in place of an AudioEngine.
+
+    Nothing is analyzed, so show render costs can be measured on their own
+    and every run sees the same features. In real time the frame shown is
+    the one recorded at the same time since the start, otherwise every read
+    advances one recorded frame, which renders the recording flat out.
+    Shows asking for other bands get the recorded bands resampled.
+    """
+
+    def __init__(self, path, realtime=True, loop=True):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        header, self.records = load_recording(path)
+        self.channels = int(header["channels"])
+        self.samplerate = int(header["samplerate"])
+        self.recorded_edges = band_edges(int(header["num_bands"]), self.samplerate, header["layout"].decode())
+        self.times = np.asarray(self.records["time"])
+        # A looped recording starts over one frame period after its last frame
+        self.duration = self.times[-1] * len(self.times) / max(1, len(self.times) - 1)
+        self.frames = None
+        self.set_num_bands(DEFAULT_NUM_BANDS)
+        self.start_time = 0.0
+        self.index = -1  # Index of the published record
+        self.reads = 0
+
+    def set_num_bands(self, num_bands, layout=DEFAULT_LAYOUT):
+        """Change the number of bands and the band layout of the published banded spectrum."""
+        if self.frames is None or (num_bands, layout) != (self.frames.num_bands, self.frames.layout):
+            self.frames = FrameBuffer(num_bands, self.channels, layout)
+            self.edges = band_edges(num_bands, self.samplerate, layout)
+            self.index = -1  # Republish the current record with the new bands
+
+    def band_frequencies(self):
+        """Return the band edges (Hz) of the published banded spectrum."""
+        return self.edges
+
+    def start(self):
+        """Start replaying from the first frame."""
+        self.start_time = time.monotonic()
+        self.reads = 0
+        self.index = -1
+
+    def stop(self):
+        """Release the recording."""
+        self.records = None
+
+    def maintain(self):
+        """Nothing to adapt, there is no audio stream."""
+
+    def current_frame(self):
+        """Return the frame of the recording that is due now."""
+        now = time.monotonic()
+        if self.realtime:
+            elapsed = now - self.start_time
+            if self.loop and self.duration > 0:
+                elapsed %= self.duration
+            index = max(0, int(np.searchsorted(self.times, elapsed, side="right")) - 1)
+            capture_time = now - (elapsed - self.times[index])
+        else:
+            index = self.reads % len(self.times) if self.loop else min(self.reads, len(self.times) - 1)
+            self.reads += 1
+            capture_time = now
+
+        if index != self.index:
+            self.index = index
+            self.publish(self.records[index], capture_time)
+        return self.frames.read()
+
+    def publish(self, record, capture_time):
+        """Fill the next frame from a record and make it the latest one."""
+        frame = self.frames.begin_write()
+        for name in FLOAT_FIELDS:
+            setattr(frame, name, float(record[name]))
+        frame.beat = bool(record["beat"])
+        frame.beat_count = int(record["beat_count"])
+        frame.set_band_amplitudes(
+            resample_bands(record["band_amplitudes"], self.recorded_edges, self.edges)
+        )
+        frame.set_channel_band_amplitudes(
+            resample_bands(record["channel_band_amplitudes"], self.recorded_edges, self.edges)
+        )
+        self.frames.publish(frame, capture_time)
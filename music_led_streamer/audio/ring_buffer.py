@@ -0,0 +1,60 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Preallocated single-producer, single-consumer ring buffer of audio samples.
+
+    The audio callback is the only writer and the analysis worker the only
+    reader. Each side only advances its own counter, after the samples have
+    been copied, so no lock is needed.
+    """
+
+    def __init__(self, capacity, channels, dtype=np.float32):
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, channels), dtype=dtype)
+        self.write_count = 0  # Total samples written
+        self.read_count = 0  # Total samples read
+        self.dropped = 0  # Samples discarded because the buffer was full
+
+    def available(self):
+        """Number of samples waiting to be read."""
+        return self.write_count - self.read_count
+
+    def write(self, data):
+        """Copy samples into the buffer, dropping what does not fit."""
+        free = self.capacity - self.available()
+        count = len(data)
+        if count > free:
+            self.dropped += count - free
+            count = free
+        if count == 0:
+            return 0
+
+        start = self.write_count % self.capacity
+        first = min(count, self.capacity - start)
+        self.buffer[start:start + first] = data[:first]
+        self.buffer[:count - first] = data[first:count]
+
+        # Publish the samples only once they are in place
+        self.write_count += count
+        return count
+
+    def read(self, out):
+        """Copy the next len(out) samples into out, returns False if not enough are waiting."""
+        count = len(out)
+        if self.available() < count:
+            return False
+
+        start = self.read_count % self.capacity
+        first = min(count, self.capacity - start)
+        out[:first] = self.buffer[start:start + first]
+        out[first:] = self.buffer[:count - first]
+
+        self.read_count += count
+        return True
+
+    def skip(self, count):
+        """Discard up to count waiting samples."""
+        count = min(count, self.available())
+        self.read_count += count
+        return count
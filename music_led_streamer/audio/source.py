@@ -0,0 +1,291 @@
+import abc
+import os
+import struct
+import threading
+import time
+import numpy as np
+
+DEFAULT_SOURCE = "device"
+SOURCE_BLOCKSIZE = 1024  # Block size of file and synthetic sources when none is set
+RAW_PCM_DTYPE = np.int16  # Sample format of raw PCM files
+
+# Synthetic signals
+SYNTH_AMPLITUDE = 0.5
+SINE_FREQUENCY = 440  # Hz
+SWEEP_RANGE = (20, 20000)  # Hz
+SWEEP_SECONDS = 10  # Duration of one sweep
+KICK_BPM = 120
+KICK_DECAY = 0.08  # Seconds for a kick to fade to 1/e
+KICK_FREQUENCIES = (150, 45)  # Pitch of a kick at its start and end (Hz)
+
+
+class AudioSource:
+    """A stream of audio blocks delivered to a callback.
+
+    The engine calls open() with its callback, reads the samplerate and
+    channels (which the backend may have adjusted), then calls start().
+    The callback is called as callback(indata, capture_time, status) with a
+    (frames, channels) float32 array, the time.monotonic() at which its first
+    sample was captured and a status that is truthy when samples were lost.
+    """
+
+    def __init__(self, samplerate, channels, blocksize):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.callback = None
+
+    def open(self, callback):
+        """Prepare the source to deliver blocks to callback."""
+        self.callback = callback
+
+    def start(self):
+        """Start delivering blocks."""
+
+    def stop(self):
+        """Stop delivering blocks and release the source."""
+
+
+class DeviceSource(AudioSource):
+    """Audio captured from a sounddevice (PortAudio) input device."""
+
+    def __init__(self, samplerate, channels, device_index, blocksize, latency):
+        super().__init__(samplerate, channels, blocksize)
+        self.device_index = device_index
+        self.latency = latency
+        self.stream = None
+
+    def open(self, callback):
+        """Open the input stream, the samplerate becomes the one the device opened with."""
+        import sounddevice as sd  # Only needed, and only installed with PortAudio, for live input
+
+        super().open(callback)
+        self.stream = sd.InputStream(
+            samplerate=self.samplerate,
+            channels=self.channels,
+            device=self.device_index,
+            callback=self.stream_callback,
+            blocksize=self.blocksize,
+            latency=self.latency,
+        )
+        self.samplerate = self.stream.samplerate
+
+    def stream_callback(self, indata, frames, time_info, status):
+        """Pass a block from PortAudio on, timed on the render loop's clock."""
+        capture_time = time.monotonic() - max(0, time_info.currentTime - time_info.inputBufferAdcTime)
+        self.callback(indata, capture_time, status)
+
+    def start(self):
+        """Start the input stream."""
+        self.stream.start()
+
+    def stop(self):
+        """Stop and close the input stream."""
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+
+class ThreadedSource(AudioSource, abc.ABC):
+    """A source whose blocks are produced by a thread, optionally paced in real time.
+
+    Without pacing blocks are delivered as fast as the callback takes them,
+    which makes runs reproducible and is useful for profiling. Subclasses
+    implement fill_block.
+    """
+
+    def __init__(self, samplerate, channels, blocksize, realtime=True):
+        super().__init__(samplerate, channels, blocksize or SOURCE_BLOCKSIZE)
+        self.realtime = realtime
+        self.block = np.zeros((self.blocksize, channels), dtype=np.float32)
+        self.position = 0  # Samples delivered
+        self.thread = None
+        self.running = False
+
+    def open(self, callback):
+        """Prepare to deliver blocks to callback, resizing the block if the blocksize changed."""
+        super().open(callback)
+        if len(self.block) != self.blocksize:
+            self.block = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+
+    def start(self):
+        """Start the thread that delivers the blocks."""
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=type(self).__name__, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the thread and wait for it to finish."""
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join()
+        self.thread = None
+
+    def run(self):
+        """Deliver blocks until stopped or the source runs out."""
+        period = self.blocksize / self.samplerate
+        deadline = time.monotonic()
+        while self.running:
+            if not self.fill_block(self.block):
+                break
+            self.position += self.blocksize
+
+            if self.realtime:
+                # A block can only be delivered once all of it has "arrived"
+                deadline += period
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                capture_time = deadline - period
+            else:
+                capture_time = time.monotonic()
+            self.callback(self.block, capture_time, None)
+
+    @abc.abstractmethod
+    def fill_block(self, block):
+        """Write the next samples into block, returns False when there are none left."""
+
+
+class FileSource(ThreadedSource):
+    """Audio read from a memory-mapped WAV or raw PCM file.
+
+    WAV files set their own samplerate and channels, raw PCM files are read
+    as RAW_PCM_DTYPE samples with the samplerate and channels given.
+    """
+
+    def __init__(self, path, samplerate, channels, blocksize, realtime=True, loop=True):
+        if path.lower().endswith(".wav"):
+            samplerate, channels, dtype, offset, frames = read_wav_header(path)
+        else:
+            dtype = np.dtype(RAW_PCM_DTYPE)
+            offset = 0
+            frames = os.path.getsize(path) // (dtype.itemsize * channels)
+        if frames == 0:
+            raise ValueError(f"Audio file '{path}' has no samples")
+
+        super().__init__(samplerate, channels, blocksize, realtime)
+        self.path = path
+        self.loop = loop
+        self.samples = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(frames, channels))
+        self.scale = pcm_scale(dtype)
+
+    def fill_block(self, block):
+        """Copy and convert the next block of samples, wrapping around when looping."""
+        frames = len(self.samples)
+        if not self.loop and self.position >= frames:
+            return False
+
+        filled = 0
+        while filled < len(block):
+            start = (self.position + filled) % frames
+            count = min(len(block) - filled, frames - start)
+            chunk = self.samples[start:start + count]
+            if self.scale:
+                np.multiply(chunk, self.scale, out=block[filled:filled + count], casting="unsafe")
+            else:
+                block[filled:filled + count] = chunk
+            filled += count
+            if not self.loop and start + count == frames:
+                # Pad the last block with silence
+                block[filled:] = 0
+                break
+        return True
+
+
+class SyntheticSource(ThreadedSource):
+    """Generated test signals: a sine, a logarithmic sweep, white noise or a kick drum pattern."""
+
+    SIGNALS = ("sine", "sweep", "noise", "kick")
+
+    def __init__(self, signal, samplerate, channels, blocksize, realtime=True):
+        if signal not in self.SIGNALS:
+            raise ValueError(f"Unknown synthetic signal '{signal}', expected one of {', '.join(self.SIGNALS)}")
+        super().__init__(samplerate, channels, blocksize, realtime)
+        self.signal = signal
+        self.rng = np.random.default_rng(0)
+        self.sweep_phase = 0.0
+
+    def fill_block(self, block):
+        """Generate the next block of the signal on every channel."""
+        t = (self.position + np.arange(len(block))) / self.samplerate
+
+        if self.signal == "sine":
+            mono = np.sin(2 * np.pi * SINE_FREQUENCY * t)
+        elif self.signal == "sweep":
+            low, high = SWEEP_RANGE
+            frequency = low * (high / low) ** ((t % SWEEP_SECONDS) / SWEEP_SECONDS)
+            phase = self.sweep_phase + 2 * np.pi * np.cumsum(frequency) / self.samplerate
+            self.sweep_phase = phase[-1] % (2 * np.pi)
+            mono = np.sin(phase)
+        elif self.signal == "noise":
+            block[:] = self.rng.uniform(-SYNTH_AMPLITUDE, SYNTH_AMPLITUDE, block.shape)
+            return True
+        else:
+            # Time since the last beat, each kick is a decaying, falling tone
+            since_beat = t % (60 / KICK_BPM)
+            envelope = np.exp(-since_beat / KICK_DECAY)
+            start, end = KICK_FREQUENCIES
+            frequency = end + (start - end) * envelope
+            mono = envelope * np.sin(2 * np.pi * frequency * since_beat)
+
+        block[:] = (SYNTH_AMPLITUDE * mono)[:, np.newaxis]
+        return True
+
+
+def read_wav_header(path):
+    """Return the samplerate, channels, sample dtype, data offset and frame count of a PCM WAV file."""
+    with open(path, "rb") as file:
+        riff, _, wave = struct.unpack("<4sI4s", file.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError(f"'{path}' is not a WAV file")
+
+        fmt = None
+        while True:
+            header = file.read(8)
+            if len(header) < 8:
+                raise ValueError(f"'{path}' has no audio data")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", file.read(16))
+                file.seek(size - 16 + size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                break
+            else:
+                file.seek(size + size % 2, os.SEEK_CUR)
+        offset = file.tell()
+
+    if fmt is None:
+        raise ValueError(f"'{path}' has no format chunk")
+    audio_format, channels, samplerate, _, _, bits = fmt
+    dtypes = {(1, 16): np.int16, (1, 32): np.int32, (3, 32): np.float32}
+    if (audio_format, bits) not in dtypes:
+        raise ValueError(f"Unsupported WAV format {audio_format} with {bits} bit samples in '{path}'")
+    dtype = np.dtype(dtypes[(audio_format, bits)])
+
+    # Some writers leave the data size unset when streaming, so trust the file size
+    frames = (os.path.getsize(path) - offset) // (dtype.itemsize * channels)
+    return samplerate, channels, dtype, offset, frames
+
+def pcm_scale(dtype):
+    """Return the factor that converts integer samples to -1..1 floats, None for float samples."""
+    if dtype.kind == "f":
+        return None
+    return 1 / (np.iinfo(dtype).max + 1)
+
+def create_source(audio_settings, source=DEFAULT_SOURCE, realtime=True, loop=True):
+    """Create the audio source selected by a source spec.
+
+    The spec is 'device' for live input, 'file:<path>' for a WAV or raw PCM
+    file, or 'synth:<signal>' for a synthetic signal. audio_settings is the
+    (samplerate, channels, device_index, blocksize, latency) tuple.
+    """
+    samplerate, channels, device_index, blocksize, latency = audio_settings
+    kind, _, argument = source.partition(":")
+    if kind == "device":
+        return DeviceSource(samplerate, channels, device_index, blocksize, latency)
+    if kind == "file":
+        return FileSource(argument, samplerate, channels, blocksize, realtime, loop)
+    if kind == "synth":
+        return SyntheticSource(argument or "sweep", samplerate, channels, blocksize, realtime)
+    raise ValueError(f"Unknown audio source '{source}', expected 'device', 'file:<path>' or 'synth:<signal>'")
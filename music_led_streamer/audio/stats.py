@@ -0,0 +1,98 @@
+STATS_SMOOTHING = 0.05  # Weight of the newest sample in the running averages
+
+
+class AudioStats:
+    """Timing statistics of the audio callback and the analysis stage.
+
+    Besides durations it counts the xruns PortAudio reports and the times the
+    analysis worker dropped samples, and measures the jitter of the callback arrivals, the difference between the time since
+    the previous callback and the duration of the audio it delivered.
+    """
+
+    def __init__(self, samplerate, blocksize):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.reset()
+
+    def reset(self):
+        """Forget all measurements."""
+        self.callbacks = 0
+        self.callback_duration = 0.0  # Running average (s)
+        self.max_callback_duration = 0.0
+        self.analyses = 0
+        self.analysis_duration = 0.0  # Running average (s)
+        self.max_analysis_duration = 0.0
+        self.queue_depth = 0  # Samples waiting for the analysis worker
+        self.max_queue_depth = 0
+        self.dropped = 0  # Samples the analysis worker could not keep up with
+        self.drop_events = 0  # Times the analysis worker dropped samples
+        self.input_overflows = 0  # Callbacks whose input lost samples
+        self.input_underflows = 0  # Callbacks whose input was padded
+        self.last_arrival = None  # time.perf_counter() of the previous callback
+        self.last_frames = 0  # Frames delivered by the previous callback
+        self.jitter = 0.0  # Running average (s)
+        self.max_jitter = 0.0
+
+    def record_callback(self, duration):
+        """Record how long one audio callback took."""
+        self.callbacks += 1
+        self.callback_duration += (duration - self.callback_duration) * STATS_SMOOTHING
+        self.max_callback_duration = max(self.max_callback_duration, duration)
+
+    def record_status(self, status):
+        """Count the xruns flagged in a callback status, sounddevice.CallbackFlags or None."""
+        if status:
+            self.input_overflows += bool(getattr(status, "input_overflow", False))
+            self.input_underflows += bool(getattr(status, "input_underflow", False))
+
+    def record_drops(self, samples):
+        """Count samples the analysis worker dropped since its previous report as one drop."""
+        if samples > 0:
+            self.dropped += samples
+            self.drop_events += 1
+
+    def record_arrival(self, arrival, frames):
+        """Record that a callback delivering frames samples arrived at time.perf_counter() arrival."""
+        if self.last_arrival is not None:
+            jitter = abs(arrival - self.last_arrival - self.last_frames / self.samplerate)
+            self.jitter += (jitter - self.jitter) * STATS_SMOOTHING
+            self.max_jitter = max(self.max_jitter, jitter)
+        self.last_arrival = arrival
+        self.last_frames = frames
+
+    def record_analysis(self, duration, queue_depth):
+        """Record how long one analysis took and how many samples were still queued."""
+        self.analyses += 1
+        self.analysis_duration += (duration - self.analysis_duration) * STATS_SMOOTHING
+        self.max_analysis_duration = max(self.max_analysis_duration, duration)
+        self.queue_depth = queue_depth
+        self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+
+    def xruns(self):
+        """Total input overflows, underflows and drops of the analysis worker.
+
+        Every count is of events, not samples, and never goes down while the
+        stream is reopened.
+        """
+        return self.input_overflows + self.input_underflows + self.drop_events
+
+    def load(self):
+        """Average callback plus analysis time as a fraction of the block period."""
+        return (self.callback_duration + self.analysis_duration) / self.block_period()
+
+    def block_period(self):
+        """Duration of one block of audio (s)."""
+        return self.blocksize / self.samplerate
+
+    def summary(self):
+        """One line summary of the statistics."""
+        period_ms = self.block_period() * 1000
+        return (
+            f"Audio stats: block {period_ms:.1f} ms, "
+            f"callback {self.callback_duration * 1000:.2f} ms (max {self.max_callback_duration * 1000:.2f}), "
+            f"analysis {self.analysis_duration * 1000:.2f} ms (max {self.max_analysis_duration * 1000:.2f}), "
+            f"queue {self.queue_depth} samples (max {self.max_queue_depth}), "
+            f"dropped {self.dropped} samples in {self.drop_events} drops, "
+            f"jitter {self.jitter * 1000:.2f} ms (max {self.max_jitter * 1000:.2f}), "
+            f"overflows {self.input_overflows}, underflows {self.input_underflows}"
+        )
@@ -0,0 +1,68 @@
+from functools import lru_cache
+import numpy as np
+
+DEFAULT_WINDOW = "hann"  # Window applied before each FFT
+REFERENCE_FFT_SIZE = 1024  # Magnitudes are scaled to match an unwindowed FFT of this size
+
+# Periodic windows, as used for overlapping analysis frames
+WINDOWS = {
+    "boxcar": np.ones,
+    "hann": lambda size: np.hanning(size + 1)[:-1],
+    "hamming": lambda size: np.hamming(size + 1)[:-1],
+    "blackman": lambda size: np.blackman(size + 1)[:-1],
+}
+
+
+@lru_cache(maxsize=16)
+def get_window(name, size):
+    """Return the named window of the given size, scaled for comparable magnitudes.
+
+    A full scale sine gives the same peak magnitude whatever the window and FFT
+    size, so show thresholds tuned for 1024 point unwindowed FFTs keep working.
+    """
+    if name not in WINDOWS:
+        raise ValueError(f"Unknown window '{name}', expected one of {', '.join(WINDOWS)}")
+    window = WINDOWS[name](size)
+    window *= REFERENCE_FFT_SIZE / window.sum()
+    window.flags.writeable = False
+    return window
+
+
+class StftBuffer:
+    """Rolling buffer of the most recent fft_size samples, advanced by hop_size.
+
+    Blocks of any length are pushed in and every time another hop_size samples
+    have arrived the buffer holds the next analysis frame, so the FFT size and
+    the overlap are independent of the audio blocksize.
+    """
+
+    def __init__(self, fft_size, hop_size, channels):
+        self.fft_size = fft_size
+        self.hop_size = hop_size
+        self.samples = np.zeros((fft_size, channels), dtype=np.float32)
+        self.pending = 0  # Samples received since the last analysis frame
+
+    def push(self, block):
+        """Add a block of samples, yielding each time an analysis frame is ready.
+
+        The value yielded is the number of samples of the block that the frame
+        includes, so callers can tell when its newest sample was captured.
+        """
+        offset = 0
+        while offset < len(block):
+            count = min(self.hop_size - self.pending, len(block) - offset)
+
+            self.append(block[offset:offset + count])
+            offset += count
+            self.pending += count
+            if self.pending == self.hop_size:
+                self.pending = 0
+                yield offset
+
+    def append(self, chunk):
+        """Shift out the oldest samples and append the new ones."""
+        chunk = chunk[-self.fft_size:]
+        if len(chunk) == 0:
+            return
+        self.samples[:-len(chunk)] = self.samples[len(chunk):]
+        self.samples[-len(chunk):] = chunk
@@ -0,0 +1,66 @@
+import threading
+import time
+import numpy as np
+
+MAX_BACKLOG_BLOCKS = 4  # Skip ahead when more blocks than this are waiting
+STATS_INTERVAL = 10  # Seconds between statistics reports
+
+
+class AnalysisWorker(threading.Thread):
+    """Runs the spectral analysis outside of the realtime audio callback.
+
+    The callback only copies samples into the ring buffer, this thread reads
+    them back one block at a time and hands each block to the engine. NumPy
+    releases the GIL during the FFT, so the callback is not held up.
+    """
+
+    def __init__(self, engine, ring, blocksize):
+        super().__init__(name="AnalysisWorker", daemon=True)
+        self.engine = engine
+        self.ring = ring
+        self.blocksize = blocksize
+        self.block = np.zeros((blocksize, ring.buffer.shape[1]), dtype=ring.buffer.dtype)
+        self.skipped = 0  # Samples skipped to catch up with the audio
+        self.reported = 0  # Samples dropped or skipped that are already in the stats
+        self.running = True
+
+    def run(self):
+        """Analyze blocks as they arrive until stopped."""
+        poll_interval = self.blocksize / self.engine.analyzer.samplerate / 4
+        last_report = time.monotonic()
+
+        while self.running:
+            # Catch up instead of falling further behind the audio
+            backlog = self.ring.available() - MAX_BACKLOG_BLOCKS * self.blocksize
+            if backlog > 0:
+                self.skipped += self.ring.skip(backlog)
+            self.report_drops()
+
+            if not self.ring.read(self.block):
+                time.sleep(poll_interval)
+                continue
+
+            start = time.perf_counter()
+            self.engine.analyze_block(self.block, self.capture_time())
+            self.engine.stats.record_analysis(time.perf_counter() - start, self.ring.available())
+
+            if time.monotonic() - last_report >= STATS_INTERVAL:
+                print(self.engine.stats.summary())
+                last_report = time.monotonic()
+
+    def report_drops(self):
+        """Add the samples dropped or skipped since the last report to the engine's stats."""
+        total = self.ring.dropped + self.skipped
+        self.engine.stats.record_drops(total - self.reported)
+        self.reported = total
+
+    def capture_time(self):
+        """Estimate when the block that was just read was captured."""
+        write_count, write_time = self.engine.last_write
+        return write_time - (write_count - self.ring.read_count + self.blocksize) / self.engine.analyzer.samplerate
+
+    def stop(self):
+        """Stop the worker and wait for it to finish."""
+        self.running = False
+        if self.is_alive():
+            self.join()
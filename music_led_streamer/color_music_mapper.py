@@ -1,3 +1,5 @@
+import math
+
 
 class ColorSoundMapper:
     def __init__(self, frequency_hz, wavelength_cm, notes, frequency_thz, wavelength_nm, red_dec_hex, green_dec_hex, blue_dec_hex, cyan_dec, magenta_dec, yellow_dec, hue_hsb, saturation_hsb, brightness_hsb):
@@ -58,6 +60,25 @@ class ColorSoundMapper:
             return instances[-1]
         return None
 
+    @classmethod
+    def find_by_note(cls, instances, frequency_hz):
+        """
+        Finds the instance of the note nearest to frequency_hz, in any octave.
+        The distance is measured in cents within the octave, wrapping at its edge, so a pitch
+        slightly flat or sharp of a note, or an octave off, still maps to the color of that note.
+        Assumes the list is sorted by frequency_hz.
+        :param frequency_hz: Frequency in Hz to match.
+        :return: ColorSoundMapper instance or None if there are no instances or the frequency is not positive.
+        """
+        if not instances or frequency_hz <= 0:
+            return None
+
+        def octave_distance(instance):
+            offset = math.log2(frequency_hz / instance.frequency_hz) % 1  # Octaves above the note, folded
+            return min(offset, 1 - offset)
+
+        return min(instances, key=octave_distance)
+
 # Example usage:
 # color_sound_instances = ColorSoundMapper.create_instances()
 # for instance in color_sound_instances:
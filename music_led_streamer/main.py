@@ -2,13 +2,27 @@ import typer
 import importlib
 import pygame
 import time
-from music_led_streamer.util import get_shows, setup_display, SHOWS_PATH, load_config
+from music_led_streamer.util import get_shows, setup_display, SHOWS_PATH, load_config, save_config
+from music_led_streamer.audio import engine as audio_engine
+from music_led_streamer.audio import calibration
+from music_led_streamer.render import display as show_display
 
 app = typer.Typer()
 
 # Global variable to store config path
 config_path = None
 
+# Settings of a configuration file written by calibrate when there is none yet
+DEFAULT_CONFIG = {
+    "command": "run",
+    "show": "stars",
+    "display": ":0",
+    "video_driver": "x11",
+    "screen_width": 800,
+    "screen_height": 480,
+    "fps": 30,
+}
+
 @app.command()
 def list_shows():
     """
@@ -37,7 +51,17 @@ def run(
     device_index: int = typer.Argument(1, help="Index of the audio device to use"),
     blocksize: int = typer.Argument(1024, help="Block size for audio processing"),
     latency: float = typer.Argument(0.1, help="Audio stream latency"),
-    fps: int = typer.Argument(30, help="Frames per second for the display")
+    fps: int = typer.Argument(30, help="Frames per second for the display"),
+    analysis_worker: bool = typer.Option(False, help="Analyze audio on a worker thread instead of in the audio callback"),
+    fft_size: int = typer.Option(0, help="FFT size of the audio analysis, 0 uses the block size"),
+    hop_size: int = typer.Option(0, help="Samples between audio analysis frames, 0 uses the FFT size"),
+    window: str = typer.Option("hann", help="Window applied before the FFT (hann, hamming, blackman or boxcar)"),
+    source: str = typer.Option("device", help="Audio source: 'device', 'file:<path>' (WAV or raw PCM), 'synth:<sine|sweep|noise|kick>' or 'replay:<recording>'"),
+    realtime: bool = typer.Option(True, help="Pace file, synthetic and replayed sources in real time"),
+    loop: bool = typer.Option(True, help="Restart file sources and replays when they end"),
+    record: str = typer.Option("", help="Record the analyzed features to this file, replay it with --source replay:<file>"),
+    adaptive_latency: bool = typer.Option(False, help="Raise the block size and latency on input overflows and lower them again when idle"),
+    dirty_rects: bool = typer.Option(False, help="Update only the parts of the screen that changed, for shows that report them")
 ):
     """
     Run a specific show by name.
@@ -45,12 +69,20 @@ def run(
     # Set up display
     screen = setup_display(display, video_driver, screen_width, screen_height)
     pygame.display.set_caption(f"Running Show: {show}")
+    show_display.set_dirty_rects(dirty_rects)
     show_module = None
 
     # Shared audio settings
     audio_settings = (samplerate, channels, device_index, blocksize, latency)
+    analysis_settings = (fft_size, hop_size, window)
+    source_settings = (source, realtime, loop)
 
     try:
+        # Start the shared audio engine, the show reads its features every frame
+        audio_engine.start(audio_settings, analysis_settings, analysis_worker=analysis_worker,
+                          source_settings=source_settings, record_path=record or None,
+                          adaptive_latency=adaptive_latency)
+
         # Import the selected show
         show_module = importlib.import_module(f"music_led_streamer.show.{show}")
 
@@ -73,6 +105,9 @@ def run(
                 typer.echo(f"Error: Show '{show}' does not have a 'render_step()' function.")
                 break
 
+            # Let the audio engine adapt its stream between frames
+            audio_engine.maintain()
+
             # Handle quit events
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -88,6 +123,7 @@ def run(
         # Cleanup resources
         if hasattr(show_module, "cleanup"):
             show_module.cleanup()
+        audio_engine.stop()
         pygame.quit()
 
 @app.command()
@@ -102,7 +138,17 @@ def rotate(
     blocksize: int = typer.Argument(1024, help="Block size for audio processing"),
     latency: float = typer.Argument(0.1, help="Audio stream latency"),
     timer: int = typer.Argument(30, help="Time in seconds before switching to the next show"),
-    fps: int = typer.Argument(30, help="Frames per second for the display")
+    fps: int = typer.Argument(30, help="Frames per second for the display"),
+    analysis_worker: bool = typer.Option(False, help="Analyze audio on a worker thread instead of in the audio callback"),
+    fft_size: int = typer.Option(0, help="FFT size of the audio analysis, 0 uses the block size"),
+    hop_size: int = typer.Option(0, help="Samples between audio analysis frames, 0 uses the FFT size"),
+    window: str = typer.Option("hann", help="Window applied before the FFT (hann, hamming, blackman or boxcar)"),
+    source: str = typer.Option("device", help="Audio source: 'device', 'file:<path>' (WAV or raw PCM), 'synth:<sine|sweep|noise|kick>' or 'replay:<recording>'"),
+    realtime: bool = typer.Option(True, help="Pace file, synthetic and replayed sources in real time"),
+    loop: bool = typer.Option(True, help="Restart file sources and replays when they end"),
+    record: str = typer.Option("", help="Record the analyzed features to this file, replay it with --source replay:<file>"),
+    adaptive_latency: bool = typer.Option(False, help="Raise the block size and latency on input overflows and lower them again when idle"),
+    dirty_rects: bool = typer.Option(False, help="Update only the parts of the screen that changed, for shows that report them")
 ):
     """Rotate through each show based on a timer. Press SPACEBAR to skip to the next show."""
     # List available shows
@@ -113,9 +159,17 @@ def rotate(
 
     screen = setup_display(display, video_driver, screen_width, screen_height)
     pygame.display.set_caption("Show Rotator")
+    show_display.set_dirty_rects(dirty_rects)
 
     # Shared audio settings
     audio_settings = (samplerate, channels, device_index, blocksize, latency)
+    analysis_settings = (fft_size, hop_size, window)
+    source_settings = (source, realtime, loop)
+
+    # The audio stream stays open while the shows are switched
+    audio_engine.start(audio_settings, analysis_settings, analysis_worker=analysis_worker,
+                       source_settings=source_settings, record_path=record or None,
+                       adaptive_latency=adaptive_latency)
 
     current_index = 0
     clock = pygame.time.Clock()
@@ -134,6 +188,7 @@ def rotate(
         show_module = importlib.import_module(f"music_led_streamer.show.{show_name}")
         if hasattr(show_module, "initialize"):
             show_module.initialize(audio_settings, screen)
+        show_display.invalidate()  # The new show starts from a full screen
 
     load_show(current_index)
 
@@ -153,6 +208,9 @@ def rotate(
             if hasattr(show_module, "render_step"):
                 show_module.render_step(screen)
 
+            # Let the audio engine adapt its stream between frames
+            audio_engine.maintain()
+
             # Handle events
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -170,8 +228,58 @@ def rotate(
 
     if show_module and hasattr(show_module, "cleanup"):
         show_module.cleanup()
+    audio_engine.stop()
     pygame.quit()
 
+@app.command()
+def calibrate(
+    device_index: int = typer.Argument(None, help="Index of the audio device to calibrate, prompts with the device list when omitted"),
+    samplerate: int = typer.Argument(44100, help="Sample rate for the audio stream"),
+    channels: int = typer.Argument(2, help="Number of audio channels"),
+    seconds: float = typer.Option(calibration.CALIBRATION_SECONDS, help="Seconds to measure each block size and latency"),
+    analysis_worker: bool = typer.Option(False, help="Analyze audio on a worker thread instead of in the audio callback"),
+    save: bool = typer.Option(True, help="Write the best settings to the configuration file")
+):
+    """
+    Measure an input device at several block sizes and latencies and save the best settings.
+    """
+    devices = calibration.list_input_devices()
+    if not devices:
+        typer.echo("No input devices found.")
+        raise typer.Exit(code=1)
+    typer.echo("Input devices:")
+    for index, name, max_channels, default_samplerate in devices:
+        typer.echo(f"- {index}: {name} ({max_channels} channels, {default_samplerate:.0f} Hz)")
+    if device_index is None:
+        device_index = typer.prompt("Device index", default=calibration.default_input_device(), type=int)
+
+    typer.echo(f"Calibrating device {device_index}, {seconds:g} seconds per setting...")
+    results = []
+    for blocksize, latency, stats in calibration.measure_settings(
+        device_index, samplerate, channels, seconds=seconds, analysis_worker=analysis_worker
+    ):
+        period = stats.block_period()
+        typer.echo(
+            f"blocksize {blocksize:5d}, latency {latency:.3f} s: "
+            f"jitter {stats.jitter / period:.0%} of block (max {stats.max_jitter / period:.0%}), "
+            f"analysis {stats.load():.0%} of block, xruns {stats.xruns()}"
+            + (", stable" if calibration.is_stable(stats) else "")
+        )
+        results.append((blocksize, latency, stats))
+
+    best = calibration.best_settings(results)
+    if best is None:
+        typer.echo(f"Device {device_index} could not be opened with any setting.")
+        raise typer.Exit(code=1)
+    blocksize, latency = best
+    typer.echo(f"Best settings: blocksize {blocksize}, latency {latency} s")
+
+    if save:
+        settings = load_config(config_path) or dict(DEFAULT_CONFIG)
+        settings.update(device_index=device_index, samplerate=samplerate, channels=channels,
+                        blocksize=blocksize, latency=latency)
+        save_config(config_path, settings)
+
 def config():
     """Default command function if no command is provided."""
     print("No command provided. Looking for available configuration file...")
@@ -190,7 +298,17 @@ def config():
                 device_index=config["device_index"], 
                 blocksize=config["blocksize"], 
                 latency=config["latency"],
-                fps=config["fps"]
+                fps=config["fps"],
+                analysis_worker=config.get("analysis_worker", False),
+                fft_size=config.get("fft_size", 0),
+                hop_size=config.get("hop_size", 0),
+                window=config.get("window", "hann"),
+                source=config.get("source", "device"),
+                realtime=config.get("realtime", True),
+                loop=config.get("loop", True),
+                record=config.get("record", ""),
+                adaptive_latency=config.get("adaptive_latency", False),
+                dirty_rects=config.get("dirty_rects", False)
             )
         elif config["command"] == "rotate":
             rotate(display=config["display"], 
@@ -203,7 +321,17 @@ def config():
                 blocksize=config["blocksize"], 
                 latency=config["latency"],
                 timer=config["timer"],
-                fps=config["fps"]
+                fps=config["fps"],
+                analysis_worker=config.get("analysis_worker", False),
+                fft_size=config.get("fft_size", 0),
+                hop_size=config.get("hop_size", 0),
+                window=config.get("window", "hann"),
+                source=config.get("source", "device"),
+                realtime=config.get("realtime", True),
+                loop=config.get("loop", True),
+                record=config.get("record", ""),
+                adaptive_latency=config.get("adaptive_latency", False),
+                dirty_rects=config.get("dirty_rects", False)
             )
     else:
         print("No configuration found. Will 'run` with defaults...")
@@ -213,8 +341,8 @@ def config():
 def main(config_file: str = None):
     """Global option to define a custom configuration file."""
     global config_path
-    print(f"Accepting config path: {config}")
-    config_path = config  # Store in global variable
+    print(f"Accepting config path: {config_file}")
+    config_path = config_file  # Store in global variable
 
 if __name__ == "__main__":
     import sys
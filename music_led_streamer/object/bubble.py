@@ -1,11 +1,65 @@
+import functools
 import pygame
 import random
 import math
 
+MAX_RADIUS = 150  # Largest bubble size
+RADIUS_STEP = 2  # Bubble radii up to FINE_MAX_RADIUS are rounded to a multiple of this many pixels
+FINE_MAX_RADIUS = 30  # Above this radius growth steps are hard to see, so sprites are coarser
+COARSE_RADIUS_STEP = 6  # Larger bubble radii are rounded to a multiple of this many pixels
+COLOR_STEP = 8  # Bubble color channels are rounded to a multiple of this
+WARM_MAX_RADIUS = 30  # Largest radius pre-rendered by warm_bubble_sprites
+PALETTE_COLORS = 3  # Colors in a bubble palette
+
+# Sprite radii of the full size range, 15 fine and 20 coarse ones
+SPRITE_RADII = (*range(RADIUS_STEP, FINE_MAX_RADIUS + 1, RADIUS_STEP),
+                *range(FINE_MAX_RADIUS + COARSE_RADIUS_STEP, MAX_RADIUS + 1, COARSE_RADIUS_STEP))
+
+# Every radius in the colors of the current palette and of the one before a switch,
+# about 10 MB of sprites per palette, 20 MB in all
+BUBBLE_CACHE_SIZE = 2 * PALETTE_COLORS * len(SPRITE_RADII)
+
+
+def quantize_radius(size):
+    """Round a bubble size to the radius of its sprite, one of SPRITE_RADII or 0."""
+    size = min(size, MAX_RADIUS)
+    step = RADIUS_STEP if size <= FINE_MAX_RADIUS else COARSE_RADIUS_STEP
+    return int(round(size / step)) * step
+
+def quantize_color(color):
+    """Round a color to the color of its sprite."""
+    return tuple(min(255, int(round(channel / COLOR_STEP)) * COLOR_STEP) for channel in color[:3])
+
+@functools.lru_cache(maxsize=BUBBLE_CACHE_SIZE)
+def bubble_sprite(radius, color):
+    """Return the (cached) bubble of a radius and color, with its radial gradient and highlight."""
+    bubble_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    center = (radius, radius)
+
+    # Radial gradient for the bubble
+    for i in range(radius, 0, -1):
+        alpha = int(255 * (i / radius))  # Fades out toward the edge
+        pygame.draw.circle(bubble_surface, (*color, alpha), center, i)
+
+    # Draw highlight (light reflection)
+    highlight_x = int(radius * 0.35)  # Top-left position
+    highlight_y = int(radius * 0.35)
+    highlight_radius = max(1, int(radius * 0.2))
+    pygame.draw.circle(bubble_surface, (255, 255, 255, 150), (highlight_x, highlight_y), highlight_radius)
+    return bubble_surface
+
+def warm_bubble_sprites(colors, max_radius=WARM_MAX_RADIUS):
+    """Pre-render the sprites of every radius up to max_radius in each color, e.g. on a palette switch."""
+    for color in colors:
+        for radius in range(RADIUS_STEP, max_radius + 1, RADIUS_STEP):
+            bubble_sprite(radius, quantize_color(color))
+
+
 class Bubble:
     """Represents a bubble with visual effects.
 
     Bubbles have a position, size, speed, color, and can move and be drawn on the screen.
+    The bubble itself is a cached sprite, its size and color are rounded to the nearest sprite.
     """
     def __init__(self, x, y, size, speed, color):
         """Initialize the bubble with its position, size, speed, and color."""
@@ -19,22 +73,15 @@ class Bubble:
         """Move the bubble upward based on its speed and treble intensity."""
         self.y -= self.speed * (1 + treble_intensity * 10)
 
+    def sprite(self):
+        """Return the bubble's (sprite, position) for Surface.blits, None while it is too small to see."""
+        radius = quantize_radius(self.size)
+        if radius <= 0:
+            return None
+        return bubble_sprite(radius, quantize_color(self.color)), (int(self.x - radius), int(self.y - radius))
+
     def draw(self, screen):
         """Draw the bubble with a radial gradient, highlight, and glow."""
-        bubble_surface = pygame.Surface((int(self.size * 2), int(self.size * 2)), pygame.SRCALPHA)
-        center = (int(self.size), int(self.size))
-
-        # Radial gradient for the bubble
-        for i in range(int(self.size), 0, -1):
-            alpha = int(255 * (i / self.size))  # Fades out toward the edge
-            color_with_alpha = (*self.color, alpha)
-            pygame.draw.circle(bubble_surface, color_with_alpha, center, i)
-
-        # Draw highlight (light reflection)
-        highlight_x = int(self.size * 0.35)  # Top-left position
-        highlight_y = int(self.size * 0.35)
-        highlight_radius = max(1, int(self.size * 0.2))
-        pygame.draw.circle(bubble_surface, (255, 255, 255, 150), (highlight_x, highlight_y), highlight_radius)
-
-        # Draw bubble surface to the screen
-        screen.blit(bubble_surface, (int(self.x - self.size), int(self.y - self.size)))
+        sprite = self.sprite()
+        if sprite:
+            screen.blit(*sprite)
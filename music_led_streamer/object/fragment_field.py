@@ -0,0 +1,125 @@
+import numpy as np
+import pygame
+from music_led_streamer.render.splat import flat_pixels, map_colors
+
+MAX_ANGLE = 45  # Fragment rotations are clamped to 0 up to this many degrees
+ANGLE_STEP = 5  # Fragment rotations are rounded to a multiple of this many degrees
+EASING = 0.2  # Share of the distance to its target a fragment moves each frame
+
+
+def quantize_angle(degrees):
+    """Clamp a rotation (degrees) to 0-MAX_ANGLE and round it to the angle of its rotated fragment sprites.
+
+    The rotation follows the unbounded midrange level, the clamp keeps the
+    rotated sprites to a few fixed angles.
+    """
+    return int(round(min(max(degrees, 0), MAX_ANGLE) / ANGLE_STEP)) * ANGLE_STEP
+
+class FragmentField:
+    """Moves a grid of image fragments as NumPy arrays instead of ImageFragment objects.
+
+    Each fragment drifts away from the center with the bass and falls with
+    the treble exactly like an ImageFragment, but one update moves all of
+    them. The fragments share one rotation, so draw blits them all in one
+    Surface.blits call from sprites rotated once per angle step, and
+    draw_remap moves the pixels of the whole image in one scatter instead.
+    """
+
+    def __init__(self, image, origin, fragment_size, grid, center):
+        """Cut the top left grid (columns, rows) of fragment_size pieces out of image, placed at origin."""
+        columns, rows = grid
+        width, height = fragment_size
+        self.fragment_size = fragment_size
+        self.origin = origin
+        column, row = np.meshgrid(np.arange(columns), np.arange(rows))
+        self.offset_x = (column.ravel() * width).astype(float)
+        self.offset_y = (row.ravel() * height).astype(float)
+        self.start_x = origin[0] + self.offset_x
+        self.start_y = origin[1] + self.offset_y
+
+        # Fragments move outward along the (normalized) line from the center
+        dir_x = self.start_x - center[0]
+        dir_y = self.start_y - center[1]
+        magnitude = np.maximum(np.hypot(dir_x, dir_y), 1)
+        self.dir_x = dir_x / magnitude
+        self.dir_y = dir_y / magnitude
+
+        self.x = self.start_x.copy()
+        self.y = self.start_y.copy()
+        self.angle = 0
+        self.sprites = [image.subsurface(pygame.Rect(x, y, width, height)).copy()
+                        for x, y in zip(self.offset_x.astype(int).tolist(), self.offset_y.astype(int).tolist())]
+
+        # Every pixel of the grid, with the fragment it belongs to, for draw_remap
+        region = pygame.surfarray.array3d(image)[:columns * width, :rows * height]
+        pixel_x, pixel_y = np.meshgrid(np.arange(columns * width), np.arange(rows * height), indexing="ij")
+        self.pixel_x, self.pixel_y = pixel_x.ravel(), pixel_y.ravel()
+        self.pixel_owner = (self.pixel_y // height) * columns + self.pixel_x // width
+        self.pixel_colors = region.reshape(-1, 3)
+        self.mapped = {}  # Pixel values of the image, per screen pixel format
+        self.rotations = {}  # Rotated sprites with their half sizes, per angle step
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def update(self, bass, midrange, treble, base_fragment_speed, space_expansion_factor, rotate_expansion_factor=25):
+        """Ease every fragment toward its target, as ImageFragment.update does for one."""
+        spacing = int(bass * space_expansion_factor)
+        speed_boost = int(treble * base_fragment_speed)
+
+        target_x = self.start_x + spacing * self.dir_x
+        target_y = self.start_y + spacing * self.dir_y + speed_boost
+        self.x += (target_x - self.x) * EASING
+        self.y += (target_y - self.y) * EASING
+
+        self.angle = midrange * rotate_expansion_factor
+
+    def rotated_sprites(self, degrees):
+        """Return the fragment sprites rotated by quantized degrees, with their half widths and heights.
+
+        Each angle step is rotated once and kept, there are at most
+        MAX_ANGLE / ANGLE_STEP + 1 of them.
+        """
+        if degrees in self.rotations:
+            return self.rotations[degrees]
+        sprites = self.sprites if degrees == 0 else [pygame.transform.rotate(sprite, degrees) for sprite in self.sprites]
+        sizes = np.array([sprite.get_size() for sprite in sprites]).reshape(-1, 2)
+        self.rotations[degrees] = sprites, sizes[:, 0] // 2, sizes[:, 1] // 2
+        return self.rotations[degrees]
+
+    def centers(self):
+        """Return the pixel centers of the fragments, rounded like the center of a pygame.Rect."""
+        width, height = self.fragment_size
+        return np.floor(self.x + width // 2 + 0.5).astype(int), np.floor(self.y + height // 2 + 0.5).astype(int)
+
+    def draw(self, screen):
+        """Blit every fragment, rotated about its center, in one Surface.blits call."""
+        sprites, half_widths, half_heights = self.rotated_sprites(quantize_angle(self.angle))
+        center_x, center_y = self.centers()
+        left = center_x - half_widths
+        top = center_y - half_heights
+        screen.blits(list(zip(sprites, zip(left.tolist(), top.tolist()))), doreturn=False)
+
+    def draw_remap(self, screen):
+        """Move every pixel of the image with its fragment in one scatter, ignoring the rotation.
+
+        Falls back to draw on screens without a flat 32-bit pixel view.
+        """
+        pixels = flat_pixels(screen)
+        if pixels is None:
+            self.draw(screen)
+            return
+        key = (screen.get_masks(), screen.get_shifts(), screen.get_losses())
+        if key not in self.mapped:
+            self.mapped[key] = map_colors(screen, self.pixel_colors)
+
+        width, height = self.fragment_size
+        center_x, center_y = self.centers()
+        shift_x = center_x - width // 2 - self.offset_x.astype(int)
+        shift_y = center_y - height // 2 - self.offset_y.astype(int)
+        xs = self.pixel_x + shift_x[self.pixel_owner]
+        ys = self.pixel_y + shift_y[self.pixel_owner]
+        width, height = screen.get_size()
+        visible = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        pixels[ys[visible] * width + xs[visible]] = self.mapped[key][visible]
+        del pixels  # Unlock the screen
@@ -1,93 +1,39 @@
-import random
-import pygame
+import numpy as np
+from music_led_streamer.render.splat import BLEND_MAX, splat_disks
 
-class Particle:
-    def __init__(self, x, y, color, size,  midrange, treble):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = size
-        # self.speed_x = speed_x
-        self.speed_x = random.uniform(-1, 1) * (1 + midrange * 2 + treble * 0.5)  # Speed influenced by midrange and treble
-        self.speed_y = random.uniform(-1, 1) * (1 + midrange * 2 + treble * 0.5)
-        # self.speed_y = speed_y
-        self.life = 75  # Particle lifespan (affects fading)
+PARTICLE_LIFE = 75  # Frames a particle lives
+RING_LIFE = 50  # Frames a ring lives
+FADE_LIFE = 100  # Life at which particles and rings are drawn at full color
 
-    def move(self):
-        """Move the particle based on its speed."""
-        self.x += self.speed_x
-        self.y += self.speed_y
-        self.life -= 1  # Decrease life to simulate fading
 
-    def is_alive(self):
-        """Check if the particle is still alive."""
-        return self.life > 0
+def particle_velocities(count, midrange, treble):
+    """Random velocities in both axes, faster with the midrange and treble."""
+    speed = 1 + midrange * 2 + treble * 0.5
+    return np.random.uniform(-1, 1, count) * speed, np.random.uniform(-1, 1, count) * speed
 
-    def draw(self, screen):
-        """Draw the particle on the screen with fading."""
-        alpha = max(0, self.life / 100)  # Calculate alpha for fading
-        faded_color = (
-            int(self.color[0] * alpha),
-            int(self.color[1] * alpha),
-            int(self.color[2] * alpha),
-        )
-        pygame.draw.circle(screen, faded_color, (int(self.x), int(self.y)), self.size)
+def spawn_particles(store, count, x, y, color, size, midrange, treble):
+    """Spawn count particles of the given size (a scalar or count sizes) at a point."""
+    vx, vy = particle_velocities(count, midrange, treble)
+    return store.spawn(count, x=x, y=y, vx=vx, vy=vy, color=color, radius=size, life=PARTICLE_LIFE)
 
-class RingExpandingParticle:
-    def __init__(self, x, y, color, initial_radius, bass):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.radius = initial_radius
-        #self.expansion_rate = expansion_rate
-        self.expansion_rate = 1 + bass * 0.25  # Expansion rate based on bass frequency
-        self.life = 50  # Lifespan of the ring
+def draw_particles(screen, store):
+    """Draw the particles as circles that fade with their life."""
+    colors = store.faded_colors(store["life"] / FADE_LIFE)
+    splat_disks(screen, store["x"].astype(int), store["y"].astype(int), store["radius"], colors)
 
-    def expand(self):
-        """Expand the ring and reduce its life."""
-        self.radius += self.expansion_rate
-        self.life -= 1
+def spawn_rings(store, count, x, y, color, radius, growth):
+    """Spawn count rings at a point that grow (or shrink, with a negative growth) every step."""
+    return store.spawn(count, x=x, y=y, color=color, radius=radius, growth=growth, life=RING_LIFE)
 
-    def is_alive(self):
-        """Check if the ring is still visible."""
-        return self.life > 0
+def cull_rings(store):
+    """Drop rings without life and collapsing rings that shrank to nothing."""
+    store.cull((store["life"] > 0) & (store["radius"] > 0))
 
-    def draw(self, screen):
-        """Draw the ring with fading effect."""
-        alpha = max(0, self.life / 100)  # Calculate fading alpha
-        faded_color = (
-            int(self.color[0] * alpha),
-            int(self.color[1] * alpha),
-            int(self.color[2] * alpha),
-        )
-        pygame.draw.circle(screen, faded_color, (int(self.x), int(self.y)), int(self.radius), int(self.life / 4))
+def draw_rings(screen, store):
+    """Draw the rings with outlines that thin and fade with their life.
 
-class RingCollapsingParticle:
-    def __init__(self, x, y, color, initial_radius, bass):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.initial_radius = initial_radius
-        self.radius = initial_radius
-        self.shrink_rate = 1 + bass * 0.25  # Shrink rate based on bass frequency
-        self.life = 50  # Lifespan of the ring
-
-    def expand(self):
-        """Shrink the ring and reduce its life."""
-        self.radius -= self.shrink_rate
-        self.life -= 1
-
-    def is_alive(self):
-        """Check if the ring is still visible."""
-        return self.radius > 0 and self.life > 0
-
-    def draw(self, screen):
-        """Draw the ring with fading effect."""
-        alpha = max(0, self.life / 100)  # Calculate fading alpha
-        faded_color = (
-            int(self.color[0] * alpha),
-            int(self.color[1] * alpha),
-            int(self.color[2] * alpha),
-        )
-        if self.radius > 0:  # Only draw if the radius is positive
-            pygame.draw.circle(screen, faded_color, (int(self.x), int(self.y)), int(self.radius), int(self.life / 4))
+    Overlapping rings keep the brightest color instead of the last drawn one.
+    """
+    colors = store.faded_colors(store["life"] / FADE_LIFE)
+    widths = store["life"] / 4
+    splat_disks(screen, store["x"].astype(int), store["y"].astype(int), store["radius"], colors, widths, BLEND_MAX)
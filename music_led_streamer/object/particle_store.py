@@ -0,0 +1,85 @@
+import numpy as np
+
+DEFAULT_CAPACITY = 256  # Particles preallocated by a store, it doubles when full
+CORE_FIELDS = ("x", "y", "vx", "vy", "life", "radius", "growth")
+
+
+class ParticleStore:
+    """Keeps a particle system as NumPy arrays, one per field, instead of objects.
+
+    Every field is a preallocated array and the live particles are its first
+    len(store) entries, so a step moves, grows and ages every particle with a
+    few array operations. cull compacts the survivors to the front in the
+    same way, rather than removing dead particles from a list one by one.
+    Besides the CORE_FIELDS and the (n, 3) color array, a store holds the
+    float fields a system needs, such as the points of a star.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, fields=()):
+        self.count = 0
+        self.arrays = {name: np.zeros(capacity) for name in (*CORE_FIELDS, *fields)}
+        self.arrays["color"] = np.zeros((capacity, 3), dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        """Return the live part of a field, a view that can be updated in place."""
+        return self.arrays[name][:self.count]
+
+    def capacity(self):
+        return len(self.arrays["x"])
+
+    def reserve(self, capacity):
+        """Grow every array, by doubling, to hold at least capacity particles."""
+        new_capacity = self.capacity()
+        while new_capacity < capacity:
+            new_capacity *= 2
+        if new_capacity == self.capacity():
+            return
+        for name, array in self.arrays.items():
+            grown = np.zeros((new_capacity, *array.shape[1:]), dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            self.arrays[name] = grown
+
+    def spawn(self, count, **values):
+        """Add count particles and return the slice they occupy.
+
+        Each value is a scalar or an array of count values, fields that are not
+        given start at zero.
+        """
+        if count <= 0:
+            return slice(self.count, self.count)
+        self.reserve(self.count + count)
+        spawned = slice(self.count, self.count + count)
+        for name, array in self.arrays.items():
+            array[spawned] = values.pop(name, 0)
+        if values:
+            raise KeyError(f"Unknown particle fields: {', '.join(values)}")
+        self.count += count
+        return spawned
+
+    def step(self, decay=1):
+        """Move every particle by its velocity, grow its radius and reduce its life by decay."""
+        self["x"][:] += self["vx"]
+        self["y"][:] += self["vy"]
+        self["radius"][:] += self["growth"]
+        self["life"][:] -= decay
+
+    def cull(self, alive=None):
+        """Drop dead particles, by default those without life, keeping the order of the rest."""
+        if alive is None:
+            alive = self["life"] > 0
+        survivors = int(np.count_nonzero(alive))
+        if survivors == self.count:
+            return
+        for array in self.arrays.values():
+            array[:survivors] = array[:self.count][alive]
+        self.count = survivors
+
+    def clear(self):
+        self.count = 0
+
+    def faded_colors(self, scale):
+        """Return the colors multiplied by a per-particle scale (clipped to 0-1)."""
+        return (self["color"] * np.clip(scale, 0, 1)[:, np.newaxis]).astype(np.uint8)
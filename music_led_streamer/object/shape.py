@@ -1,8 +1,44 @@
+import functools
 import pygame
 import random
 import math
 from music_led_streamer.util import hsv_to_rgb
 
+SHAPE_CACHE_SIZE = 256  # Shape sprites kept in the atlas
+ROTATED_CACHE_SIZE = 512  # Rotated shape sprites kept
+SIZE_STEP = 2  # Shape sizes are rounded to a multiple of this many pixels
+ANGLE_STEP = 6  # Rotations are rounded to a multiple of this many degrees
+ROTATING_SHAPES = ('circle', 'spiral', 'wave', 'polygon')
+POLYGON_SIDES = (6, 10)  # Range of the number of sides of polygon shapes
+
+
+def quantize_size(size):
+    """Round a shape size to the size of its sprite."""
+    return int(round(size / SIZE_STEP)) * SIZE_STEP
+
+def quantize_angle(angle):
+    """Round a rotation (degrees) to the angle of its cached sprite."""
+    return int(round(angle / ANGLE_STEP)) * ANGLE_STEP % 360
+
+@functools.lru_cache(maxsize=SHAPE_CACHE_SIZE)
+def shape_sprite(shape_type, size, color, num_sides=0):
+    """Return the (cached) opaque sprite of a shape type, size and color, drawn once."""
+    surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    if num_sides:
+        Shape.draw_polygon(surf, size, color, num_sides)
+    else:
+        getattr(Shape, f"draw_{shape_type}")(surf, size, color)
+    return surf
+
+@functools.lru_cache(maxsize=ROTATED_CACHE_SIZE)
+def rotated_shape_sprite(shape_type, size, color, num_sides, angle):
+    """Return the (cached) shape sprite rotated by a quantized angle."""
+    sprite = shape_sprite(shape_type, size, color, num_sides)
+    if angle == 0:
+        return sprite
+    return pygame.transform.rotate(sprite, angle)
+
+
 # Shape Class
 class Shape:
     def __init__(self, x, y, size, color, lifetime, treble, midrange, bass):
@@ -32,6 +68,9 @@ class Shape:
         ])
         #self.shape_type = "circle"
 
+        # Polygons keep the number of sides they were created with
+        self.num_sides = random.randint(*POLYGON_SIDES) if self.shape_type == 'polygon' else 0
+
         # Vertical movement based on treble (higher treble moves upward)
         if treble > bass + midrange:
             self.dy = -1 * (treble / 10)  # Upward motion
@@ -49,14 +88,15 @@ class Shape:
                 self.dx = midrange / 10  # Rightward motion
 
     
-    def update(self, dt):
+    def update(self, dt, screen_size=None):
+        """Move and age the shape, screen_size is looked up from the display when not given."""
         self.age += dt
         # Update position based on direction
         self.x += self.dx
         self.y += self.dy
 
         # Keep shapes on screen by wrapping around
-        screen_width, screen_height = pygame.display.get_surface().get_size()
+        screen_width, screen_height = screen_size or pygame.display.get_surface().get_size()
         self.x %= screen_width
         self.y %= screen_height
 
@@ -100,175 +140,188 @@ class Shape:
 
         return self.age < self.lifetime  # Return False if the shape is expired
 
-    def draw(self, screen):
-        
-         # Convert HSB to RGB for color
-        # rgb = hsv_to_rgb(self.hue, self.saturation, self.brightness)
-        # self.color = tuple(int(c * 255) for c in rgb)
-
-        surf = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
+    def sprite_key(self):
+        """Return the atlas key of the shape's sprite, its size rounded to SIZE_STEP."""
+        return self.shape_type, quantize_size(self.size), tuple(self.color), self.num_sides
 
-        draw_method = getattr(self, f"draw_{self.shape_type}", None)
-        if draw_method:
-            draw_method(surf)
-        
-         # Rotate surface for spinning shapes
-        if self.shape_type in ['circle', 'spiral', 'wave', 'polygon']:
-            surf = pygame.transform.rotate(surf, self.angle)
+    def draw(self, screen):
+        """Blit the shape's atlas sprite, rotated for spinning shapes, at the shape's alpha."""
+        shape_type, size, color, num_sides = self.sprite_key()
+        if size <= 0:
+            return
+
+        # Rotate surface for spinning shapes
+        if shape_type in ROTATING_SHAPES:
+            surf = rotated_shape_sprite(shape_type, size, color, num_sides, quantize_angle(self.angle))
+        else:
+            surf = shape_sprite(shape_type, size, color, num_sides)
 
-        screen.blit(surf, (self.x - self.size, self.y - self.size))
+        # Sprites are shared, the alpha only has to hold until the blit
+        surf.set_alpha(self.alpha)
+        width, height = surf.get_size()
+        screen.blit(surf, (self.x - width // 2, self.y - height // 2))
 
-    def draw_circle(self, surf):
+    @staticmethod
+    def draw_circle(surf, size, color):
         """Draws a circle shape."""
-        pygame.draw.circle(surf, (*self.color, self.alpha), (self.size, self.size), self.size)
+        pygame.draw.circle(surf, color, (size, size), size)
 
-    def draw_star(self, surf):
+    @staticmethod
+    def draw_star(surf, size, color):
         """Draws a star shape."""
         points = []
         num_points = 5
         for i in range(num_points * 2):
             angle = i * math.pi / num_points
-            radius = self.size if i % 2 == 0 else self.size / 2
-            x = int(self.size + radius * math.cos(angle))
-            y = int(self.size + radius * math.sin(angle))
+            radius = size if i % 2 == 0 else size / 2
+            x = int(size + radius * math.cos(angle))
+            y = int(size + radius * math.sin(angle))
             points.append((x, y))
-        pygame.draw.polygon(surf, (*self.color, self.alpha), points)
+        pygame.draw.polygon(surf, color, points)
 
-    def draw_snowflake(self, surf):
+    @staticmethod
+    def draw_snowflake(surf, size, color):
         """Draws a snowflake-like pattern."""
         for i in range(6):  # 6 arms for a snowflake
             angle = i * math.pi / 3
-            end_x = int(self.size + self.size * math.cos(angle))
-            end_y = int(self.size + self.size * math.sin(angle))
-            pygame.draw.line(surf, (*self.color, self.alpha), (self.size, self.size), (end_x, end_y), 2)
+            end_x = int(size + size * math.cos(angle))
+            end_y = int(size + size * math.sin(angle))
+            pygame.draw.line(surf, color, (size, size), (end_x, end_y), 2)
 
-    def draw_polygon(self, surf):
-        """Draws a random polygon with 6-10 sides."""
-        num_sides = random.randint(6, 10)
-        points = []
-        for i in range(num_sides):
-            angle = i * 2 * math.pi / num_sides
-            x = int(self.size + self.size * math.cos(angle))
-            y = int(self.size + self.size * math.sin(angle))
-            points.append((x, y))
-        pygame.draw.polygon(surf, (*self.color, self.alpha), points)
+    @staticmethod
+    def draw_polygon(surf, size, color, num_sides=POLYGON_SIDES[0]):
+        """Draws a polygon with num_sides sides, each polygon shape picks 6-10 sides."""
+        Shape.draw_regular_polygon(surf, size, color, num_sides)
 
-    def draw_diamond(self, surf):
+    @staticmethod
+    def draw_diamond(surf, size, color):
         """Draws a diamond shape."""
         points = [
-            (self.size, 0),  # Top
-            (2 * self.size, self.size),  # Right
-            (self.size, 2 * self.size),  # Bottom
-            (0, self.size)  # Left
+            (size, 0),  # Top
+            (2 * size, size),  # Right
+            (size, 2 * size),  # Bottom
+            (0, size)  # Left
         ]
-        pygame.draw.polygon(surf, (*self.color, self.alpha), points)
+        pygame.draw.polygon(surf, color, points)
 
-    def draw_spiral(self, surf):
+    @staticmethod
+    def draw_spiral(surf, size, color):
         """Draws a spiral pattern."""
-        center = (self.size, self.size)
+        center = (size, size)
         for i in range(20):
             angle = i * 0.3
             radius = i * 2
             x = int(center[0] + radius * math.cos(angle))
             y = int(center[1] + radius * math.sin(angle))
-            pygame.draw.circle(surf, (*self.color, self.alpha), (x, y), 2)
+            pygame.draw.circle(surf, color, (x, y), 2)
 
-    def draw_heart(self, surf):
+    @staticmethod
+    def draw_heart(surf, size, color):
         """Draws a heart shape."""
         for angle in range(0, 360, 5):
             theta = math.radians(angle)
-            x = int(self.size + self.size * 0.5 * (16 * math.sin(theta) ** 3))
-            y = int(self.size - self.size * 0.5 * (13 * math.cos(theta) - 5 * math.cos(2 * theta) - 2 * math.cos(3 * theta) - math.cos(4 * theta)))
-            pygame.draw.circle(surf, (*self.color, self.alpha), (x, y), 2)
+            x = int(size + size * 0.5 * (16 * math.sin(theta) ** 3))
+            y = int(size - size * 0.5 * (13 * math.cos(theta) - 5 * math.cos(2 * theta) - 2 * math.cos(3 * theta) - math.cos(4 * theta)))
+            pygame.draw.circle(surf, color, (x, y), 2)
 
-    def draw_burst(self, surf):
+    @staticmethod
+    def draw_burst(surf, size, color):
         """Draws a burst shape with radial lines."""
-        center = (self.size, self.size)
+        center = (size, size)
         for i in range(12):
             angle = i * math.pi / 6
-            end_x = int(center[0] + self.size * math.cos(angle))
-            end_y = int(center[1] + self.size * math.sin(angle))
-            pygame.draw.line(surf, (*self.color, self.alpha), center, (end_x, end_y), 2)
+            end_x = int(center[0] + size * math.cos(angle))
+            end_y = int(center[1] + size * math.sin(angle))
+            pygame.draw.line(surf, color, center, (end_x, end_y), 2)
 
-    def draw_wave(self, surf):
+    @staticmethod
+    def draw_wave(surf, size, color):
         """Draws a wavy line."""
         points = []
-        for x in range(0, 2 * self.size, 4):
-            y = int(self.size + 10 * math.sin(2 * math.pi * x / self.size))
+        for x in range(0, 2 * size, 4):
+            y = int(size + 10 * math.sin(2 * math.pi * x / size))
             points.append((x, y))
         if len(points) >= 2:
-            pygame.draw.lines(surf, (*self.color, self.alpha), False, points, 2)
+            pygame.draw.lines(surf, color, False, points, 2)
     
-    def draw_pentagon(self, surf):
+    @staticmethod
+    def draw_pentagon(surf, size, color):
         """Draws a pentagon shape."""
-        self.draw_regular_polygon(surf, 5)
+        Shape.draw_regular_polygon(surf, size, color, 5)
 
-    def draw_hexagon(self, surf):
+    @staticmethod
+    def draw_hexagon(surf, size, color):
         """Draws a hexagon shape."""
-        self.draw_regular_polygon(surf, 6)
+        Shape.draw_regular_polygon(surf, size, color, 6)
 
-    def draw_cross(self, surf):
+    @staticmethod
+    def draw_cross(surf, size, color):
         """Draws a cross shape."""
         points = [
-            (self.size - self.size // 3, self.size - self.size // 2),
-            (self.size + self.size // 3, self.size - self.size // 2),
-            (self.size + self.size // 3, self.size - self.size // 3),
-            (self.size + self.size // 2, self.size - self.size // 3),
-            (self.size + self.size // 2, self.size + self.size // 3),
-            (self.size + self.size // 3, self.size + self.size // 3),
-            (self.size + self.size // 3, self.size + self.size // 2),
-            (self.size - self.size // 3, self.size + self.size // 2),
-            (self.size - self.size // 3, self.size + self.size // 3),
-            (self.size - self.size // 2, self.size + self.size // 3),
-            (self.size - self.size // 2, self.size - self.size // 3),
-            (self.size - self.size // 3, self.size - self.size // 3),
+            (size - size // 3, size - size // 2),
+            (size + size // 3, size - size // 2),
+            (size + size // 3, size - size // 3),
+            (size + size // 2, size - size // 3),
+            (size + size // 2, size + size // 3),
+            (size + size // 3, size + size // 3),
+            (size + size // 3, size + size // 2),
+            (size - size // 3, size + size // 2),
+            (size - size // 3, size + size // 3),
+            (size - size // 2, size + size // 3),
+            (size - size // 2, size - size // 3),
+            (size - size // 3, size - size // 3),
         ]
-        pygame.draw.polygon(surf, (*self.color, self.alpha), points)
+        pygame.draw.polygon(surf, color, points)
 
-    def draw_flower(self, surf):
+    @staticmethod
+    def draw_flower(surf, size, color):
         """Draws a flower pattern."""
-        center = (self.size, self.size)
+        center = (size, size)
         for i in range(6):
             angle = i * math.pi / 3
-            petal_x = int(center[0] + self.size * math.cos(angle))
-            petal_y = int(center[1] + self.size * math.sin(angle))
-            pygame.draw.circle(surf, (*self.color, self.alpha), (petal_x, petal_y), self.size // 3)
+            petal_x = int(center[0] + size * math.cos(angle))
+            petal_y = int(center[1] + size * math.sin(angle))
+            pygame.draw.circle(surf, color, (petal_x, petal_y), size // 3)
 
-    def draw_arrow(self, surf):
+    @staticmethod
+    def draw_arrow(surf, size, color):
         """Draws an arrow pointing in a random direction."""
         points = [
-            (self.size, 0),  # Tip
-            (2 * self.size, self.size),  # Right wing
-            (self.size + self.size // 4, self.size),
-            (self.size + self.size // 4, 2 * self.size),  # Shaft bottom
-            (self.size - self.size // 4, 2 * self.size),
-            (self.size - self.size // 4, self.size),
-            (0, self.size)  # Left wing
+            (size, 0),  # Tip
+            (2 * size, size),  # Right wing
+            (size + size // 4, size),
+            (size + size // 4, 2 * size),  # Shaft bottom
+            (size - size // 4, 2 * size),
+            (size - size // 4, size),
+            (0, size)  # Left wing
         ]
-        pygame.draw.polygon(surf, (*self.color, self.alpha), points)
+        pygame.draw.polygon(surf, color, points)
 
-    def draw_gear(self, surf):
+    @staticmethod
+    def draw_gear(surf, size, color):
         """Draws a gear-like pattern."""
-        center = (self.size, self.size)
+        center = (size, size)
         for i in range(12):
             angle = i * math.pi / 6
-            tooth_x = int(center[0] + self.size * math.cos(angle))
-            tooth_y = int(center[1] + self.size * math.sin(angle))
-            pygame.draw.line(surf, (*self.color, self.alpha), center, (tooth_x, tooth_y), 2)
+            tooth_x = int(center[0] + size * math.cos(angle))
+            tooth_y = int(center[1] + size * math.sin(angle))
+            pygame.draw.line(surf, color, center, (tooth_x, tooth_y), 2)
 
-    def draw_cloud(self, surf):
+    @staticmethod
+    def draw_cloud(surf, size, color):
         """Draws a cloud shape."""
-        base = (self.size, self.size)
+        base = (size, size)
         for i in range(-2, 3):
-            pygame.draw.circle(surf, (*self.color, self.alpha), (base[0] + i * self.size // 3, base[1]), self.size // 3)
-        pygame.draw.circle(surf, (*self.color, self.alpha), base, self.size // 2)
+            pygame.draw.circle(surf, color, (base[0] + i * size // 3, base[1]), size // 3)
+        pygame.draw.circle(surf, color, base, size // 2)
 
-    def draw_regular_polygon(self, surf, num_sides):
+    @staticmethod
+    def draw_regular_polygon(surf, size, color, num_sides):
         """Draws a regular polygon with `num_sides` sides."""
         points = []
         for i in range(num_sides):
             angle = i * 2 * math.pi / num_sides
-            x = int(self.size + self.size * math.cos(angle))
-            y = int(self.size + self.size * math.sin(angle))
+            x = int(size + size * math.cos(angle))
+            y = int(size + size * math.sin(angle))
             points.append((x, y))
-        pygame.draw.polygon(surf, (*self.color, self.alpha), points)
\ No newline at end of file
+        pygame.draw.polygon(surf, color, points)
\ No newline at end of file
@@ -1,6 +1,11 @@
+import functools
+import numpy as np
 import pygame
-import random
 import math
+from music_led_streamer.object.particle import FADE_LIFE, PARTICLE_LIFE, particle_velocities
+from music_led_streamer.render.splat import STENCIL_CACHE_SIZE, splat_stencils, surface_stencil
+
+STAR_POINTS = (5, 10)  # Range of the number of points of a star
 
 # Function to draw a star shape
 def draw_star(screen, color, x, y, points, outer_radius, inner_radius):
@@ -14,31 +19,21 @@ def draw_star(screen, color, x, y, points, outer_radius, inner_radius):
         vertices.append((vx, vy))
     pygame.draw.polygon(screen, color, vertices)
 
-# Updated Star class
-class Star:
-    def __init__(self, x, y, color, size, midrange, treble):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = size
-        self.speed_x = random.uniform(-1, 1) * (1 + midrange * 2 + treble * 0.5)
-        self.speed_y = random.uniform(-1, 1) * (1 + midrange * 2 + treble * 0.5)
-        self.life = 75
-        self.points = random.randint(5, 10)
-
-    def move(self):
-        self.x += self.speed_x
-        self.y += self.speed_y
-        self.life -= 1
+@functools.lru_cache(maxsize=STENCIL_CACHE_SIZE)
+def star_stencil(points, radius):
+    """Return the (cached) pixel offsets draw_star covers around its center, for splatting."""
+    surface = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+    draw_star(surface, (255, 255, 255), radius, radius, points, radius, radius // 2)
+    return surface_stencil(surface, (radius, radius))
 
-    def is_alive(self):
-        return self.life > 0
+def spawn_stars(store, count, x, y, color, size, midrange, treble):
+    """Spawn count stars with 5 to 10 points at a point, the store needs a points field."""
+    vx, vy = particle_velocities(count, midrange, treble)
+    points = np.random.randint(STAR_POINTS[0], STAR_POINTS[1] + 1, count)
+    return store.spawn(count, x=x, y=y, vx=vx, vy=vy, color=color, radius=size, life=PARTICLE_LIFE, points=points)
 
-    def draw(self, screen):
-        alpha = max(0, self.life / 100)
-        faded_color = (
-            int(self.color[0] * alpha),
-            int(self.color[1] * alpha),
-            int(self.color[2] * alpha),
-        )
-        draw_star(screen, faded_color, int(self.x), int(self.y), self.points, self.size, self.size // 2)
+def draw_stars(screen, store):
+    """Draw the stars, fading with their life, by splatting a stencil per number of points and size."""
+    colors = store.faded_colors(store["life"] / FADE_LIFE)
+    keys = (store["points"].astype(int), store["radius"].astype(int))
+    splat_stencils(screen, store["x"].astype(int), store["y"].astype(int), colors, keys, star_stencil)
@@ -0,0 +1,53 @@
+import functools
+import numpy as np
+import pygame
+
+BACKGROUND_CACHE_SIZE = 4  # Full screen gradients kept, each is a screen sized surface
+STRIP_CACHE_SIZE = 32  # One pixel wide gradient strips kept
+
+
+def color_key(color):
+    """Return a color as a hashable tuple of ints, whatever sequence or NumPy type it came as."""
+    return tuple(int(channel) for channel in color[:3])
+
+def gradient_column(color_top, color_bottom, height):
+    """Return the (height, 3) uint8 colors of a vertical gradient, one row per screen row.
+
+    Row y blends y / height of the way from color_top to color_bottom.
+    """
+    blend = (np.arange(height) / height)[:, np.newaxis]
+    colors = np.asarray(color_top, dtype=float) * (1 - blend) + np.asarray(color_bottom, dtype=float) * blend
+    return colors.astype(np.uint8)
+
+def column_surface(column):
+    """Return a one pixel wide surface of the (height, 3) colors of a column."""
+    strip = pygame.Surface((1, len(column)))
+    pygame.surfarray.blit_array(strip, column[np.newaxis])
+    return strip
+
+@functools.lru_cache(maxsize=STRIP_CACHE_SIZE)
+def gradient_strip(color_top, color_bottom, height):
+    """Return the (cached) one pixel wide gradient of the given height."""
+    return column_surface(gradient_column(color_top, color_bottom, height))
+
+@functools.lru_cache(maxsize=BACKGROUND_CACHE_SIZE)
+def gradient_surface(color_top, color_bottom, size):
+    """Return the (cached) vertical gradient filling a surface of the given size."""
+    return pygame.transform.scale(gradient_strip(color_top, color_bottom, size[1]), size)
+
+def draw_gradient(screen, color_top, color_bottom):
+    """Fill the screen with a vertical gradient, built once per colors and screen size."""
+    screen.blit(gradient_surface(color_key(color_top), color_key(color_bottom), screen.get_size()), (0, 0))
+
+def draw_blended_gradient(screen, colors_from, colors_to, progress):
+    """Fill the screen with the gradient progress (0-1) of the way between two (top, bottom) color pairs.
+
+    Used while fading between palettes, where every frame has other colors,
+    so the column is blended with NumPy and scaled without being cached.
+    """
+    width, height = screen.get_size()
+    column = (
+        gradient_column(colors_from[0], colors_from[1], height) * (1 - progress)
+        + gradient_column(colors_to[0], colors_to[1], height) * progress
+    )
+    screen.blit(pygame.transform.scale(column_surface(column.astype(np.uint8)), (width, height)), (0, 0))
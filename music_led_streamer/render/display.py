@@ -0,0 +1,44 @@
+import pygame
+
+# Dirty rectangle presentation: shows that report the rectangles they drew
+# get only those, and the ones of the previous frame, updated on the display
+dirty_rects = False  # Present only the rectangles shows report
+full_update = True  # The next present updates the whole screen
+previous_rects = []  # Rectangles presented by the previous frame
+
+
+def set_dirty_rects(enabled):
+    """Turn the dirty rectangle presentation mode on or off."""
+    global dirty_rects
+    dirty_rects = enabled
+    invalidate()
+
+def invalidate():
+    """Clear and update the whole screen on the next frame, such as after switching shows."""
+    global full_update, previous_rects
+    full_update = True
+    previous_rects = []
+
+def clear(screen, color):
+    """Fill the screen with a color, in dirty rectangle mode only the rectangles of the previous frame."""
+    if dirty_rects and not full_update:
+        for rect in previous_rects:
+            screen.fill(color, rect)
+    else:
+        screen.fill(color)
+
+def present(rects=None):
+    """Show the frame, the whole screen unless in dirty rectangle mode.
+
+    In dirty rectangle mode only rects and the rectangles of the previous
+    frame, whose content may have been erased, are updated. A frame without
+    rects redrew everything and updates the whole screen, and so does the
+    one after it.
+    """
+    global full_update, previous_rects
+    if not dirty_rects or full_update or rects is None:
+        pygame.display.update()
+    else:
+        pygame.display.update(previous_rects + rects)
+    full_update = rects is None
+    previous_rects = list(rects or ())
@@ -0,0 +1,51 @@
+import functools
+import numpy as np
+import pygame
+
+GLOBE_CACHE_SIZE = 16  # Radii whose normal maps and sprites are kept
+
+
+class GlobeSprite:
+    """A shaded sphere of one radius, drawn into a reusable sprite surface.
+
+    The unit normals and the disk mask of every pixel are computed once, so
+    shading a frame is one dot product with the light direction and a write
+    of the colors into the sprite through pygame.surfarray. Pixels outside
+    the disk are transparent. The sprite covers the pixels from -radius up
+    to radius - 1 around the center on both axes.
+    """
+
+    def __init__(self, radius):
+        self.radius = radius
+        # Pixel offsets from the center, indexed [x, y] like pygame.surfarray
+        offsets = np.arange(-radius, radius)
+        x, y = np.meshgrid(offsets, offsets, indexing="ij")
+        self.mask = x ** 2 + y ** 2 <= radius ** 2
+        self.normals = np.stack((x, y), axis=-1)[self.mask] / radius
+
+        self.surface = pygame.Surface((2 * radius, 2 * radius), pygame.SRCALPHA)
+        pygame.surfarray.pixels_alpha(self.surface)[:] = np.where(self.mask, 255, 0)
+        self.colors = np.zeros((len(self.normals), 3), dtype=np.uint8)
+
+    def render(self, light_direction, base_color):
+        """Shade the sphere for a light direction (x, y) and return the sprite."""
+        shade = np.clip(255 * (self.normals @ np.asarray(light_direction)), 0, 255).astype(np.int32)
+        np.clip(shade[:, np.newaxis] + np.asarray(base_color[:3], dtype=np.int32), 0, 255, out=self.colors,
+                casting="unsafe")
+        pixels = pygame.surfarray.pixels3d(self.surface)
+        pixels[self.mask] = self.colors
+        del pixels  # Unlock the surface
+        return self.surface
+
+
+@functools.lru_cache(maxsize=GLOBE_CACHE_SIZE)
+def get_globe_sprite(radius):
+    """Return the (cached) globe sprite of a radius."""
+    return GlobeSprite(radius)
+
+def draw_globe(screen, center, radius, light_direction, base_color):
+    """Draw a sphere of a radius, lit from light_direction, centered on center."""
+    if radius <= 0:
+        return
+    sprite = get_globe_sprite(radius).render(light_direction, base_color)
+    screen.blit(sprite, (center[0] - radius, center[1] - radius))
@@ -0,0 +1,100 @@
+import functools
+import math
+import numpy as np
+import pygame
+
+WEDGE_CACHE_SIZE = 64  # Wedge sprites kept, per radius, segment count and colors
+ROTATED_CACHE_SIZE = 256  # Wedge sprites kept turned to the angle of their segment
+COMPOSED_CACHE_SIZE = 16  # Whole kaleidoscopes kept, per radius, segment count and colors
+RADIUS_STEP = 4  # Wedge radii are rounded to a multiple of this many pixels
+ANGLE_STEP = 2  # The spin of the kaleidoscope is rounded to a multiple of this many degrees
+WEDGE_ALPHA = 200  # Opacity of the wedge fill, the outline is opaque
+
+
+def quantize_radius(radius):
+    """Round a kaleidoscope radius to the radius of its wedge sprite."""
+    return int(round(radius / RADIUS_STEP)) * RADIUS_STEP
+
+def quantize_angle(degrees):
+    """Round the spin (degrees) of a kaleidoscope to a multiple of ANGLE_STEP."""
+    return int(round(degrees / ANGLE_STEP)) * ANGLE_STEP % 360
+
+def wedge_points(radius, num_segments):
+    """Return the corners of a segment around the center: its tip above it and its base below."""
+    half_angle = math.pi / num_segments
+    return [
+        (0, -radius),
+        (radius * math.sin(half_angle), radius * math.cos(half_angle)),
+        (-radius * math.sin(half_angle), radius * math.cos(half_angle)),
+    ]
+
+@functools.lru_cache(maxsize=WEDGE_CACHE_SIZE)
+def wedge_sprite(radius, num_segments, color_tip, color_base):
+    """Return the (cached) segment of a kaleidoscope, with a gradient from its tip to its base.
+
+    The sprite is centered on the kaleidoscope center, so rotating it turns
+    the segment around that center.
+    """
+    points = wedge_points(radius, num_segments)
+    half_width = int(math.ceil(abs(points[1][0])))
+    surface = pygame.Surface((2 * half_width + 1, 2 * radius + 1), pygame.SRCALPHA)
+    points = [(half_width + int(x), radius + int(y)) for x, y in points]
+
+    # The fill sets the alpha of the segment, the gradient then colors every row
+    pygame.draw.polygon(surface, (0, 0, 0, WEDGE_ALPHA), points)
+    tip, base = points[0][1], points[1][1]
+    blend = np.clip((np.arange(2 * radius + 1) - tip) / max(1, base - tip), 0, 1)[:, np.newaxis]
+    colors = np.asarray(color_tip, dtype=float) * (1 - blend) + np.asarray(color_base, dtype=float) * blend
+    pixels = pygame.surfarray.pixels3d(surface)
+    pixels[:] = colors.astype(np.uint8)[np.newaxis]
+    del pixels  # Unlock the surface
+
+    pygame.draw.polygon(surface, color_base, points, 1)
+    return surface
+
+@functools.lru_cache(maxsize=ROTATED_CACHE_SIZE)
+def rotated_wedge(radius, num_segments, color_tip, color_base, degrees):
+    """Return the (cached) wedge sprite rotated counterclockwise by degrees.
+
+    Only the fixed angles of the segments, relative to the first one, are
+    asked for, so these rotations are done once per kaleidoscope.
+    """
+    sprite = wedge_sprite(radius, num_segments, color_tip, color_base)
+    if degrees == 0:
+        return sprite
+    return pygame.transform.rotate(sprite, degrees)
+
+@functools.lru_cache(maxsize=COMPOSED_CACHE_SIZE)
+def composed_kaleidoscope(radius, num_segments, colors):
+    """Return the (cached) kaleidoscope of num_segments wedges, unturned, centered on the sprite.
+
+    Segment i is turned i / num_segments of a full turn and takes its
+    (tip, base) colors from colors[i % len(colors)].
+    """
+    surface = pygame.Surface((2 * radius + 1, 2 * radius + 1), pygame.SRCALPHA)
+    segment_degrees = 360 / num_segments
+    for i in range(num_segments):
+        color_tip, color_base = colors[i % len(colors)]
+        sprite = rotated_wedge(radius, num_segments, color_tip, color_base, i * segment_degrees)
+        width, height = sprite.get_size()
+        surface.blit(sprite, (radius - width // 2, radius - height // 2))
+    return surface
+
+def draw_kaleidoscope(screen, center, radius, num_segments, rotation, colors):
+    """Draw num_segments copies of one wedge around center, turned by rotation (radians).
+
+    Segment i is turned a further i / num_segments of a full turn and takes
+    its (tip, base) colors from colors[i % len(colors)]. The kaleidoscope is
+    composed once per radius, segment count and colors, each frame only
+    turns the whole of it once.
+    """
+    radius = quantize_radius(radius)
+    if radius <= 0:
+        return
+    colors = tuple((tuple(color_tip), tuple(color_base)) for color_tip, color_base in colors)
+    sprite = composed_kaleidoscope(radius, num_segments, colors)
+    degrees = quantize_angle(math.degrees(rotation))
+    if degrees:
+        sprite = pygame.transform.rotate(sprite, degrees)
+    width, height = sprite.get_size()
+    screen.blit(sprite, (center[0] - width // 2, center[1] - height // 2))
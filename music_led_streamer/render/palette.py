@@ -0,0 +1,72 @@
+import functools
+import hashlib
+import math
+import numpy as np
+import pygame
+
+PALETTE_CACHE_SIZE = 16  # Image palettes kept, per file content and settings
+COLOR_BITS = 5  # Bits kept of each channel, colors differing only below them count as one
+MAX_SAMPLES = 1 << 16  # Pixels counted at most, larger images are sampled on a regular grid
+BINCOUNT_BITS = 6  # Up to this many bits per channel colors are counted with a bincount, above with np.unique
+
+
+def sample_pixels(pixels, max_samples=MAX_SAMPLES):
+    """Return at most about max_samples (r, g, b) rows of a (width, height, 3) array, taken on a regular grid."""
+    width, height = pixels.shape[:2]
+    step = max(1, math.ceil(math.sqrt(width * height / max_samples)))
+    return pixels[::step, ::step].reshape(-1, 3)
+
+def pack_colors(colors, bits=COLOR_BITS):
+    """Pack (n, 3) colors, each channel cut to its top bits, into one uint32 per color."""
+    channels = np.asarray(colors, dtype=np.uint32) >> (8 - bits)
+    return (channels[:, 0] << (2 * bits)) | (channels[:, 1] << bits) | channels[:, 2]
+
+def dominant_colors(pixels, num_colors=3, bits=COLOR_BITS, max_samples=MAX_SAMPLES, iterations=0):
+    """Return the num_colors most common colors of a (width, height, 3) pixel array, most common first.
+
+    Colors are counted at bits per channel and each is returned as the
+    average of the pixels counted for it. iterations of k-means then refine
+    those colors over the sampled pixels.
+    """
+    samples = sample_pixels(pixels, max_samples)
+    if len(samples) == 0:
+        return []
+    packed = pack_colors(samples, bits)
+    if bits <= BINCOUNT_BITS:
+        counts = np.bincount(packed, minlength=1 << (3 * bits))
+        bins = np.flatnonzero(counts)
+        counts = counts[bins]
+        members = np.searchsorted(bins, packed)
+    else:
+        bins, members, counts = np.unique(packed, return_inverse=True, return_counts=True)
+    top = np.argsort(-counts, kind="stable")[:num_colors]
+
+    # The average color of the pixels in each of the top bins
+    sums = np.stack([np.bincount(members, weights=samples[:, channel], minlength=len(bins)) for channel in range(3)], axis=1)
+    centers = sums[top] / counts[top, np.newaxis]
+
+    for _ in range(iterations):
+        distances = ((samples[:, np.newaxis, :] - centers[np.newaxis]) ** 2).sum(axis=2)
+        nearest = distances.argmin(axis=1)
+        sizes = np.bincount(nearest, minlength=len(centers))
+        for channel in range(3):
+            sums = np.bincount(nearest, weights=samples[:, channel], minlength=len(centers))
+            centers[:, channel] = np.where(sizes > 0, sums / np.maximum(sizes, 1), centers[:, channel])
+        centers = centers[np.argsort(-sizes, kind="stable")]
+
+    return [tuple(int(channel) for channel in np.round(center)) for center in centers]
+
+def file_digest(path):
+    """Return the SHA-1 hex digest of a file's content."""
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+@functools.lru_cache(maxsize=PALETTE_CACHE_SIZE)
+def cached_palette(digest, path, num_colors, bits, iterations):
+    """Return the (cached) dominant colors of an image file, keyed by the digest of its content."""
+    pixels = pygame.surfarray.array3d(pygame.image.load(path))
+    return tuple(dominant_colors(pixels, num_colors, bits, iterations=iterations))
+
+def image_palette(path, num_colors=3, bits=COLOR_BITS, iterations=0):
+    """Return the dominant colors of an image file, computed once per file content."""
+    return list(cached_palette(file_digest(path), path, num_colors, bits, iterations))
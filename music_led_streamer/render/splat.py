@@ -0,0 +1,157 @@
+import functools
+import sys
+import numpy as np
+import pygame
+
+STENCIL_CACHE_SIZE = 512  # Stencils kept, per kind of stencil
+BLEND_REPLACE = "replace"  # Splatted pixels overwrite the screen
+BLEND_MAX = "max"  # Each channel keeps the brighter of the screen and the splats
+BLEND_ADD = "add"  # Splats add up, saturating at white
+BLENDS = (BLEND_REPLACE, BLEND_MAX, BLEND_ADD)
+
+
+def surface_stencil(surface, origin):
+    """Return the (dx, dy) offsets from origin of the pixels drawn on a black surface."""
+    x, y = np.nonzero(pygame.surfarray.array2d(surface))
+    return x - origin[0], y - origin[1]
+
+@functools.lru_cache(maxsize=STENCIL_CACHE_SIZE)
+def disk_stencil(radius, width=0):
+    """Return the (cached) offsets of the pixels pygame.draw.circle covers around its center.
+
+    A width of 0 fills the disk, any other width draws a ring like pygame does.
+    """
+    surface = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+    pygame.draw.circle(surface, (255, 255, 255), (radius, radius), radius, width)
+    return surface_stencil(surface, (radius, radius))
+
+def map_colors(surface, colors):
+    """Map (n, 3) colors to the opaque pixel values of a surface, like Surface.map_rgb does."""
+    colors = np.asarray(colors, dtype=np.uint32)
+    shifts, losses = surface.get_shifts(), surface.get_losses()
+    mapped = np.full(len(colors), surface.get_masks()[3], dtype=np.uint32)
+    for channel in range(3):
+        mapped |= (colors[:, channel] >> losses[channel]) << shifts[channel]
+    return mapped
+
+def flat_pixels(screen):
+    """Return the pixels of a 32-bit surface as one array indexed y * width + x, or None.
+
+    The array is a view and locks the surface until it is deleted. Surfaces of
+    other depths, or with padded rows, have no such view.
+    """
+    if screen.get_bytesize() != 4 or screen.get_pitch() != screen.get_width() * 4:
+        return None
+    return pygame.surfarray.pixels2d(screen).T.reshape(-1)
+
+def channel_bytes(screen):
+    """Return the byte offset of the red, green and blue channels within a 32-bit pixel."""
+    offsets = [shift // 8 for shift in screen.get_shifts()[:3]]
+    return offsets if sys.byteorder == "little" else [3 - offset for offset in offsets]
+
+def splat_stencils(screen, x, y, colors, keys, stencil, blend=BLEND_REPLACE):
+    """Splat a stencil of (dx, dy) offsets at each integer point x, y, in the point's color.
+
+    The stencil of a point is looked up by calling stencil with the point's
+    keys, a tuple of non-negative integer arrays with one per argument of
+    stencil, so points with the same keys share a stencil. Stencils that fit
+    on the screen are placed with one addition of flat pixel offsets, only
+    those crossing an edge are clipped pixel by pixel. All the pixels are
+    then written in one pass.
+    """
+    if len(x) == 0:
+        return
+    x, y = np.asarray(x, dtype=int), np.asarray(y, dtype=int)
+    keys = [np.asarray(key, dtype=int) for key in keys]
+    width, height = screen.get_size()
+
+    # Fold the keys into one integer per point and sort the points by it
+    combined = keys[0]
+    for key in keys[1:]:
+        combined = combined * (key.max() + 1) + key
+    _, first, inverse, counts = np.unique(combined, return_index=True, return_inverse=True, return_counts=True)
+    order = np.argsort(inverse.ravel(), kind="stable")
+    bounds = np.cumsum(counts)
+
+    indices, owners = [], []
+    for point, start, end in zip(first.tolist(), (bounds - counts).tolist(), bounds.tolist()):
+        dx, dy = stencil(*(int(key[point]) for key in keys))
+        if len(dx) == 0:
+            continue
+        members = order[start:end]
+        member_x, member_y = x[members], y[members]
+        inside = ((member_x + dx.min() >= 0) & (member_x + dx.max() < width)
+                  & (member_y + dy.min() >= 0) & (member_y + dy.max() < height))
+
+        indices.append(((member_y[inside] * width + member_x[inside])[:, np.newaxis] + (dy * width + dx)).ravel())
+        owners.append(np.repeat(members[inside], len(dx)))
+        if not inside.all():
+            edge = members[~inside]
+            xs, ys = (x[edge, np.newaxis] + dx).ravel(), (y[edge, np.newaxis] + dy).ravel()
+            visible = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+            indices.append((ys * width + xs)[visible])
+            owners.append(np.repeat(edge, len(dx))[visible])
+    if not indices:
+        return
+    splat_indices(screen, np.concatenate(indices), colors, blend, np.concatenate(owners))
+
+def splat_disks(screen, x, y, radii, colors, widths=None, blend=BLEND_REPLACE):
+    """Draw circles like pygame.draw.circle, filled or with outline widths, in one pass."""
+    radii = np.asarray(radii, dtype=int)
+    widths = np.zeros_like(radii) if widths is None else np.asarray(widths, dtype=int)
+    splat_stencils(screen, x, y, colors, (radii, widths), disk_stencil, blend)
+
+def splat_pixels(screen, xs, ys, colors, blend=BLEND_REPLACE):
+    """Blend one (r, g, b) color per pixel into the screen at xs, ys, skipping those off the screen."""
+    width, height = screen.get_size()
+    visible = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    splat_indices(screen, (ys * width + xs)[visible], colors, blend, np.flatnonzero(visible))
+
+def splat_indices(screen, indices, colors, blend, owners):
+    """Blend colors into the screen pixels at flat indices (y * width + x).
+
+    colors has one (r, g, b) row per point and owners holds the point each
+    pixel belongs to.
+    """
+    if blend not in BLENDS:
+        raise ValueError(f"Unknown blend mode: {blend}")
+    if len(indices) == 0:
+        return
+
+    pixels = flat_pixels(screen)
+    if pixels is None:
+        splat_channels(screen, indices, np.asarray(colors, dtype=np.uint8)[owners], blend)
+        return
+
+    if blend == BLEND_REPLACE:
+        # Write mapped pixel values, one integer per pixel instead of three channels
+        pixels[indices] = map_colors(screen, colors)[owners]
+    else:
+        colors = np.asarray(colors, dtype=np.uint8)
+        channels = pixels.view(np.uint8)
+        if blend == BLEND_ADD:
+            touched, inverse = np.unique(indices, return_inverse=True)
+        for channel, offset in enumerate(channel_bytes(screen)):
+            if blend == BLEND_MAX:
+                np.maximum.at(channels, indices * 4 + offset, colors[owners, channel])
+            else:
+                # Sum the splats on each pixel first, then add the sums to the screen once
+                sums = np.bincount(inverse.ravel(), weights=colors[owners, channel])
+                channels[touched * 4 + offset] = np.minimum(255, channels[touched * 4 + offset] + sums)
+    del pixels  # Unlock the screen
+
+def splat_channels(screen, indices, colors, blend):
+    """Blend one color per pixel into a screen without flat_pixels, through pygame.surfarray.pixels3d."""
+    width = screen.get_width()
+    xs, ys = indices % width, indices // width
+    pixels = pygame.surfarray.pixels3d(screen)
+    if blend == BLEND_REPLACE:
+        pixels[xs, ys] = colors
+    elif blend == BLEND_MAX:
+        np.maximum.at(pixels, (xs, ys), colors)
+    elif blend == BLEND_ADD:
+        touched, inverse = np.unique(indices, return_inverse=True)
+        sums = np.stack([np.bincount(inverse.ravel(), weights=colors[:, channel]) for channel in range(3)], axis=1)
+        touched_x, touched_y = touched % width, touched // width
+        pixels[touched_x, touched_y] = np.minimum(255, pixels[touched_x, touched_y] + sums).astype(np.uint8)
+    del pixels  # Unlock the screen
@@ -1,16 +1,15 @@
 import pygame
-import sounddevice as sd
 import numpy as np
 import math
 import os
 import sys
 import random
 import time
-from music_led_streamer.object.bubble import Bubble
-from music_led_streamer.util import BLACK
+from music_led_streamer.object.bubble import Bubble, warm_bubble_sprites, MAX_RADIUS
+from music_led_streamer.audio import engine as audio_engine
+from music_led_streamer.render.background import draw_gradient
 
 # Configuration
-sample_rate = 44100
 NUM_BANDS = 25  # Number of frequency bands
 TEXT_COLOR = (255, 255, 255)  # White for text
 MAX_BUBBLES = 100
@@ -56,55 +55,21 @@ PALETTES = {
     "Sunrise Bliss": [(255, 87, 51), (255, 195, 113), (255, 159, 127)],
 }
 
-# Audio Callback
+# Audio features
 frequency_amplitudes = np.zeros(NUM_BANDS)
 peak_positions = np.zeros(NUM_BANDS)
-#band_frequencies = np.logspace(np.log10(20), np.log10(sample_rate / 2), NUM_BANDS + 1)
-band_frequencies = np.geomspace(20, sample_rate / 2, NUM_BANDS + 1)
 
-def audio_callback(indata, frames, time, status):
+def read_audio_features():
+    """Copy the latest banded spectrum from the shared audio engine."""
     global frequency_amplitudes
-    if status:
-        print(f"Status: {status}")
-
-    if status != "input overflow":
-      
-        # Perform FFT
-        fft_data = np.abs(np.fft.rfft(indata[:, 0]))  # Use one channel
-        freqs = np.fft.rfftfreq(len(indata[:, 0]), 1 / sample_rate)
-
-        # Calculate frequency band amplitudes
-        band_amplitudes = np.zeros(NUM_BANDS)
-        band_edges = np.logspace(np.log10(20), np.log10(sample_rate / 2), NUM_BANDS + 1)
-        
-        for i in range(NUM_BANDS):
-            #band_amplitudes[i] = np.mean(fft_data[(freqs >= band_edges[i]) & (freqs < band_edges[i + 1])])
-            # Extract the frequencies for the current band
-            band_data = fft_data[(freqs >= band_frequencies[i]) & (freqs < band_frequencies[i + 1])]
-            #print(f"Band {i}: Size = {band_data.size}, Frequency Range = {band_frequencies[i]}-{band_frequencies[i + 1]}")
-            
-            # Check if the band_data is not empty
-            if band_data.size > 0:
-                band_amplitudes[i] = np.mean(band_data)
-            else:
-                band_amplitudes[i] = 0  # Default value for empty bands
-
-        # Smooth neighboring bands for visualization
-        for i in range(1, NUM_BANDS - 1):
-            if band_amplitudes[i] == 0:
-                band_amplitudes[i] = (band_amplitudes[i - 1] + band_amplitudes[i + 1]) / 2
-
-        # Smooth out the amplitudes for a cleaner visualization
-        frequency_amplitudes = 0.8 * frequency_amplitudes + 0.2 * band_amplitudes
-
-        # for i, amplitude in enumerate(frequency_amplitudes):
-        #     print(f"Band {i}: Amplitude = {amplitude}, Frequency = {band_frequencies[i]:.2f} Hz")
+    frequency_amplitudes = audio_engine.current_frame().band_amplitudes
 
 
 def switch_palette():
     global selected_palette, last_palette_switch, BAR_COLOR_TOP, BAR_COLOR_BOTTOM, BAR_PEAK_COLOR
     if time.time() - last_palette_switch > 30:
         selected_palette = random.choice(list(PALETTES.values()))
+        warm_bubble_sprites(selected_palette)
         last_palette_switch = time.time()
         BAR_COLOR_TOP = selected_palette[0]
         BAR_COLOR_BOTTOM = selected_palette[1]
@@ -137,10 +102,11 @@ def create_bubbles(screen, midrange_intensity, color_palette):
 
 def update_and_draw_bubbles(screen, bass_intensity, treble_intensity):
     """Update and draw bubbles, removing those that float off-screen."""
+    sprites = []
     for bubble in bubbles[:]:
         # Gradually increase size with bass intensity
         bubble.size += bass_intensity * 0.3  # Slow growth
-        bubble.size = min(150, bubble.size)  # Max size limit
+        bubble.size = min(MAX_RADIUS, bubble.size)  # Max size limit
 
         # Optionally decay size if bass is low
         if bass_intensity < 0.1:  # Low bass
@@ -153,48 +119,30 @@ def update_and_draw_bubbles(screen, bass_intensity, treble_intensity):
         if bubble.y + bubble.size < 0:
             bubbles.remove(bubble)
         else:
-            bubble.draw(screen)
+            sprite = bubble.sprite()
+            if sprite:
+                sprites.append(sprite)
 
+    # One call blits every bubble sprite
+    screen.blits(sprites, doreturn=False)
 
-def draw_gradient_background(screen, color_top, color_bottom):
-    """Draw a vertical gradient background."""
-    for y in range(screen.get_height()):
-        blend = y / screen.get_height()
-        r = int(color_top[0] * (1 - blend) + color_bottom[0] * blend)
-        g = int(color_top[1] * (1 - blend) + color_bottom[1] * blend)
-        b = int(color_top[2] * (1 - blend) + color_bottom[2] * blend)
-        pygame.draw.line(screen, (r, g, b), (0, y), (screen.get_width(), y))
 
 # Global state for the show
 def initialize(audio_settings, screen):
     """Initialize the show."""
-    global audio_stream, selected_palette
-    
-    # Extract audio settings
-    samplerate, channels, device_index, blocksize, latency = audio_settings
+    global selected_palette
+
+    audio_engine.set_num_bands(NUM_BANDS)
 
-    sample_rate = samplerate
-    
     # Randomly select a palette at the start
     selected_palette = random.choice(list(PALETTES.values()))
-
-    # Initialize audio stream
-    audio_stream = sd.InputStream(
-        samplerate=samplerate,
-        channels=channels,
-        device=device_index,
-        callback=audio_callback,
-        blocksize=blocksize,
-        latency=latency,
-    )
-    audio_stream.start()
+    warm_bubble_sprites(selected_palette)
 
 def render_step(screen):
     """Render a single frame of the visualization."""
+    read_audio_features()
 
-    screen.fill(BLACK)
-            
-    draw_gradient_background(screen, (0, 0, 64), (0, 0, 128))
+    draw_gradient(screen, (0, 0, 64), (0, 0, 128))
 
     # Calculate music intensities
     if frequency_amplitudes.size > 0:
@@ -218,7 +166,4 @@ def render_step(screen):
 
 def cleanup():
     """Clean up resources for the show."""
-    global audio_stream
-    if audio_stream:
-        audio_stream.stop()
-        audio_stream.close()
\ No newline at end of file
+    bubbles.clear()
\ No newline at end of file
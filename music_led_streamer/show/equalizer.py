@@ -1,18 +1,22 @@
 import pygame
-import sounddevice as sd
 import numpy as np
 import math
 import os
 import sys
 import random
 import time
+import functools
 from music_led_streamer.util import BLACK
+from music_led_streamer.audio import engine as audio_engine
+from music_led_streamer.object.particle_store import ParticleStore
+from music_led_streamer.render import display
+from music_led_streamer.render.splat import BLEND_MAX, splat_disks
 
 # Configuration
-sample_rate = 44100
-NUM_BANDS = 25  # Number of frequency bands
-BAR_WIDTH = 25  # Width of each bar
-BAR_SPACING = 5  # Space between bars
+NUM_BANDS = 64  # Number of frequency bands
+BAND_LAYOUT = "mel"  # Perceptually spaced bands
+BAR_SPACING = 2  # Space between bars
+GRADIENT_STEPS = 256  # Resolution of the cached bar gradient
 BAR_COLOR_TOP = (0, 255, 0)  # Green color for bars
 BAR_COLOR_BOTTOM = (0, 100, 0)
 BAR_PEAK_COLOR = (0, 255, 0)
@@ -20,11 +24,12 @@ TEXT_COLOR = (255, 255, 255)  # White for text
 volume = 0
 bass, midrange, treble = 0, 0, 0
 max_volume = 1
+bar_width = 10  # Width of each bar, fitted to the screen in initialize()
 
 # Switch palette every 10 seconds
 last_palette_switch = time.time()
 
-stars = []
+stars = ParticleStore(fields=("base_size", "base_brightness", "brightness"))  # vx is a star's base speed
 
 # Define 5 custom color palettes
 PALETTES = {
@@ -70,48 +75,14 @@ PALETTES = {
     "Dreamy Pastels": [(250, 218, 221), (230, 230, 250), (255, 228, 225)],
 }
 
-# Audio Callback
+# Audio features
 frequency_amplitudes = np.zeros(NUM_BANDS)
 peak_positions = np.zeros(NUM_BANDS)
-#band_frequencies = np.logspace(np.log10(20), np.log10(sample_rate / 2), NUM_BANDS + 1)
-band_frequencies = np.geomspace(20, sample_rate / 2, NUM_BANDS + 1)
-def audio_callback(indata, frames, time, status):
+
+def read_audio_features():
+    """Copy the latest banded spectrum from the shared audio engine."""
     global frequency_amplitudes
-    if status:
-        print(f"Status: {status}")
-
-    if status != "input overflow":
-      
-        # Perform FFT
-        fft_data = np.abs(np.fft.rfft(indata[:, 0]))  # Use one channel
-        freqs = np.fft.rfftfreq(len(indata[:, 0]), 1 / sample_rate)
-
-        # Calculate frequency band amplitudes
-        band_amplitudes = np.zeros(NUM_BANDS)
-        band_edges = np.logspace(np.log10(20), np.log10(sample_rate / 2), NUM_BANDS + 1)
-
-        for i in range(NUM_BANDS):
-            #band_amplitudes[i] = np.mean(fft_data[(freqs >= band_edges[i]) & (freqs < band_edges[i + 1])])
-            # Extract the frequencies for the current band
-            band_data = fft_data[(freqs >= band_frequencies[i]) & (freqs < band_frequencies[i + 1])]
-            #print(f"Band {i}: Size = {band_data.size}, Frequency Range = {band_frequencies[i]}-{band_frequencies[i + 1]}")
-            
-            # Check if the band_data is not empty
-            if band_data.size > 0:
-                band_amplitudes[i] = np.mean(band_data)
-            else:
-                band_amplitudes[i] = 0  # Default value for empty bands
-
-        # Smooth neighboring bands for visualization
-        for i in range(1, NUM_BANDS - 1):
-            if band_amplitudes[i] == 0:
-                band_amplitudes[i] = (band_amplitudes[i - 1] + band_amplitudes[i + 1]) / 2
-
-        # Smooth out the amplitudes for a cleaner visualization
-        frequency_amplitudes = 0.8 * frequency_amplitudes + 0.2 * band_amplitudes
-
-        # for i, amplitude in enumerate(frequency_amplitudes):
-        #     print(f"Band {i}: Amplitude = {amplitude}, Frequency = {band_frequencies[i]:.2f} Hz")
+    frequency_amplitudes = audio_engine.current_frame().band_amplitudes
 
 
 def switch_palette():
@@ -128,41 +99,52 @@ def draw_palette_name(screen):
     text = font.render(f"Palette: {list(PALETTES.keys())[list(PALETTES.values()).index(selected_palette)]}", True, (255, 255, 255))
     screen.blit(text, (10, 10))
 
+@functools.lru_cache(maxsize=8)
+def gradient_strip(color_top, color_bottom):
+    """A one pixel wide vertical gradient, scaled to the size of each bar."""
+    blend = np.linspace(0, 1, GRADIENT_STEPS)[:, np.newaxis]
+    colors = np.array(color_top) * (1 - blend) + np.array(color_bottom) * blend
+    strip = pygame.Surface((1, GRADIENT_STEPS))
+    pygame.surfarray.blit_array(strip, colors[np.newaxis].astype(np.uint8))
+    return strip
+
 def draw_gradient_bar(screen, x, y, width, height, color_top, color_bottom):
-    """Draws a bar with a gradient effect."""
-    for i in range(height):
-        blend = i / height
-        r = int(color_top[0] * (1 - blend) + color_bottom[0] * blend)
-        g = int(color_top[1] * (1 - blend) + color_bottom[1] * blend)
-        b = int(color_top[2] * (1 - blend) + color_bottom[2] * blend)
-        pygame.draw.line(screen, (r, g, b), (x, y + i), (x + width, y + i))
+    """Draws a bar with a gradient effect, returning the rectangle it drew or None."""
+    if height <= 0:
+        return None
+    bar = pygame.transform.scale(gradient_strip(color_top, color_bottom), (width, height))
+    return screen.blit(bar, (x, y))
 
 # Function to draw frequency labels
 def draw_frequency_labels(screen):
     """Draws frequency labels below each bar."""
     font = pygame.font.SysFont(None, 10)
+    band_frequencies = audio_engine.band_frequencies()
     for i in range(NUM_BANDS):
         center_frequency = int((band_frequencies[i] + band_frequencies[i + 1]) / 2)  # Calculate center frequency
         label = font.render(f"{center_frequency} Hz", True, (255, 255, 255))  # White text
-        x = i * (BAR_WIDTH + BAR_SPACING)
+        x = i * (bar_width + BAR_SPACING)
         y = screen.get_height() - 20  # Position below the bars
         screen.blit(label, (x, y))
 
 def draw_db_scale(screen):
-    """Draws a decibel (dB) scale on the left side of the screen."""
+    """Draws a decibel (dB) scale on the left side of the screen, returning the label rectangles."""
     max_height = screen.get_height() - 40  # Leave space for labels and bars
     font = pygame.font.SysFont(None, 20)
     interval = 50  # Distance between dB markers
+    rects = []
     for i in range(0, max_height, interval):
         dB = -i // interval * 10  # Calculate dB value
         label = font.render(f"{dB} dB", True, (255, 255, 255))  # White text
-        screen.blit(label, (10, max_height - i - 20))  # Position labels on the left
+        rects.append(screen.blit(label, (10, max_height - i - 20)))  # Position labels on the left
+    return rects
 
 def draw_frequency_amplitudes(screen):
-
+    """Draws the frequency bars and their peak markers, returning the rectangles drawn."""
     global BAR_COLOR_TOP, BAR_COLOR_BOTTOM, BAR_PEAK_COLOR
 
     # Draw frequency bars
+    rects = []
     for i, amplitude in enumerate(frequency_amplitudes):
       # Ensure amplitude is a valid number
       if not np.isfinite(amplitude):
@@ -175,14 +157,17 @@ def draw_frequency_amplitudes(screen):
       else:
           peak_positions[i] -= 2  # Gradually fall down
 
-      x = i * (BAR_WIDTH + BAR_SPACING)
+      x = i * (bar_width + BAR_SPACING)
       y = screen.get_height() - bar_height
 
       # Draw peak marker
       peak_y = screen.get_height() - 40 - peak_positions[i]
-      pygame.draw.rect(screen, BAR_PEAK_COLOR, (x, peak_y, BAR_WIDTH, 5))  # White peak marker
+      rects.append(pygame.draw.rect(screen, BAR_PEAK_COLOR, (x, peak_y, bar_width, 5)))  # White peak marker
 
-      draw_gradient_bar(screen, x, y, BAR_WIDTH, bar_height, BAR_COLOR_TOP, BAR_COLOR_BOTTOM)
+      bar_rect = draw_gradient_bar(screen, x, y, bar_width, bar_height, BAR_COLOR_TOP, BAR_COLOR_BOTTOM)
+      if bar_rect:
+          rects.append(bar_rect)
+    return rects
 
 def determine_background_color(screen):
     # Determine dominant frequency range
@@ -226,23 +211,24 @@ def draw_wave_background(screen):
 
 def create_starfield(screen, num_stars=100):
     """Initialize the starfield with random positions, base sizes, and brightness."""
-    for _ in range(num_stars):
-        x = random.randint(0, screen.get_width())
-        y = random.randint(0, screen.get_height())
-        base_size = random.uniform(1, 7)  # Base size of the star
-        base_brightness = random.randint(50, 150)  # Base brightness
-        stars.append({
-            "x": x,
-            "y": y,
-            "base_size": base_size,
-            "current_size": base_size,
-            "base_brightness": base_brightness,
-            "current_brightness": base_brightness,
-            "speed": random.uniform(0.5, 2),  # Base horizontal speed
-        })
+    base_size = np.random.uniform(1, 7, num_stars)  # Base size of the star
+    base_brightness = np.random.randint(50, 151, num_stars)  # Base brightness
+    stars.spawn(
+        num_stars,
+        x=np.random.randint(0, screen.get_width() + 1, num_stars),
+        y=np.random.randint(0, screen.get_height() + 1, num_stars),
+        base_size=base_size,
+        radius=base_size,
+        base_brightness=base_brightness,
+        brightness=base_brightness,
+        vx=np.random.uniform(0.5, 2, num_stars),  # Base horizontal speed
+    )
 
 def draw_starfield(screen):
-    """Draw the starfield, reacting to bass for brightness/size and treble for speed."""
+    """Draw the starfield, reacting to bass for brightness/size and treble for speed.
+
+    Returns the rectangles of the stars.
+    """
     if frequency_amplitudes.size == 0:
         bass_intensity = 0
         treble_intensity = 0
@@ -255,71 +241,68 @@ def draw_starfield(screen):
         max_treble_intensity = max(np.max(frequency_amplitudes[NUM_BANDS * 2 // 3:]), 0.01)
         treble_intensity = np.clip(np.mean(frequency_amplitudes[NUM_BANDS * 2 // 3:]) / max_treble_intensity, 0, 1)
 
-    for star in stars:
-        # Scale brightness and size with bass intensity
-        brightness_boost = int(bass_intensity * 155)
-        star["current_brightness"] = min(255, star["base_brightness"] + brightness_boost)
+    # Scale brightness and size with bass intensity
+    brightness_boost = int(bass_intensity * 155)
+    stars["brightness"][:] = np.minimum(255, stars["base_brightness"] + brightness_boost)
 
-        size_boost = bass_intensity * 8
-        star["current_size"] = star["base_size"] + size_boost
+    size_boost = bass_intensity * 8
+    stars["radius"][:] = stars["base_size"] + size_boost
 
-        # Scale horizontal movement with treble intensity
-        star["x"] += star["speed"] * (1 + treble_intensity * 5)
+    # Scale horizontal movement with treble intensity
+    stars["x"][:] += stars["vx"] * (1 + treble_intensity * 5)
 
-        # Wrap stars that move off-screen
-        if star["x"] > screen.get_width():
-            star["x"] = 0
-            star["y"] = random.randint(0, screen.get_height())
+    # Wrap stars that move off-screen
+    wrapped = stars["x"] > screen.get_width()
+    stars["x"][wrapped] = 0
+    stars["y"][wrapped] = np.random.randint(0, screen.get_height() + 1, np.count_nonzero(wrapped))
 
-        # Draw the star
-        star_color = (star["current_brightness"], star["current_brightness"], star["current_brightness"])
-        pygame.draw.circle(screen, star_color, (int(star["x"]), int(star["y"])), int(star["current_size"]))
+    # Draw the stars
+    x, y, radius = stars["x"].astype(int), stars["y"].astype(int), stars["radius"].astype(int)
+    colors = np.repeat(stars["brightness"][:, np.newaxis], 3, axis=1)
+    splat_disks(screen, x, y, radius, colors, blend=BLEND_MAX)
+    screen_rect = screen.get_rect()
+    rects = [
+        pygame.Rect(x - r, y - r, 2 * r + 1, 2 * r + 1).clip(screen_rect)
+        for x, y, r in zip(x.tolist(), y.tolist(), radius.tolist())
+    ]
 
-        # Gradual decay for brightness and size
-        star["current_brightness"] = max(star["base_brightness"], star["current_brightness"] - 5)
-        star["current_size"] = max(star["base_size"], star["current_size"] - 0.2)
+    # Gradual decay for brightness and size
+    stars["brightness"][:] = np.maximum(stars["base_brightness"], stars["brightness"] - 5)
+    stars["radius"][:] = np.maximum(stars["base_size"], stars["radius"] - 0.2)
+    return rects
 
 
 # Global state for the show
 def initialize(audio_settings, screen):
     """Initialize the show."""
-    global audio_stream, selected_palette
-    
-    # Extract audio settings
-    samplerate, channels, device_index, blocksize, latency = audio_settings
+    global selected_palette, bar_width
+
+    audio_engine.set_num_bands(NUM_BANDS, BAND_LAYOUT)
+
+    # Fit every band on the screen
+    bar_width = max(1, screen.get_width() // NUM_BANDS - BAR_SPACING)
 
-    sample_rate = samplerate
-    
     # Randomly select a palette at the start
     selected_palette = random.choice(list(PALETTES.values()))
 
     create_starfield(screen)
 
-    # Initialize audio stream
-    audio_stream = sd.InputStream(
-        samplerate=samplerate,
-        channels=channels,
-        device=device_index,
-        callback=audio_callback,
-        blocksize=blocksize,
-        latency=latency,
-    )
-    audio_stream.start()
-
 def render_step(screen):
     """Render a single frame of the visualization."""
+    read_audio_features()
 
-    screen.fill(BLACK)
+    # Only the previous frame's rectangles need clearing in dirty rectangle mode
+    display.clear(screen, BLACK)
     #determine_background_color(screen)
 
     #draw_wave_background(screen)
 
     # Draw starfield
-    draw_starfield(screen)
+    rects = draw_starfield(screen)
 
-    draw_db_scale(screen)
+    rects += draw_db_scale(screen)
     
-    draw_frequency_amplitudes(screen)  
+    rects += draw_frequency_amplitudes(screen)
 
     #draw_frequency_labels(screen)
 
@@ -327,11 +310,9 @@ def render_step(screen):
 
     #draw_palette_name(screen)
     
-    pygame.display.update()
+    display.present(rects)
 
 def cleanup():
     """Clean up resources for the show."""
-    global audio_stream
-    if audio_stream:
-        audio_stream.stop()
-        audio_stream.close()
\ No newline at end of file
+    stars.clear()
+    peak_positions.fill(0)
\ No newline at end of file
@@ -1,34 +1,41 @@
 import pygame
 import pygame.gfxdraw
-import sounddevice as sd
 import numpy as np
 import math
 import os
 import sys
 import random
 import time
-from music_led_streamer.util import BLACK
+from music_led_streamer.audio import engine as audio_engine
+from music_led_streamer.object.particle_store import ParticleStore
+from music_led_streamer.render.background import draw_gradient
+from music_led_streamer.render.globe import draw_globe as draw_shaded_globe
 
 # Constants
-sample_rate = 44100
 bass, midrange, treble = 0, 0, 0
 
 FLARE_COLOR = (255, 69, 0)  # Orange-red flares
 BACKGROUND_COLOR = (10, 10, 30)  # Dark blue for a space-like feel
+BACKGROUND_BOTTOM_COLOR = tuple(channel + 20 for channel in BACKGROUND_COLOR)  # The background lightens downwards
 FLARE_LIFE_MAX = 20  # Maximum lifecycle of a flare (in frames)
+FLARE_LIFE_STEP = 2  # Lifecycle a flare progresses each frame
 ROTATION_SPEED_BASE = 0.02  # Base rotation speed
 BASE_RADIUS = 15
-RADIUS_SCALING = 1.05  # Maximum increase in radius
+RADIUS_SCALING = 60  # Maximum increase in radius
+MAX_FLARES_PER_FRAME = 10  # Flares spawned each frame at full bass
+PAN_RANGE = 0.25  # Fraction of the screen width the globe drifts with the L/R balance
 
 # Switch palette every 10 seconds
 last_palette_switch = time.time()
 
 # State variables
-flares = []
+flares = ParticleStore(fields=("angle", "length"))  # A flare's life counts down from FLARE_LIFE_MAX
 rotation_angle = 0
 rotation_speed = ROTATION_SPEED_BASE
 volume = 0
 smoothed_bass = 0  # Add this as a global variable
+balance = 0
+smoothed_balance = 0
 
 PALETTES = {
     "Ocean Glow": [(0, 191, 255), (64, 224, 208), (135, 206, 250)],
@@ -62,32 +69,14 @@ PALETTES = {
     "Sunrise Bliss": [(255, 87, 51), (255, 195, 113), (255, 159, 127)],
 }
 
-def audio_callback(indata, frames, time, status):
-    global volume, bass, midrange, treble
-    if status:
-        print(f"Status: {status}")
-
-    if status != "input overflow":
-      # Calculate the volume
-      volume = np.linalg.norm(indata) / np.sqrt(indata.size)
-
-      # Perform FFT on the audio data
-      fft_data = np.abs(np.fft.rfft(indata[:, 0]))  # Use one channel
-      freqs = np.fft.rfftfreq(len(indata[:, 0]), 1 / sample_rate)
-
-      # Bass (20-250 Hz), Midrange (250-4000 Hz), Treble (4000-20000 Hz)
-      bass = np.mean(fft_data[(freqs >= 20) & (freqs < 250)])
-      midrange = np.mean(fft_data[(freqs >= 250) & (freqs < 4000)])
-      treble = np.mean(fft_data[(freqs >= 4000)])
-
-# Draw a gradient background
-def draw_background(screen, screen_height, screen_width):
-    """Draw a gradient background."""
-    for y in range(screen_height):
-        color = tuple(
-            int(BACKGROUND_COLOR[i] + (20 * y / screen_height)) for i in range(3)
-        )
-        pygame.draw.line(screen, color, (0, y), (screen_width, y))
+def read_audio_features():
+    """Copy the latest features from the shared audio engine."""
+    global volume, bass, midrange, treble, balance
+    frame = audio_engine.current_frame()
+
+    # Levels normalized to 0-1 by the engine's gain control
+    volume, bass, midrange, treble = frame.volume_norm, frame.bass_norm, frame.midrange_norm, frame.treble_norm
+    balance = frame.balance
 
 def calculate_dynamic_radius(bass):
     """Calculate the globe radius based on bass levels."""
@@ -100,6 +89,15 @@ def calculate_dynamic_radius(bass):
     # Calculate dynamic radius
     return BASE_RADIUS + int(smoothed_bass * RADIUS_SCALING)
 
+def calculate_pan(balance, screen_width):
+    """Calculate the horizontal offset of the globe from the L/R balance."""
+    global smoothed_balance
+
+    smoothing_factor = 0.1
+    smoothed_balance = (smoothing_factor * balance) + ((1 - smoothing_factor) * smoothed_balance)
+
+    return int(smoothed_balance * PAN_RANGE * screen_width)
+
 # Draw the Globe
 def draw_globe(screen, center, radius, angle, base_color):
     """Draw a rotating globe with simple shading."""
@@ -107,81 +105,46 @@ def draw_globe(screen, center, radius, angle, base_color):
         math.cos(angle),  # Rotating light x-component
         math.sin(angle),  # Rotating light y-component
     )
-    for y in range(-radius, radius):
-        for x in range(-radius, radius):
-            distance = math.sqrt(x**2 + y**2)
-            if distance <= radius:  # Only draw within the circle
-                normal_x = x / radius
-                normal_y = y / radius
-                dot = normal_x * light_direction[0] + normal_y * light_direction[1]
-                shade = max(0, min(255, int(255 * dot)))
-
-                # Apply the shade to the base color
-                color = (
-                    max(0, min(255, base_color[0] + shade)),
-                    max(0, min(255, base_color[1] + shade)),
-                    max(0, min(255, base_color[2] + shade)),
-                )
-                screen.set_at((center[0] + x, center[1] + y), color)
+    draw_shaded_globe(screen, center, radius, light_direction, base_color)
 
 # Generate flares based on audio input
 # Generate flares based on audio input
 def generate_flares(bass, midrange, treble, color):
     """Create new solar flares dynamically."""
-    global flares
-
     # Determine flare count based on bass intensity
-    num_new_flares = int(bass / 3)
-
-    for _ in range(num_new_flares):
-        flares.append({
-            "angle": random.uniform(0, 2 * math.pi),
-            "life": 0,  # Start of lifecycle
-            "max_length": int(50 + 100 * (midrange + treble) / 2),  # Length grows with mid/treble
-            "color": color,
-        })
+    num_new_flares = int(bass * MAX_FLARES_PER_FRAME)
+
+    flares.spawn(
+        num_new_flares,
+        angle=np.random.uniform(0, 2 * math.pi, num_new_flares),
+        life=FLARE_LIFE_MAX,  # Start of lifecycle
+        length=int(50 + 100 * (midrange + treble) / 2),  # Length grows with mid/treble
+        color=color,
+    )
 
 # Render flares
 def render_flares(screen, globe_center, dynamic_radius):
     """Render flares and update their lifecycle."""
-    global flares
-    updated_flares = []
-
-    for flare in flares:
-        # Progress lifecycle
-        flare["life"] += 2
-        if flare["life"] > FLARE_LIFE_MAX:
-            continue  # Skip expired flares
-
-        # Calculate flare properties
-        progress = flare["life"] / FLARE_LIFE_MAX  # 0 to 1
-        length = flare["max_length"] * progress  # Flare grows over time
-        fade = 1 - progress  # Flare fades out over time
-        angle = flare["angle"]
+    # Progress lifecycle, skipping expired flares
+    flares.step(FLARE_LIFE_STEP)
+    flares.cull(flares["life"] >= 0)
 
-        # Calculate line thickness (start thick, get thinner)
-        thickness = max(1, int(10 * (1 - progress)))  # Start at 10px, taper to 1px
+    # Calculate flare properties
+    progress = 1 - flares["life"] / FLARE_LIFE_MAX  # 0 to 1
+    length = flares["length"] * progress  # Flare grows over time
+    fade = 1 - progress  # Flare fades out over time
+    cos, sin = np.cos(flares["angle"]), np.sin(flares["angle"])
 
-        # Calculate start and end points
-        start_x = globe_center[0] + dynamic_radius * math.cos(angle)
-        start_y = globe_center[1] + dynamic_radius * math.sin(angle)
-        end_x = globe_center[0] + (dynamic_radius + length) * math.cos(angle)
-        end_y = globe_center[1] + (dynamic_radius + length) * math.sin(angle)
+    # Calculate line thickness (start thick, get thinner)
+    thickness = np.maximum(1, (10 * (1 - progress)).astype(int))  # Start at 10px, taper to 1px
 
-        # Calculate faded color
-        color = (
-            int(flare["color"][0] * fade),
-            int(flare["color"][1] * fade),
-            int(flare["color"][2] * fade),
-        )
+    # Calculate start and end points
+    starts = np.stack((globe_center[0] + dynamic_radius * cos, globe_center[1] + dynamic_radius * sin), axis=1)
+    ends = np.stack((globe_center[0] + (dynamic_radius + length) * cos, globe_center[1] + (dynamic_radius + length) * sin), axis=1)
 
-        # Draw the flare
-        pygame.draw.line(screen, color, (start_x, start_y), (end_x, end_y), thickness)
-
-        # Keep the flare for the next frame
-        updated_flares.append(flare)
-
-    flares = updated_flares  # Replace with updated flares
+    # Draw the flares with faded colors
+    for color, start, end, width in zip(flares.faded_colors(fade).tolist(), starts.tolist(), ends.tolist(), thickness.tolist()):
+        pygame.draw.line(screen, color, start, end, width)
 
 def switch_palette(selected_palette):
     global last_palette_switch
@@ -193,43 +156,24 @@ def switch_palette(selected_palette):
 # Global state for the show
 def initialize(audio_settings, screen):
     """Initialize the show."""
-    global audio_stream, selected_palette
-    
-    # Extract audio settings
-
-    samplerate, channels, device_index, blocksize, latency = audio_settings
+    global selected_palette
 
-    sample_rate = samplerate
-    
-    
     # Randomly select a palette at the start
     selected_palette = random.choice(list(PALETTES.values()))
 
-    # Initialize audio stream
-    audio_stream = sd.InputStream(
-        samplerate=samplerate,
-        channels=channels,
-        device=device_index,
-        callback=audio_callback,
-        blocksize=blocksize,
-        latency=latency,
-    )
-    audio_stream.start()
-
 # Render a single frame
 def render_step(screen):
     """Render a single frame of the visualization."""
-    global flares, bass, midrange, treble, rotation_angle, rotation_speed, volume, selected_palette
+    global bass, midrange, treble, rotation_angle, rotation_speed, volume, selected_palette
 
-    # Clear the screen
-    screen.fill(BLACK)
+    read_audio_features()
 
     screen_width = screen.get_width()
     screen_height = screen.get_height()
-    globe_center = (screen_width // 2, screen_height // 2)
+    globe_center = (screen_width // 2 + calculate_pan(balance, screen_width), screen_height // 2)
     
     # Draw background
-    draw_background(screen, screen_height, screen_width)
+    draw_gradient(screen, BACKGROUND_COLOR, BACKGROUND_BOTTOM_COLOR)
 
     # Adjust rotation speed based on volume
     rotation_speed = ROTATION_SPEED_BASE + volume * 0.1
@@ -253,7 +197,7 @@ def render_step(screen):
 # Cleanup resources
 def cleanup():
     """Clean up resources for the show."""
-    global audio_stream
-    if audio_stream:
-        audio_stream.stop()
-        audio_stream.close()
+    global smoothed_bass, smoothed_balance
+    flares.clear()
+    smoothed_bass = 0
+    smoothed_balance = 0
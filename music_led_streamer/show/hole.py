@@ -1,46 +1,38 @@
 import pygame
-import sounddevice as sd
 import numpy as np
 import math
 import os
 import sys
 import random
 import time
-from music_led_streamer.object.particle import RingCollapsingParticle
+from music_led_streamer.object.particle import cull_rings, draw_rings, spawn_rings
+from music_led_streamer.object.particle_store import ParticleStore
 from music_led_streamer.util import BLACK, PALETTES
+from music_led_streamer.audio import engine as audio_engine
 
 # Configuration
-sample_rate = 44100
 volume = 0
 bass, midrange, treble = 0, 0, 0
-particles = []
-ring_particles = []
-max_volume = 1
+ring_particles = ParticleStore()
+MAX_RINGS_PER_BEAT = 10  # Rings spawned by a beat at full bass
+BASS_SCALE = 30  # Bass range the ring speed and size were tuned for
+beat = False  # A beat was detected since the previous render step
+last_beat_count = 0
 
 # Switch palette every 10 seconds
 last_palette_switch = time.time()
 
-# Audio callback
-def audio_callback(indata, frames, time, status):
-    global volume, bass, midrange, treble, max_volume
-    if status:
-        print(f"Status: {status}")
+def read_audio_features():
+    """Copy the latest features from the shared audio engine."""
+    global volume, bass, midrange, treble, beat, last_beat_count
+    frame = audio_engine.current_frame()
 
-    if status != "input overflow":
-        # Calculate the volume
-        volume = np.linalg.norm(indata) / np.sqrt(indata.size)
+    # Levels normalized to 0-1 by the engine's gain control
+    volume, bass, midrange, treble = frame.volume_norm, frame.bass_norm, frame.midrange_norm, frame.treble_norm
 
-        # Update max volume
-        max_volume = max(max_volume, volume)
-
-        # Perform FFT on the audio data
-        fft_data = np.abs(np.fft.rfft(indata[:, 0]))  # Use one channel
-        freqs = np.fft.rfftfreq(len(indata[:, 0]), 1 / sample_rate)
-
-        # Bass (20-250 Hz), Midrange (250-4000 Hz), Treble (4000-20000 Hz)
-        bass = np.mean(fft_data[(freqs >= 20) & (freqs < 250)])
-        midrange = np.mean(fft_data[(freqs >= 250) & (freqs < 4000)])
-        treble = np.mean(fft_data[(freqs >= 4000)])
+    # Several frames may be published between render steps, compare beat counts
+    beat = frame.beat_count != last_beat_count
+    last_beat_count = frame.beat_count
 
 def switch_palette(selected_palette):
     global last_palette_switch
@@ -104,10 +96,10 @@ def get_smooth_color(selected_palette, bass, midrange, treble, max_volume=1):
 # Draw radial patterns based on frequency bands
 def draw_radial_patterns(screen, selected_palette):
 
-    global volume, bass, midrange, treble, max_volume
+    global volume, bass, midrange, treble
     
     # Get a balanced color based on the frequency bands
-    color = get_smooth_color(selected_palette, bass, midrange, treble, max_volume)
+    color = get_smooth_color(selected_palette, bass, midrange, treble)
 
     # print (f"Treble: {treble}")
     # print (f"Bass: {bass}")
@@ -115,53 +107,37 @@ def draw_radial_patterns(screen, selected_palette):
     # Center of the screen
     center_x, center_y = screen.get_width() // 2, screen.get_height() // 2
 
-    ring_particle_count = int(int(bass) / 3)
-    if ring_particle_count < 1:
-        ring_particle_count = 1
+    # Spawn rings on beats only
+    ring_particle_count = 0
+    if beat:
+        ring_particle_count = max(1, int(bass * MAX_RINGS_PER_BEAT))
     # RINGS #
      # Spawn new ring particles based on bass
-    for _ in range(ring_particle_count):
-        #initial_radius = treble * midrange / 100
-        initial_radius = min(screen.get_width(), screen.get_height()) / 2  # Start from the screen edge
-        #print (f"Initial radius: {initial_radius}")
-        ring_particles.append(RingCollapsingParticle(center_x, center_y, color, initial_radius, bass))        
+    #initial_radius = treble * midrange / 100
+    initial_radius = min(screen.get_width(), screen.get_height()) / 2  # Start from the screen edge
+    # Rings shrink faster with more bass
+    spawn_rings(ring_particles, ring_particle_count, center_x, center_y, color, initial_radius, -(1 + bass * BASS_SCALE * 0.25))
 
     # Update and draw ring particles
-    for ring in ring_particles[:]:
-        ring.expand()
-        ring.draw(screen)
-        if not ring.is_alive():
-            ring_particles.remove(ring)
+    ring_particles.step()
+    cull_rings(ring_particles)
+    draw_rings(screen, ring_particles)
     
 # Global state for the show
 def initialize(audio_settings, screen):
     """Initialize the show."""
-    global audio_stream, selected_palette
+    global selected_palette
     
-    # Extract audio settings
-    samplerate, channels, device_index, blocksize, latency = audio_settings
-
-    sample_rate = samplerate
-
     # Randomly select a palette at the start
     selected_palette = random.choice(list(PALETTES.values()))
 
-    # Initialize audio stream
-    audio_stream = sd.InputStream(
-        samplerate=samplerate,
-        channels=channels,
-        device=device_index,
-        callback=audio_callback,
-        blocksize=blocksize,
-        latency=latency,
-    )
-    audio_stream.start()
-
 def render_step(screen):
     """Render a single frame of the visualization."""
 
     global selected_palette
 
+    read_audio_features()
+
     screen.fill(BLACK)
 
     draw_radial_patterns(screen, selected_palette)
@@ -177,7 +153,4 @@ def render_step(screen):
 
 def cleanup():
     """Clean up resources for the show."""
-    global audio_stream
-    if audio_stream:
-        audio_stream.stop()
-        audio_stream.close()
\ No newline at end of file
+    ring_particles.clear()
\ No newline at end of file
@@ -1,19 +1,19 @@
 import pygame
-import sounddevice as sd
 import numpy as np
-from collections import Counter
 from music_led_streamer.object.image_fragment import ImageFragment
+from music_led_streamer.object.fragment_field import FragmentField
+from music_led_streamer.audio import engine as audio_engine
+from music_led_streamer.render.background import draw_gradient
+from music_led_streamer.render.palette import dominant_colors, image_palette
 
-sample_Rate = 44100
 bass, midrange, treble = 0, 0, 0
 smoothed_bass, smoothed_midrange, smoothed_treble = 0, 0, 0  # Smoothed values
 gradient_colors = [(0, 0, 0), (0, 0, 0), (0, 0, 0)]  # Default black
 
 # Global state for the show
 fragments = []
+field = None  # The fragments as arrays, in the blits and remap render modes
 
-# Smoothing factor (closer to 1 = more smoothing)
-SMOOTHING_FACTOR = 0.2
 EXPANSION_FACTOR = 10  # Controls how much fragments separate
 
 # Image settings
@@ -22,56 +22,32 @@ NUM_ROWS = 50  # max Number of rows to split the image, if screen is too small,
 NUM_COLS = 50 # max Number of columns to split the image, if screen is too small, it will be less
 FRAGMENT_SPEED = 15  # Base movement speed
 BUFFER_PERCENTAGE = 0.10  # buffer zone around image to prevent image disspearing from screen with large bass
+RENDER_MODE = "blits"  # "fragments" draws ImageFragment objects, "blits" a FragmentField, "remap" moves its pixels without rotating
 
-# Audio callback
-def audio_callback(indata, frames, time, status):
-    """Calculates and updates the volume, bass, midrange, and treble levels from audio input.
+def read_audio_features():
+    """Copy the latest features from the shared audio engine.
 
-    This callback function processes audio data, performs FFT to extract frequency components,
-    and applies smoothing to the calculated values.
+    The engine applies an exponential moving average to the band levels, which
+    prevents "jitter" of the fragments.
     """
-    
-    global bass, midrange, treble, smoothed_bass, smoothed_treble, smoothed_midrange
-    if status:
-        print(f"Status: {status}")
-
-    if status != "input overflow":
-      
-      # Perform FFT on the audio data
-      fft_data = np.abs(np.fft.rfft(indata[:, 0]))  # Use one channel
-      freqs = np.fft.rfftfreq(len(indata[:, 0]), 1 / sample_Rate)
-
-      # Bass (20-250 Hz), Midrange (250-4000 Hz), Treble (4000-20000 Hz)
-      bass = np.mean(fft_data[(freqs >= 20) & (freqs < 250)])
-      midrange = np.mean(fft_data[(freqs >= 250) & (freqs < 4000)])
-      treble = np.mean(fft_data[(freqs >= 4000)])
-      
-      # Apply exponential moving average for smooth transitions to prevent "jitter" of fragements
-      smoothed_bass = (SMOOTHING_FACTOR * bass) + ((1 - SMOOTHING_FACTOR) * smoothed_bass)
-      smoothed_midrange = (SMOOTHING_FACTOR * midrange) + ((1 - SMOOTHING_FACTOR) * smoothed_midrange)
-      smoothed_treble = (SMOOTHING_FACTOR * treble) + ((1 - SMOOTHING_FACTOR) * smoothed_treble)
-      
-      #print (f"bass: {bass}, midrange: {midrange}, treble: {treble}")
+    global bass, midrange, treble, smoothed_bass, smoothed_midrange, smoothed_treble
+    frame = audio_engine.current_frame()
+    bass, midrange, treble = frame.bass, frame.midrange, frame.treble
+    smoothed_bass, smoothed_midrange, smoothed_treble = frame.smoothed_bass, frame.smoothed_midrange, frame.smoothed_treble
 
 def extract_top_colors(image, num_colors=3):
     """Extracts the most common colors from an image."""
-    image_data = pygame.surfarray.array3d(image)
-    pixels = image_data.reshape(-1, 3)  # Flatten pixels into RGB values
-    counter = Counter(map(tuple, pixels))  # Count occurrences of each color
-    return [color for color, _ in counter.most_common(num_colors)]
-
-def draw_gradient(screen, colors):
-    """Draws a vertical gradient background using the top 3 colors."""
-    width, height = screen.get_size()
-    for y in range(height):
-        ratio = y / height
-        r = int((1 - ratio) * colors[0][0] + ratio * colors[1][0])
-        g = int((1 - ratio) * colors[0][1] + ratio * colors[1][1])
-        b = int((1 - ratio) * colors[0][2] + ratio * colors[1][2])
-        pygame.draw.line(screen, (r, g, b), (0, y), (width, y))
+    return dominant_colors(pygame.surfarray.array3d(image), num_colors)
 
 def handle_image_paint(screen, bass, midrange, treble):
     """Manipulate and draw image fragments dynamically."""
+    if field is not None:
+        field.update(smoothed_bass, smoothed_midrange, smoothed_treble, FRAGMENT_SPEED, EXPANSION_FACTOR)
+        if RENDER_MODE == "remap":
+            field.draw_remap(screen)
+        else:
+            field.draw(screen)
+        return
     for fragment in fragments:
         fragment.update(smoothed_bass, smoothed_midrange, smoothed_treble, FRAGMENT_SPEED, EXPANSION_FACTOR)
         fragment.draw(screen)
@@ -79,12 +55,7 @@ def handle_image_paint(screen, bass, midrange, treble):
 # Global state for the show
 def initialize(audio_settings, screen):
     """Initialize the show."""
-    global audio_stream, selected_palette, sample_rate, fragments, gradient_colors
-    
-    # Extract audio settings
-    samplerate, channels, device_index, blocksize, latency = audio_settings
-
-    sample_Rate = samplerate
+    global fragments, field, gradient_colors
 
    # Load image and scale it to fit within the screen with a buffer
     screen_width, screen_height = screen.get_size()
@@ -128,7 +99,11 @@ def initialize(audio_settings, screen):
 
     # Split image and store each fragment
     fragments = []
-    for y in range(NUM_ROWS):
+    field = None
+    if RENDER_MODE != "fragments":
+        grid = (min(NUM_COLS, new_width // fragment_width), min(NUM_ROWS, new_height // fragment_height))
+        field = FragmentField(image, (image_x, image_y), (fragment_width, fragment_height), grid, (center_x, center_y))
+    for y in range(NUM_ROWS if field is None else 0):
         for x in range(NUM_COLS):
             frag_x = x * fragment_width
             frag_y = y * fragment_height
@@ -143,26 +118,16 @@ def initialize(audio_settings, screen):
             fragment = ImageFragment(image, frag_x, frag_y, fragment_width, fragment_height, start_x, start_y, center_x, center_y)
             fragments.append(fragment)
 
-    # Extract top colors for gradient background
-    gradient_colors = extract_top_colors(image, num_colors=3)
-
-    # Initialize audio stream
-    audio_stream = sd.InputStream(
-        samplerate=samplerate,
-        channels=channels,
-        device=device_index,
-        callback=audio_callback,
-        blocksize=blocksize,
-        latency=latency,
-    )
-    audio_stream.start()
+    # Extract top colors for gradient background, once per image file
+    gradient_colors = image_palette(IMAGE_PATH, num_colors=3)
 
 def render_step(screen):
     global selected_palette, bass, midrange, treble
     """Render a single frame of the visualization."""
+    read_audio_features()
     dt = pygame.time.Clock().tick(60) / 1000  # Delta time in seconds
 
-    draw_gradient(screen, gradient_colors)  # Draw gradient instead of black background
+    draw_gradient(screen, gradient_colors[0], gradient_colors[1])  # Draw gradient instead of black background
 
     # Draw the image fragments with motion effect
     handle_image_paint(screen, bass, midrange, treble)
@@ -170,7 +135,6 @@ def render_step(screen):
 
 def cleanup():
     """Clean up resources for the show."""
-    global audio_stream
-    if audio_stream:
-        audio_stream.stop()
-        audio_stream.close()
\ No newline at end of file
+    global field
+    fragments.clear()
+    field = None
\ No newline at end of file
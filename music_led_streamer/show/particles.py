@@ -1,43 +1,30 @@
 import pygame
-import sounddevice as sd
 import numpy as np
 import random
 import time
-from music_led_streamer.object.particle import Particle
-from music_led_streamer.util import BLACK, PALETTES
+from music_led_streamer.object.particle import draw_particles, spawn_particles
+from music_led_streamer.object.particle_store import ParticleStore
+from music_led_streamer.util import PALETTES
+from music_led_streamer.audio import engine as audio_engine
+from music_led_streamer.render.background import draw_gradient
 
 # Configuration
-sample_rate = 44100
 volume = 0
 bass, midrange, treble = 0, 0, 0
-particles = []
-ring_particles = []
-max_volume = 1
+particles = ParticleStore()
+MAX_PARTICLES_PER_FRAME = 20  # Particles spawned each frame at full bass
+MOTION_SCALE = 5  # Level range the particle speed was tuned for
 
 # Switch palette every 10 seconds
 last_palette_switch = time.time()
 
-# Audio callback
-def audio_callback(indata, frames, time, status):
-    global volume, bass, midrange, treble, max_volume
-    if status:
-        print(f"Status: {status}")
+def read_audio_features():
+    """Copy the latest features from the shared audio engine."""
+    global volume, bass, midrange, treble
+    frame = audio_engine.current_frame()
 
-    if status != "input overflow":
-        # Calculate the volume
-        volume = np.linalg.norm(indata) / np.sqrt(indata.size)
-
-        # Update max volume
-        max_volume = max(max_volume, volume)
-
-        # Perform FFT on the audio data
-        fft_data = np.abs(np.fft.rfft(indata[:, 0]))  # Use one channel
-        freqs = np.fft.rfftfreq(len(indata[:, 0]), 1 / sample_rate)
-
-        # Bass (20-250 Hz), Midrange (250-4000 Hz), Treble (4000-20000 Hz)
-        bass = np.mean(fft_data[(freqs >= 20) & (freqs < 250)])
-        midrange = np.mean(fft_data[(freqs >= 250) & (freqs < 4000)])
-        treble = np.mean(fft_data[(freqs >= 4000)])
+    # Levels normalized to 0-1 by the engine's gain control
+    volume, bass, midrange, treble = frame.volume_norm, frame.bass_norm, frame.midrange_norm, frame.treble_norm
 
 def switch_palette(selected_palette):
     global last_palette_switch
@@ -90,72 +77,41 @@ def get_smooth_color(selected_palette, bass, midrange, treble, max_volume=1):
 # Draw radial patterns based on frequency bands
 def draw_radial_patterns(screen, selected_palette):
 
-    global volume, bass, midrange, treble, max_volume
+    global volume, bass, midrange, treble
     
     # Get a balanced color based on the frequency bands
-    color = get_smooth_color(selected_palette, bass, midrange, treble, max_volume)
+    color = get_smooth_color(selected_palette, bass, midrange, treble)
 
     # Center of the screen
     center_x, center_y = screen.get_width() // 2, screen.get_height() // 2
 
     # PARTICLES #
      # Spawn new particles based on bass
-    for _ in range(int(bass * 1)):
-        size = random.randint(2, 5)
-        #speed_x = random.uniform(-2, 2)
-        #speed_y = random.uniform(-2, 2)
-        #particles.append(Particle(center_x, center_y, color, size, speed_x, speed_y))
-        particles.append(Particle(center_x, center_y, color, size, midrange, treble))
+    num_new_particles = int(bass * MAX_PARTICLES_PER_FRAME)
+    sizes = np.random.randint(2, 6, num_new_particles)
+    spawn_particles(particles, num_new_particles, center_x, center_y, color, sizes, midrange * MOTION_SCALE, treble * MOTION_SCALE)
 
     # Update and draw particles
-    for particle in particles[:]:
-        particle.move()
-        particle.draw(screen)
-        if not particle.is_alive():
-            particles.remove(particle)
-
-# Function to draw the gradient background
-def draw_gradient_background(screen, width, height, colors):
-    for y in range(height):
-        t = y / height
-        r = int(colors[0][0] * (1 - t) + colors[1][0] * t)
-        g = int(colors[0][1] * (1 - t) + colors[1][1] * t)
-        b = int(colors[0][2] * (1 - t) + colors[1][2] * t)
-        pygame.draw.line(screen, (r, g, b), (0, y), (width, y))
+    particles.step()
+    particles.cull()
+    draw_particles(screen, particles)
 
 # Global state for the show
 def initialize(audio_settings, screen):
     """Initialize the show."""
-    global audio_stream, selected_palette, sample_rate
+    global selected_palette
     
-    # Extract audio settings
-    samplerate, channels, device_index, blocksize, latency = audio_settings
-
-    sample_rate = samplerate
-
     # Randomly select a palette at the start
     selected_palette = random.choice(list(PALETTES.values()))
 
-    # Initialize audio stream
-    audio_stream = sd.InputStream(
-        samplerate=samplerate,
-        channels=channels,
-        device=device_index,
-        callback=audio_callback,
-        blocksize=blocksize,
-        latency=latency,
-    )
-    audio_stream.start()
-
 def render_step(screen):
     """Render a single frame of the visualization."""
 
     global selected_palette
 
-    screen.fill(BLACK)
+    read_audio_features()
 
-    screen_width, screen_height = screen.get_width(), screen.get_height()
-    draw_gradient_background(screen, screen_width, screen_height, selected_palette)
+    draw_gradient(screen, selected_palette[0], selected_palette[1])
 
     draw_radial_patterns(screen, selected_palette)
 
@@ -169,7 +125,4 @@ def render_step(screen):
 
 def cleanup():
     """Clean up resources for the show."""
-    global audio_stream
-    if audio_stream:
-        audio_stream.stop()
-        audio_stream.close()
\ No newline at end of file
+    particles.clear()
\ No newline at end of file
@@ -1,5 +1,4 @@
 import pygame
-import sounddevice as sd
 import numpy as np
 import random
 import os
@@ -8,39 +7,25 @@ import math
 from music_led_streamer.util import BLACK, frequency_to_rgb
 from music_led_streamer.object.shape import Shape
 from music_led_streamer.color_music_mapper import ColorSoundMapper
+from music_led_streamer.audio import engine as audio_engine
 
 
-sample_Rate = 44100
-
-# Audio callback
+# Audio features
 volume = 0
 bass, midrange, treble = 0, 0, 0
 dominant_frequency = 0
+pitch_hz, pitch_confidence = 0, 0
 shapes = []  # List to store active shapes
 mapped_colors = ColorSoundMapper.create_instances()
+MIN_PITCH_CONFIDENCE = 0.5  # Below this the color follows the dominant frequency instead of the pitch
 
-def audio_callback(indata, frames, time, status):
-    global volume, bass, midrange, treble, dominant_frequency
-    if status:
-        print(f"Status: {status}")
-
-    # Calculate the volume
-    volume = np.linalg.norm(indata) / np.sqrt(indata.size)
-
-    # Perform FFT on the audio data
-    fft_data = np.abs(np.fft.rfft(indata[:, 0]))  # Use one channel
-    freqs = np.fft.rfftfreq(len(indata[:, 0]), 1 / sample_Rate)
-
-    # Bass (20-250 Hz), Midrange (250-4000 Hz), Treble (4000-20000 Hz)
-    bass = np.mean(fft_data[(freqs >= 20) & (freqs < 250)])
-    midrange = np.mean(fft_data[(freqs >= 250) & (freqs < 4000)])
-    treble = np.mean(fft_data[(freqs >= 4000)])
-    # Find the dominant frequency
-    dominant_idx = np.argmax(fft_data)
-    dominant_frequency = freqs[dominant_idx]# * 2  # Adjust for doubling frequency
-     # Ensure the dominant frequency is above a safe threshold
-    if dominant_frequency < 20:
-        dominant_frequency = 20  # Set a minimum frequency
+def read_audio_features():
+    """Copy the latest features from the shared audio engine."""
+    global volume, bass, midrange, treble, dominant_frequency, pitch_hz, pitch_confidence
+    frame = audio_engine.current_frame()
+    volume, bass, midrange, treble = frame.volume, frame.bass, frame.midrange, frame.treble
+    dominant_frequency = frame.dominant_frequency
+    pitch_hz, pitch_confidence = frame.pitch_hz, frame.pitch_confidence
 
 # Draw shapes
 def draw_shapes(screen, dt):
@@ -57,6 +42,11 @@ def draw_shapes(screen, dt):
     if int(total_shapes) == 0:
         total_shapes = int((bass * 100) + (midrange * 100) + (treble * 100)  * 0.1)
     if len(shapes) + total_shapes <= 900:
+        # Color by the note being played, when there is a clear one
+        if pitch_confidence >= MIN_PITCH_CONFIDENCE:
+            mapped_color = ColorSoundMapper.find_by_note(mapped_colors, pitch_hz)
+        else:
+            mapped_color = ColorSoundMapper.find_by_frequency(mapped_colors, dominant_frequency)
         for _ in range(total_shapes):
             x = random.randint(0, screen.get_width())
             y = random.randint(0, screen.get_height())
@@ -64,7 +54,6 @@ def draw_shapes(screen, dt):
             # Use dominant frequency to determine the color
             #color = frequency_to_rgb(dominant_frequency)
             #print(f"dominant_frequency: {dominant_frequency}")
-            mapped_color = ColorSoundMapper.find_by_frequency(mapped_colors, dominant_frequency)
             if mapped_color != None:
                 color = mapped_color.get_rgb()
             else:
@@ -73,7 +62,8 @@ def draw_shapes(screen, dt):
             shapes.append(Shape(x, y, size, color, lifetime, treble, midrange, bass))
 
     # Update and draw existing shapes.  update returns False if the shape is expired
-    shapes = [shape for shape in shapes if shape.update(dt)]
+    screen_size = screen.get_size()
+    shapes = [shape for shape in shapes if shape.update(dt, screen_size)]
     for shape in shapes:
         shape.draw(screen)
 
@@ -103,26 +93,10 @@ def draw_shapes(screen, dt):
 # Global state for the show
 def initialize(audio_settings, screen):
     """Initialize the show."""
-    global audio_stream
-    
-    # Extract audio settings
-    samplerate, channels, device_index, blocksize, latency = audio_settings
-
-    sample_Rate = samplerate
-
-    # Initialize audio stream
-    audio_stream = sd.InputStream(
-        samplerate=samplerate,
-        channels=channels,
-        device=device_index,
-        callback=audio_callback,
-        blocksize=blocksize,
-        latency=latency,
-    )
-    audio_stream.start()
 
 def render_step(screen):
     """Render a single frame of the visualization."""
+    read_audio_features()
     dt = pygame.time.Clock().tick(60) / 1000  # Delta time in seconds
     screen.fill(BLACK)
     draw_shapes(screen, dt)
@@ -130,7 +104,4 @@ def render_step(screen):
 
 def cleanup():
     """Clean up resources for the show."""
-    global audio_stream
-    if audio_stream:
-        audio_stream.stop()
-        audio_stream.close()
\ No newline at end of file
+    shapes.clear()
\ No newline at end of file
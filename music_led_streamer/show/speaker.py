@@ -1,12 +1,13 @@
 import pygame
-import sounddevice as sd
 import numpy as np
 import time
 import random
-from music_led_streamer.util import BLACK, PALETTES
+from music_led_streamer.util import PALETTES
+from music_led_streamer.audio import engine as audio_engine
+from music_led_streamer.render import display
+from music_led_streamer.render.background import draw_gradient, draw_blended_gradient
 
 # Configuration
-sample_rate = 44100
 volume = 0
 bass, midrange, treble = 0, 0, 0
 
@@ -19,7 +20,6 @@ TOWER_BACKGROUND_COLOR = (50, 50, 50)
 last_palette_switch = time.time()
 
 frequency_bands = np.zeros(NUM_BANDS)
-band_frequencies = np.geomspace(20, sample_rate / 2, NUM_BANDS + 1)
 
 # Palette Configuration
 current_palette = [(0, 0, 0), (0, 0, 0), (0, 0, 0)]
@@ -27,46 +27,12 @@ next_palette = [(0, 0, 0), (0, 0, 0), (0, 0, 0)]
 fade_start_time = time.time()
 fade_duration = 3  # 3 seconds for fade effect
 
-# Audio callback
-def audio_callback(indata, frames, time, status):
+def read_audio_features():
+    """Copy the latest features from the shared audio engine."""
     global volume, frequency_bands, bass, midrange, treble
-    if status:
-        print(f"Status: {status}")
-
-    
-    if status != "Input Overflow":
-        # Calculate the volume
-        volume = np.linalg.norm(indata) / np.sqrt(indata.size)
-        
-        # Perform FFT
-        fft_data = np.abs(np.fft.rfft(indata[:, 0]))  # Use one channel
-        freqs = np.fft.rfftfreq(len(indata[:, 0]), 1 / sample_rate)
-
-         # Bass (20-250 Hz), Midrange (250-4000 Hz), Treble (4000-20000 Hz)
-        bass = np.mean(fft_data[(freqs >= 20) & (freqs < 250)])
-        midrange = np.mean(fft_data[(freqs >= 250) & (freqs < 4000)])
-        treble = np.mean(fft_data[(freqs >= 4000)])
-        
-        # Calculate frequency band amplitudes
-        band_amplitudes = np.zeros(NUM_BANDS)
-        
-        for i in range(NUM_BANDS):
-            # Extract the frequencies for the current band
-            band_data = fft_data[(freqs >= band_frequencies[i]) & (freqs < band_frequencies[i + 1])]
-            
-            # Check if the band_data is not empty
-            if band_data.size > 0:
-                band_amplitudes[i] = np.mean(band_data)
-            else:
-                band_amplitudes[i] = 0  # Default value for empty bands
-
-        # Smooth neighboring bands for visualization
-        for i in range(1, NUM_BANDS - 1):
-            if band_amplitudes[i] == 0:
-                band_amplitudes[i] = (band_amplitudes[i - 1] + band_amplitudes[i + 1]) / 2
-
-        # Smooth out the amplitudes for a cleaner visualization
-        frequency_bands = 0.8 * frequency_bands + 0.2 * band_amplitudes
+    frame = audio_engine.current_frame()
+    volume, bass, midrange, treble = frame.volume, frame.bass, frame.midrange, frame.treble
+    frequency_bands = frame.band_amplitudes
 
 # Function to draw the speaker tower
 def draw_speaker_tower(screen, center_x, center_y, tower_width, tower_height):
@@ -75,20 +41,22 @@ def draw_speaker_tower(screen, center_x, center_y, tower_width, tower_height):
     pygame.draw.rect(screen, TOWER_BACKGROUND_COLOR, (center_x - tower_width // 2 + border_width, center_y - tower_height // 2 + border_width, tower_width - 2 * border_width, tower_height - 2 * border_width), 0)
 
 
-# Function to draw enhanced speaker cones with dynamic ring colors
+# Function to draw enhanced speaker cones with dynamic ring colors, returning the rectangle drawn
 def draw_speaker_cone(screen, center_x, center_y, frequency_response, base_radius, max_displacement, base_color, num_rings=10):
     cone_displacement = min(int(np.log1p(frequency_response) * 15), max_displacement)
 
+    rect = pygame.Rect(center_x, center_y, 0, 0)
     for i in range(num_rings):
         ring_radius = base_radius - i * 8 + cone_displacement
         if ring_radius > 0:
             alpha = max(50, 255 - i * 25)
             color = calculate_ring_color(base_color, frequency_response)
-            pygame.draw.circle(screen, color, (center_x, center_y), ring_radius, 2)
+            rect.union_ip(pygame.draw.circle(screen, color, (center_x, center_y), ring_radius, 2))
 
-    pygame.draw.circle(screen, TOWER_BACKGROUND_COLOR, (center_x, center_y), base_radius - 40 + cone_displacement)
+    rect.union_ip(pygame.draw.circle(screen, TOWER_BACKGROUND_COLOR, (center_x, center_y), base_radius - 40 + cone_displacement))
+    return rect
 
-# Function to draw the speakers in a tower
+# Function to draw the speakers in a tower, returning the rectangles of the cones
 def draw_speakers(screen, center_x, center_y, tower_height, bass, midrange, treble, palette):
     speaker_spacing = tower_height // 3
     half_spacing = speaker_spacing // 2
@@ -101,15 +69,17 @@ def draw_speakers(screen, center_x, center_y, tower_height, bass, midrange, treb
         center_y + tower_height // 2 - half_spacing,  # Bass
     ]
 
+    rects = []
     for i, y in enumerate(speaker_positions):
         if i == 0:
-            draw_speaker_cone(screen, center_x, y, treble, int(base_radii[i]), int(max_displacements[i]), palette[2], num_rings=8)
+            rects.append(draw_speaker_cone(screen, center_x, y, treble, int(base_radii[i]), int(max_displacements[i]), palette[2], num_rings=8))
         elif i == 1:
-            draw_speaker_cone(screen, center_x, y, midrange, int(base_radii[i]), int(max_displacements[i]), palette[1], num_rings=10)
+            rects.append(draw_speaker_cone(screen, center_x, y, midrange, int(base_radii[i]), int(max_displacements[i]), palette[1], num_rings=10))
         elif i == 2:
-            draw_speaker_cone(screen, center_x, y, bass, int(base_radii[i]), int(max_displacements[i]), palette[0], num_rings=12)
+            rects.append(draw_speaker_cone(screen, center_x, y, bass, int(base_radii[i]), int(max_displacements[i]), palette[0], num_rings=12))
+    return rects
 
-# Function to draw the equalizer with scaling
+# Function to draw the equalizer with scaling, returning the rectangle of its bars
 def draw_equalizer(screen, center_x, center_y, frequency_bands, left_tower_x, right_tower_x, screen_height, gap=40):
     equalizer_height = screen_height * 0.3  # 30% of screen height
 
@@ -121,10 +91,10 @@ def draw_equalizer(screen, center_x, center_y, frequency_bands, left_tower_x, ri
 
     # Draw the housing (outer frame)
     pygame.draw.rect(screen, TOWER_BORDER_COLOR, (housing_x, housing_y, housing_width, housing_height), 0)
-    pygame.draw.rect(screen, TOWER_BACKGROUND_COLOR, (housing_x + 10, housing_y + 10, housing_width - 20, housing_height - 20), 0)
+    rect = pygame.draw.rect(screen, TOWER_BACKGROUND_COLOR, (housing_x + 10, housing_y + 10, housing_width - 20, housing_height - 20), 0)
 
     if frequency_bands is None or len(frequency_bands) == 0:
-        return
+        return rect
 
     # Draw the bars inside the housing
     bar_width = (housing_width - 75) // len(frequency_bands)  # Account for spacing
@@ -143,6 +113,7 @@ def draw_equalizer(screen, center_x, center_y, frequency_bands, left_tower_x, ri
         color = (red % 255, green % 255, blue % 255)
 
         pygame.draw.rect(screen, color, (bar_x, bar_y - bar_height // 2, bar_width, bar_height))
+    return rect
 
 
 # Function to calculate the gradient color intensity
@@ -180,15 +151,6 @@ def calculate_ring_color(base_color, frequency_level):
         min(255, int(base_color[2] * (frequency_level / 10))),
     )
 
-# Function to draw the gradient background
-def draw_gradient_background(screen, width, height, colors):
-    for y in range(height):
-        t = y / height
-        r = int(colors[0][0] * (1 - t) + colors[1][0] * t)
-        g = int(colors[0][1] * (1 - t) + colors[1][1] * t)
-        b = int(colors[0][2] * (1 - t) + colors[1][2] * t)
-        pygame.draw.line(screen, (r, g, b), (0, y), (width, y))
-
 # Function to switch palettes and handle fade effect
 def switch_palette():
     global current_palette, next_palette, fade_start_time
@@ -201,34 +163,20 @@ def switch_palette():
 # Global state for the show
 def initialize(audio_settings, screen):
     """Initialize the show."""
-    global audio_stream, selected_palette, sample_rate, current_palette, next_palette
-    
-    # Extract audio settings
-    samplerate, channels, device_index, blocksize, latency = audio_settings
+    global current_palette, next_palette
 
-    sample_rate = samplerate
+    audio_engine.set_num_bands(NUM_BANDS)
 
     # Randomly select a palette at the start
     current_palette = random.choice(list(PALETTES.values()))
     next_palette = random.choice(list(PALETTES.values()))
 
-    # Initialize audio stream
-    audio_stream = sd.InputStream(
-        samplerate=samplerate,
-        channels=channels,
-        device=device_index,
-        callback=audio_callback,
-        blocksize=blocksize,
-        latency=latency,
-    )
-    audio_stream.start()
-
 
 def render_step(screen):
 
     global frequency_bands, selected_palette, current_palette, next_palette, fade_start_time
 
-    screen.fill(BLACK)
+    read_audio_features()
 
     screen_width, screen_height = screen.get_width(), screen.get_height()
     tower_height = int(screen_height * 0.8)  # Towers occupy 80% of the screen height
@@ -236,30 +184,31 @@ def render_step(screen):
 
     # Handle palette switching and fading
     switch_palette()
-    #fade_progress = min(1, (time.time() - fade_start_time) / fade_duration)
-    #interpolated_palette = interpolate_palettes(current_palette, next_palette, fade_progress)
+    fade_progress = min(1, (time.time() - fade_start_time) / fade_duration)
+    interpolated_palette = interpolate_palettes(current_palette, next_palette, fade_progress)
 
-    # Draw gradient background     
-    draw_gradient_background(screen, screen_width, screen_height, current_palette)
+    # Draw gradient background, the cached one once the fade is over
+    if fade_progress < 1:
+        draw_blended_gradient(screen, current_palette, next_palette, fade_progress)
+    else:
+        draw_gradient(screen, next_palette[0], next_palette[1])
 
      # Left tower
     left_tower_x = screen_width // 4
     draw_speaker_tower(screen, left_tower_x, screen_height // 2, tower_width, tower_height)
-    draw_speakers(screen, left_tower_x, screen_height // 2, tower_height, bass, midrange, treble, current_palette)
+    rects = draw_speakers(screen, left_tower_x, screen_height // 2, tower_height, bass, midrange, treble, interpolated_palette)
 
     # Right tower
     right_tower_x = 3 * screen_width // 4
     draw_speaker_tower(screen, right_tower_x, screen_height // 2, tower_width, tower_height)
-    draw_speakers(screen, right_tower_x, screen_height // 2, tower_height, bass, midrange, treble, current_palette)
+    rects += draw_speakers(screen, right_tower_x, screen_height // 2, tower_height, bass, midrange, treble, interpolated_palette)
 
     # Equalizer
-    draw_equalizer(screen, screen_width // 2, screen_height // 2, frequency_bands, left_tower_x, right_tower_x, screen_height, gap=50)
+    rects.append(draw_equalizer(screen, screen_width // 2, screen_height // 2, frequency_bands, left_tower_x, right_tower_x, screen_height, gap=50))
 
-    pygame.display.update()
+    # Only the cones and the equalizer change once the background has faded, in dirty rectangle mode
+    display.present(rects if fade_progress >= 1 else None)
 
 
 def cleanup():
-    global audio_stream
-    if audio_stream:
-        audio_stream.stop()
-        audio_stream.close()
+    """Clean up resources for the show."""
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.agc import GainControl
+
+class TestGainControl:
+
+    @pytest.mark.parametrize(
+        "id, level, expected",
+        [
+            ("happy_path_quiet_input", 0.01, 1.0),
+            ("happy_path_loud_input", 100.0, 1.0),
+        ],
+    )
+    def test_steady_input_normalizes_to_one(self, id, level, expected):
+        # Arrange
+        gain = GainControl(floors=[0.001], frame_rate=10, window=2, update_interval=1)
+
+        # Act
+        for _ in range(40):
+            normalized = gain.update([level])
+
+        # Assert
+        assert normalized[0] == pytest.approx(expected)
+
+    def test_single_transient_does_not_dim(self):
+        # Arrange
+        gain = GainControl(floors=[0.001], frame_rate=10, window=2, update_interval=1)
+        for _ in range(20):
+            gain.update([1.0])
+
+        # Act
+        gain.update([1000.0])
+        normalized = gain.update([1.0])
+
+        # Assert
+        assert normalized[0] == pytest.approx(1.0)
+
+    def test_loud_passage_is_forgotten(self):
+        # Arrange
+        gain = GainControl(floors=[0.001], frame_rate=10, window=2, update_interval=4)
+        for _ in range(20):
+            gain.update([1.0])
+
+        # Act
+        loud = [gain.update([1000.0])[0] for _ in range(10)]
+        during = gain.update([1.0])[0]
+        after = [gain.update([1.0])[0] for _ in range(24)]
+
+        # Assert
+        assert loud[-1] == pytest.approx(1.0)
+        assert during < 0.01
+        assert after[-1] == pytest.approx(1.0)
+
+    def test_silence_is_not_amplified(self):
+        # Arrange
+        gain = GainControl(floors=[0.1, 0.5], frame_rate=10, window=2, update_interval=1)
+
+        # Act
+        for _ in range(40):
+            normalized = gain.update([0.01, 0.05])
+
+        # Assert
+        np.testing.assert_allclose(normalized, [0.1, 0.1])
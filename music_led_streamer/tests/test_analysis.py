@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.analysis import AudioAnalyzer, stereo_features
+from music_led_streamer.audio.frame import FeatureFrame
+
+def tone(frequency, samplerate=44100, length=2048):
+    """A unit sine of the given frequency."""
+    return np.sin(2 * np.pi * frequency * np.arange(length) / samplerate).astype(np.float32)
+
+class TestStereoFeatures:
+
+    @pytest.mark.parametrize(
+        "id, left_gain, right_gain, expected_correlation, expected_balance",
+        [
+            ("happy_path_centered_mono", 1, 1, 1, 0),
+            ("happy_path_left_only", 1, 0, 0, -1),
+            ("happy_path_right_louder", 0.5, 1.5, 1, 0.5),
+            ("edge_case_out_of_phase", 1, -1, -1, 0),
+            ("edge_case_silence", 0, 0, 0, 0),
+        ],
+    )
+    def test_stereo_features(self, id, left_gain, right_gain, expected_correlation, expected_balance):
+        # Arrange
+        signal = tone(440)
+        samples = np.stack((signal * left_gain, signal * right_gain), axis=1)
+
+        # Act
+        mid_energy, side_energy, correlation, balance = stereo_features(samples)
+
+        # Assert
+        assert correlation == pytest.approx(expected_correlation, abs=1e-6)
+        assert balance == pytest.approx(expected_balance, abs=1e-6)
+        assert mid_energy == pytest.approx(np.sqrt(np.mean((signal * (left_gain + right_gain) / 2) ** 2)), abs=1e-6)
+        assert side_energy == pytest.approx(np.sqrt(np.mean((signal * (left_gain - right_gain) / 2) ** 2)), abs=1e-6)
+
+    def test_single_channel_is_centered(self):
+        # Arrange
+        samples = tone(440)[:, np.newaxis]
+
+        # Act
+        _, side_energy, correlation, balance = stereo_features(samples)
+
+        # Assert
+        assert (side_energy, correlation, balance) == (0, pytest.approx(1), 0)
+
+class TestAudioAnalyzer:
+
+    def test_channel_bands(self):
+        # Arrange
+        analyzer = AudioAnalyzer(44100, channels=2, num_bands=8, fft_size=2048, bass_decimation=1)
+        frame = FeatureFrame(num_bands=8, channels=2)
+        samples = np.stack((tone(100), tone(5000)), axis=1)
+
+        # Act
+        analyzer.process(samples, frame)
+
+        # Assert
+        left, right = frame.channel_band_amplitudes
+        assert np.argmax(left) < np.argmax(right)
+        np.testing.assert_allclose(frame.band_amplitudes, (left + right) / 2, rtol=0.1, atol=1)
+
+    def test_pitch_follows_note(self):
+        # Arrange
+        analyzer = AudioAnalyzer(44100, channels=1, num_bands=8, fft_size=2048, bass_decimation=1)
+        frame = FeatureFrame(num_bands=8, channels=1)
+        # The second harmonic is the loudest bin
+        samples = (tone(220) + tone(440) * 2 + tone(660))[:, np.newaxis]
+
+        # Act
+        analyzer.process(samples, frame)
+
+        # Assert
+        assert frame.pitch_hz == pytest.approx(220, abs=1)
+        assert frame.dominant_frequency == pytest.approx(440, abs=22)
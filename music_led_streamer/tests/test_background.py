@@ -0,0 +1,67 @@
+import numpy as np
+import pygame
+import pytest
+
+from music_led_streamer.render.background import draw_gradient, draw_blended_gradient, gradient_column, gradient_surface
+
+def reference_gradient(color_top, color_bottom, height):
+    """The per row gradient the shows used to draw with pygame.draw.line."""
+    rows = []
+    for y in range(height):
+        t = y / height
+        rows.append([int(color_top[i] * (1 - t) + color_bottom[i] * t) for i in range(3)])
+    return np.array(rows)
+
+class TestGradient:
+
+    @pytest.mark.parametrize(
+        "id, color_top, color_bottom, height",
+        [
+            ("happy_path_palette", (0, 191, 255), (64, 224, 208), 480),
+            ("happy_path_darkening", (255, 87, 51), (25, 25, 112), 100),
+            ("edge_case_single_row", (10, 20, 30), (200, 200, 200), 1),
+        ],
+    )
+    def test_gradient_column_matches_rows(self, id, color_top, color_bottom, height):
+        # Act
+        column = gradient_column(color_top, color_bottom, height)
+
+        # Assert
+        np.testing.assert_array_equal(column, reference_gradient(color_top, color_bottom, height))
+
+    def test_draw_gradient_fills_screen(self):
+        # Arrange
+        screen = pygame.Surface((7, 50))
+
+        # Act
+        draw_gradient(screen, [0, 0, 64], np.array([0, 0, 128]))
+
+        # Assert
+        pixels = pygame.surfarray.array3d(screen)
+        expected = reference_gradient((0, 0, 64), (0, 0, 128), 50)
+        for x in range(7):
+            np.testing.assert_array_equal(pixels[x], expected)
+
+    def test_gradient_surface_is_cached(self):
+        # Act
+        first = gradient_surface((1, 2, 3), (4, 5, 6), (10, 20))
+        second = gradient_surface((1, 2, 3), (4, 5, 6), (10, 20))
+
+        # Assert
+        assert first is second
+
+    @pytest.mark.parametrize("id, progress", [("edge_case_start", 0.0), ("happy_path_halfway", 0.5), ("edge_case_end", 1.0)])
+    def test_draw_blended_gradient(self, id, progress):
+        # Arrange
+        screen = pygame.Surface((3, 40))
+        colors_from = [(0, 0, 0), (100, 100, 100), (1, 1, 1)]
+        colors_to = [(200, 100, 0), (0, 100, 200), (1, 1, 1)]
+
+        # Act
+        draw_blended_gradient(screen, colors_from, colors_to, progress)
+
+        # Assert
+        column = pygame.surfarray.array3d(screen)[1]
+        expected = (reference_gradient(colors_from[0], colors_from[1], 40) * (1 - progress)
+                    + reference_gradient(colors_to[0], colors_to[1], 40) * progress)
+        np.testing.assert_allclose(column, expected, atol=1)
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.bands import BandMapper, Filterbank, get_band_mapper, geometric_band_edges, band_edges, hz_to_mel
+
+class TestBandMapper:
+
+    @pytest.mark.parametrize(
+        "id, samplerate, fft_size, num_bands",
+        [
+            ("happy_path_default_block", 44100, 1024, 25),
+            ("happy_path_speaker_bands", 48000, 1024, 20),
+            ("edge_case_small_block", 44100, 256, 25),
+            ("edge_case_large_block", 44100, 4096, 64),
+        ],
+    )
+    def test_apply_matches_masked_means(self, id, samplerate, fft_size, num_bands):
+        # Arrange
+        edges = geometric_band_edges(num_bands, samplerate)
+        mapper = BandMapper(samplerate, fft_size, edges)
+        spectrum = np.random.default_rng(0).random(fft_size // 2 + 1)
+        freqs = np.fft.rfftfreq(fft_size, 1 / samplerate)
+
+        # Act
+        bands = mapper.apply(spectrum, fill_empty=False)
+
+        # Assert
+        for i in range(num_bands):
+            band_data = spectrum[(freqs >= edges[i]) & (freqs < edges[i + 1])]
+            expected = np.mean(band_data) if band_data.size > 0 else 0
+            assert bands[i] == pytest.approx(expected)
+
+    def test_apply_interpolates_empty_bands(self):
+        # Arrange
+        mapper = BandMapper(8, 8, (0, 1, 1.5, 1.8, 2, 3))
+        spectrum = np.array([1.0, 2.0, 4.0, 8.0, 16.0])
+
+        # Act
+        bands = mapper.apply(spectrum)
+
+        # Assert
+        assert bands[0] == 1.0
+        assert bands[1] == 2.0
+        assert bands[2] == pytest.approx(2.0 + (4.0 - 2.0) * 1 / 3)
+        assert bands[3] == pytest.approx(2.0 + (4.0 - 2.0) * 2 / 3)
+        assert bands[4] == 4.0
+
+    def test_apply_keeps_leading_dimensions(self):
+        # Arrange
+        mapper = BandMapper(44100, 1024, geometric_band_edges(25, 44100))
+        spectrum = np.random.default_rng(1).random((2, 513))
+
+        # Act
+        bands = mapper.apply(spectrum)
+
+        # Assert
+        assert bands.shape == (2, 25)
+        np.testing.assert_allclose(bands[1], mapper.apply(spectrum[1]))
+
+    def test_apply_without_bins(self):
+        # Arrange
+        mapper = BandMapper(44100, 16, (20, 30, 40))
+
+        # Act
+        bands = mapper.apply(np.ones(9))
+
+        # Assert
+        np.testing.assert_array_equal(bands, np.zeros(2))
+
+    def test_get_band_mapper_is_cached(self):
+        # Arrange
+        edges = geometric_band_edges(25, 44100)
+
+        # Act & Assert
+        assert get_band_mapper(44100, 1024, edges) is get_band_mapper(44100, 1024, edges)
+
+class TestFilterbank:
+
+    @pytest.mark.parametrize(
+        "id, layout, fft_size, num_bands",
+        [
+            ("happy_path_mel", "mel", 1024, 64),
+            ("happy_path_constant_q", "constant_q", 4096, 48),
+            ("edge_case_bands_narrower_than_bins", "constant_q", 256, 96),
+        ],
+    )
+    def test_flat_spectrum_gives_flat_bands(self, id, layout, fft_size, num_bands):
+        # Arrange
+        bank = get_band_mapper(44100, fft_size, band_edges(num_bands, 44100, layout), layout)
+        spectrum = np.full((2, fft_size // 2 + 1), 3.0)
+
+        # Act
+        bands = bank.apply(spectrum)
+
+        # Assert
+        assert isinstance(bank, Filterbank)
+        np.testing.assert_allclose(bands, 3.0)
+
+    @pytest.mark.parametrize("id, layout", [("happy_path_mel", "mel"), ("happy_path_constant_q", "constant_q")])
+    def test_tone_peaks_in_its_band(self, id, layout):
+        # Arrange
+        edges = band_edges(32, 44100, layout)
+        bank = get_band_mapper(44100, 4096, edges, layout)
+        spectrum = np.zeros(2049)
+        spectrum[np.argmin(np.abs(bank.freqs - 1000))] = 1
+
+        # Act
+        bands = bank.apply(spectrum)
+
+        # Assert
+        band = np.argmax(bands)
+        assert edges[band] <= 1000 < edges[band + 1]
+
+    def test_mel_edges_are_evenly_spaced_in_mel(self):
+        # Act
+        mels = hz_to_mel(band_edges(16, 44100, "mel"))
+
+        # Assert
+        np.testing.assert_allclose(np.diff(mels), np.diff(mels)[0])
+
+    def test_unknown_layout(self):
+        # Act & Assert
+        with pytest.raises(ValueError):
+            band_edges(16, 44100, "bark")
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.beat import BeatTracker
+
+FRAME_RATE = 44100 / 512  # Analysis frames per second
+
+def pulse_train(bpm, seconds, num_bands=8):
+    """Band spectra of a steady pulse at the given tempo over a little noise."""
+    rng = np.random.default_rng(0)
+    frames = rng.uniform(0, 0.05, (int(seconds * FRAME_RATE), num_bands))
+    period = FRAME_RATE * 60 / bpm
+    for beat in np.arange(0, len(frames), period):
+        frames[int(beat)] += 10
+    return frames
+
+class TestBeatTracker:
+
+    @pytest.mark.parametrize(
+        "id, bpm, expected_bpm",
+        [
+            ("happy_path_120_bpm", 120, 120),
+            ("happy_path_100_bpm", 100, 100),
+            ("edge_case_half_time_folded", 60, 120),
+        ],
+    )
+    def test_tracks_tempo(self, id, bpm, expected_bpm):
+        # Arrange
+        tracker = BeatTracker(num_bands=8, frame_rate=FRAME_RATE)
+        seconds = 10
+
+        # Act
+        beats = sum(tracker.update(bands)[0] for bands in pulse_train(bpm, seconds))
+
+        # Assert
+        assert beats == pytest.approx(bpm * seconds / 60, abs=1)
+        assert tracker.bpm() == pytest.approx(expected_bpm, rel=0.03)
+
+    def test_silence_has_no_beats(self):
+        # Arrange
+        tracker = BeatTracker(num_bands=8, frame_rate=FRAME_RATE)
+
+        # Act
+        results = [tracker.update(np.zeros(8)) for _ in range(200)]
+
+        # Assert
+        assert not any(beat for beat, _ in results)
+        assert tracker.beat_count == 0
+
+    def test_phase_restarts_on_beat(self):
+        # Arrange
+        tracker = BeatTracker(num_bands=8, frame_rate=FRAME_RATE)
+        frames = pulse_train(120, 5)
+
+        # Act & Assert
+        for bands in frames:
+            beat, _ = tracker.update(bands)
+            if beat:
+                assert tracker.phase() == 0
+            assert 0 <= tracker.phase() < 1
@@ -3,7 +3,7 @@ import pygame
 import random
 import math
 
-from music_led_streamer.object.bubble import Bubble
+from music_led_streamer.object.bubble import Bubble, bubble_sprite, warm_bubble_sprites, BUBBLE_CACHE_SIZE, MAX_RADIUS, RADIUS_STEP, SPRITE_RADII
 
 class TestBubble:
 
@@ -50,34 +50,76 @@ class TestBubble:
 
 
     @pytest.mark.parametrize(
-        "id, size",
+        "id, size, expected_radius",
         [
-            ("happy_path_normal_size", 30),
-            ("edge_case_zero_size", 0),
-            ("edge_case_small_size", 1),
+            ("happy_path_normal_size", 30, 30),
+            ("happy_path_rounded_size", 12.7, 12),
+            ("edge_case_zero_size", 0, 0),
+            ("edge_case_small_size", 1, 0),
         ],
     )
-    def test_draw(self, id, size, mocker):
+    def test_draw(self, id, size, expected_radius, mocker):
         # Arrange
         screen_mock = mocker.Mock()
         bubble = Bubble(10, 20, size, 2, (255, 0, 0))
-        draw_circle_mock = mocker.patch("pygame.draw.circle")
-        surface_mock = mocker.Mock()
-        mocker.patch("pygame.Surface", return_value=surface_mock)
+        bubble_sprite.cache_clear()
 
         # Act
         bubble.draw(screen_mock)
 
         # Assert
-        pygame.Surface.assert_called_once_with((int(size * 2), int(size * 2)), pygame.SRCALPHA)  # noqa: E501
-        if size > 0:
-            calls = [mocker.call(surface_mock,(255, 255, 255, 150), (int(size * 0.35), int(size * 0.35)), max(1, int(size * 0.2)))]
-            for i in range(int(size), 0, -1):
-                alpha = int(255 * (i / size))
-                color_with_alpha = (255, 0, 0, alpha)
-                calls.append(mocker.call(surface_mock, color_with_alpha, (int(size), int(size)), i))
+        if expected_radius > 0:
+            sprite = bubble_sprite(expected_radius, (255, 0, 0))
+            assert sprite.get_size() == (expected_radius * 2, expected_radius * 2)
+            screen_mock.blit.assert_called_once_with(sprite, (int(10 - expected_radius), int(20 - expected_radius)))
+        else:
+            screen_mock.blit.assert_not_called()
+
+    def test_sprites_are_shared(self):
+        # Arrange
+        bubble_sprite.cache_clear()
+        first = Bubble(0, 0, 20.2, 1, (0, 191, 255))
+        second = Bubble(50, 50, 19.9, 1, (1, 190, 254))
+
+        # Act
+        first_sprite, _ = first.sprite()
+        second_sprite, _ = second.sprite()
+
+        # Assert
+        assert first_sprite is second_sprite
+        assert bubble_sprite.cache_info().misses == 1
+
+    def test_warm_bubble_sprites(self):
+        # Arrange
+        bubble_sprite.cache_clear()
+
+        # Act
+        warm_bubble_sprites([(255, 0, 0), (0, 0, 255)], max_radius=10)
+        Bubble(0, 0, 6, 1, (255, 0, 0)).sprite()
+
+        # Assert
+        info = bubble_sprite.cache_info()
+        assert (info.misses, info.hits) == (2 * 10 // RADIUS_STEP, 1)
+
+    def test_full_radius_sweep_stays_cached(self):
+        # Arrange
+        bubble_sprite.cache_clear()
+        palettes = [[(0, 191, 255), (64, 224, 208), (135, 206, 250)], [(255, 69, 0), (255, 140, 0), (255, 215, 0)]]
+        sizes = [5 + i * 0.3 for i in range(int((MAX_RADIUS - 5) / 0.3) + 1)]
+
+        def sweep():
+            for palette in palettes:
+                for color in palette:
+                    for size in sizes:
+                        Bubble(0, 0, size, 1, color).sprite()
 
-            draw_circle_mock.assert_has_calls(calls)
+        sweep()
+        misses = bubble_sprite.cache_info().misses
 
-        screen_mock.blit.assert_called_once_with(surface_mock, (int(10 - size), int(20 - size)))
+        # Act
+        sweep()
 
+        # Assert
+        assert misses <= BUBBLE_CACHE_SIZE
+        assert misses == 2 * 3 * len([radius for radius in SPRITE_RADII if radius >= 4])
+        assert bubble_sprite.cache_info().misses == misses
@@ -0,0 +1,65 @@
+import pytest
+
+from music_led_streamer.audio.calibration import best_settings, is_stable, measure
+from music_led_streamer.audio.source import SyntheticSource
+from music_led_streamer.audio.stats import AudioStats
+
+def stats(blocksize, load=0.1, xruns=0, jitter=0.0):
+    """AudioStats of a 44.1 kHz stream with the given load, xruns and jitter (fraction of the block)."""
+    result = AudioStats(44100, blocksize)
+    result.callback_duration = load * result.block_period()
+    result.input_overflows = xruns
+    result.jitter = jitter * result.block_period()
+    return result
+
+class TestCalibration:
+
+    @pytest.mark.parametrize(
+        "id, measured, expected",
+        [
+            ("happy_path_stable", stats(512), True),
+            ("edge_case_overflows", stats(512, xruns=1), False),
+            ("edge_case_overloaded", stats(512, load=0.8), False),
+            ("edge_case_jittery", stats(512, jitter=0.5), False),
+        ],
+    )
+    def test_is_stable(self, id, measured, expected):
+        # Act / Assert
+        assert is_stable(measured) == expected
+
+    def test_best_settings_prefers_least_delay(self):
+        # Arrange
+        results = [
+            (256, 0.01, stats(256, xruns=3)),
+            (512, 0.1, stats(512)),
+            (1024, 0.01, stats(1024)),
+            (2048, 0.01, stats(2048)),
+        ]
+
+        # Act
+        best = best_settings(results)
+
+        # Assert
+        assert best == (1024, 0.01)
+
+    def test_best_settings_without_stable_result(self):
+        # Arrange
+        results = [(256, 0.01, stats(256, xruns=3)), (512, 0.01, stats(512, xruns=1, load=0.9))]
+
+        # Act
+        best = best_settings(results)
+
+        # Assert
+        assert best == (512, 0.01)
+        assert best_settings([]) is None
+
+    def test_measure_analyzes_source(self):
+        # Arrange
+        source = SyntheticSource("sine", 8000, 1, 256, realtime=True)
+
+        # Act
+        measured = measure(source, seconds=0.2)
+
+        # Assert
+        assert measured.callbacks > 0
+        assert measured.xruns() == 0
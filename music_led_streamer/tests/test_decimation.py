@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.decimation import Decimator
+
+class TestDecimator:
+
+    @pytest.mark.parametrize(
+        "id, block_sizes",
+        [
+            ("happy_path_multiple_of_factor", [64, 64, 64, 64]),
+            ("edge_case_uneven_blocks", [13, 100, 7, 136]),
+            ("edge_case_blocks_shorter_than_factor", [3] * 85 + [1]),
+        ],
+    )
+    def test_streaming_matches_single_block(self, id, block_sizes):
+        # Arrange
+        rng = np.random.default_rng(0)
+        samples = rng.standard_normal((sum(block_sizes), 2)).astype(np.float32)
+        expected = Decimator(8, channels=2).process(samples)
+        decimator = Decimator(8, channels=2)
+
+        # Act
+        bounds = np.cumsum([0] + block_sizes)
+        output = np.concatenate([decimator.process(samples[a:b]) for a, b in zip(bounds[:-1], bounds[1:])])
+
+        # Assert
+        assert output.shape == (len(samples) // 8, 2)
+        np.testing.assert_allclose(output, expected, rtol=1e-5, atol=1e-6)
+
+    @pytest.mark.parametrize(
+        "id, frequency, expected_gain",
+        [
+            ("happy_path_passes_bass", 100, 1.0),
+            ("happy_path_removes_aliases", 10000, 0.0),
+        ],
+    )
+    def test_frequency_response(self, id, frequency, expected_gain):
+        # Arrange
+        samplerate = 44100
+        t = np.arange(8192) / samplerate
+        samples = np.sin(2 * np.pi * frequency * t)[:, np.newaxis]
+
+        # Act
+        output = Decimator(8, channels=1).process(samples)
+
+        # Assert, after the filter has settled
+        assert np.abs(output[16:]).max() == pytest.approx(expected_gain, abs=0.02)
@@ -0,0 +1,71 @@
+import pytest
+import pygame
+
+from music_led_streamer.render import display
+
+@pytest.fixture
+def update(mocker):
+    yield mocker.patch("pygame.display.update")
+    display.set_dirty_rects(False)
+
+class TestPresent:
+
+    def test_full_update_without_dirty_rects(self, update):
+        # Arrange
+        display.set_dirty_rects(False)
+
+        # Act
+        display.present([pygame.Rect(0, 0, 5, 5)])
+        display.present([pygame.Rect(0, 0, 5, 5)])
+
+        # Assert
+        assert [call.args for call in update.call_args_list] == [(), ()]
+
+    def test_dirty_rects_include_previous_frame(self, update):
+        # Arrange
+        display.set_dirty_rects(True)
+        first, second = pygame.Rect(0, 0, 5, 5), pygame.Rect(10, 10, 5, 5)
+
+        # Act
+        display.present([first])
+        display.present([second])
+
+        # Assert
+        assert [call.args for call in update.call_args_list] == [(), ([first, second],)]
+
+    def test_frame_without_rects_updates_twice(self, update):
+        # Arrange
+        display.set_dirty_rects(True)
+        rect = pygame.Rect(0, 0, 5, 5)
+        display.present([rect])
+
+        # Act
+        display.present(None)
+        display.present([rect])
+        display.present([rect])
+
+        # Assert
+        assert [call.args for call in update.call_args_list] == [(), (), (), ([rect, rect],)]
+
+class TestClear:
+
+    @pytest.mark.parametrize(
+        "id, dirty_rects, expected_corner",
+        [
+            ("happy_path_dirty_rects_keep_the_rest", True, (255, 0, 0)),
+            ("happy_path_full_clear", False, (0, 0, 0)),
+        ],
+    )
+    def test_clear(self, id, dirty_rects, expected_corner, update):
+        # Arrange
+        display.set_dirty_rects(dirty_rects)
+        screen = pygame.Surface((20, 20))
+        screen.fill((255, 0, 0))
+        display.present([pygame.Rect(0, 0, 5, 5)])
+
+        # Act
+        display.clear(screen, (0, 0, 0))
+
+        # Assert
+        assert tuple(screen.get_at((2, 2)))[:3] == (0, 0, 0)
+        assert tuple(screen.get_at((15, 15)))[:3] == expected_corner
@@ -0,0 +1,143 @@
+import numpy as np
+import pygame
+import pytest
+
+from music_led_streamer.object.fragment_field import ANGLE_STEP, MAX_ANGLE, FragmentField, quantize_angle
+from music_led_streamer.object.image_fragment import ImageFragment
+
+
+def make_image(width, height):
+    image = pygame.Surface((width, height))
+    pixels = pygame.surfarray.pixels3d(image)
+    pixels[..., 0] = np.arange(width)[:, np.newaxis] * 7 % 256
+    pixels[..., 1] = np.arange(height)[np.newaxis, :] * 11 % 256
+    pixels[..., 2] = 99
+    del pixels
+    return image
+
+class TestQuantizeAngle:
+
+    @pytest.mark.parametrize(
+        "id, degrees, expected",
+        [
+            ("zero", 0, 0),
+            ("rounds_down", 7.4, 5),
+            ("rounds_up", 7.6, 10),
+            ("clamped_above", 361, MAX_ANGLE),
+            ("clamped_below", -3, 0),
+        ],
+    )
+    def test_quantize_angle(self, id, degrees, expected):
+
+        # Act
+        angle = quantize_angle(degrees)
+
+        # Assert
+        assert angle == expected
+
+class TestFragmentFieldUpdate:
+
+    @pytest.mark.parametrize(
+        "id, bass, midrange, treble",
+        [
+            ("quiet", 0, 0, 0),
+            ("loud", 3.5, 1.2, 0.8),
+            ("bass_only", 7, 0, 0),
+        ],
+    )
+    def test_update_matches_image_fragments(self, id, bass, midrange, treble):
+
+        # Arrange
+        image = make_image(40, 30)
+        field = FragmentField(image, (5, 7), (10, 10), (4, 3), (25, 22))
+        fragments = [ImageFragment(image, x, y, 10, 10, 5 + x, 7 + y, 25, 22) for y in range(0, 30, 10) for x in range(0, 40, 10)]
+
+        # Act
+        for _ in range(3):
+            field.update(bass, midrange, treble, 15, 10)
+            for fragment in fragments:
+                fragment.update(bass, midrange, treble, 15, 10)
+
+        # Assert
+        assert len(field) == 12
+        assert np.allclose(field.x, [fragment.x for fragment in fragments])
+        assert np.allclose(field.y, [fragment.y for fragment in fragments])
+        assert field.angle == fragments[0].angle
+
+class TestFragmentFieldDraw:
+
+    @pytest.mark.parametrize(
+        "id, midrange",
+        [
+            ("unrotated", 0),
+            ("rotated", 1.2),
+        ],
+    )
+    def test_draw_matches_image_fragments(self, id, midrange):
+
+        # Arrange
+        image = make_image(40, 30)
+        field = FragmentField(image, (5, 7), (10, 10), (4, 3), (25, 22))
+        fragments = [ImageFragment(image, x, y, 10, 10, 5 + x, 7 + y, 25, 22) for y in range(0, 30, 10) for x in range(0, 40, 10)]
+        field.update(2, midrange, 1, 15, 10)
+        for fragment in fragments:
+            fragment.update(2, midrange, 1, 15, 10)
+            fragment.angle = quantize_angle(fragment.angle)
+        expected = pygame.Surface((60, 60))
+        actual = pygame.Surface((60, 60))
+
+        # Act
+        for fragment in fragments:
+            fragment.draw(expected)
+        field.draw(actual)
+
+        # Assert
+        assert np.array_equal(pygame.surfarray.array3d(actual), pygame.surfarray.array3d(expected))
+
+    def test_midrange_sweep_reuses_rotations(self, mocker):
+
+        # Arrange
+        image = make_image(40, 30)
+        field = FragmentField(image, (5, 7), (10, 10), (4, 3), (25, 22))
+        screen = pygame.Surface((60, 60))
+        rotate = mocker.spy(pygame.transform, "rotate")
+
+        # Act
+        for midrange in np.linspace(0, 8, 200):
+            field.update(1, midrange, 0, 15, 10)
+            field.draw(screen)
+
+        # Assert
+        assert len(field.rotations) == MAX_ANGLE // ANGLE_STEP + 1
+        assert rotate.call_count == MAX_ANGLE // ANGLE_STEP * len(field)
+
+    def test_draw_remap_matches_unrotated_draw(self):
+
+        # Arrange
+        image = make_image(40, 30)
+        field = FragmentField(image, (5, 7), (10, 10), (4, 3), (25, 22))
+        field.update(4, 0, 1, 15, 10)
+        expected = pygame.Surface((50, 60), depth=32)
+        actual = pygame.Surface((50, 60), depth=32)
+
+        # Act
+        field.draw(expected)
+        field.draw_remap(actual)
+
+        # Assert
+        assert np.array_equal(pygame.surfarray.array3d(actual), pygame.surfarray.array3d(expected))
+
+    def test_draw_remap_falls_back_on_other_depths(self):
+
+        # Arrange
+        image = make_image(20, 20)
+        field = FragmentField(image, (0, 0), (10, 10), (2, 2), (10, 10))
+        expected = pygame.Surface((30, 30), depth=24)
+        actual = pygame.Surface((30, 30), depth=24)
+
+        # Act
+        field.draw(expected)
+        field.draw_remap(actual)
+
+        # Assert
+        assert np.array_equal(pygame.surfarray.array3d(actual), pygame.surfarray.array3d(expected))
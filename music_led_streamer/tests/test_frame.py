@@ -0,0 +1,172 @@
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.frame import FeatureFrame, FrameBuffer
+
+class TestFrameBuffer:
+
+    def test_read_before_publish(self):
+        # Arrange
+        buffer = FrameBuffer(num_bands=4)
+
+        # Act
+        frame = buffer.read()
+
+        # Assert
+        assert frame.sequence == 0
+        np.testing.assert_array_equal(frame.band_amplitudes, np.zeros(4))
+
+    @pytest.mark.parametrize(
+        "id, publishes",
+        [
+            ("happy_path_single_publish", 1),
+            ("happy_path_wraps_slots", 7),
+        ],
+    )
+    def test_publish(self, id, publishes):
+        # Arrange
+        buffer = FrameBuffer(num_bands=4)
+
+        # Act
+        for i in range(publishes):
+            frame = buffer.begin_write()
+            frame.bass = i
+            frame.set_band_amplitudes(np.full(4, i))
+            buffer.publish(frame, capture_time=10.0 + i)
+
+        # Assert
+        latest = buffer.read()
+        assert latest.sequence == publishes
+        assert latest.bass == publishes - 1
+        assert latest.capture_time == 10.0 + publishes - 1
+        np.testing.assert_array_equal(latest.band_amplitudes, np.full(4, publishes - 1))
+
+    def test_writer_never_reuses_latest_frame(self):
+        # Arrange
+        buffer = FrameBuffer(num_bands=4)
+        frame = buffer.begin_write()
+        buffer.publish(frame, capture_time=1.0)
+
+        # Act
+        latest = buffer.read()
+        sequence = latest.sequence
+        next_frame = buffer.begin_write()
+
+        # Assert
+        assert next_frame is not latest
+        assert FrameBuffer.is_valid(latest, sequence)
+
+    def test_reused_frame_is_invalid(self):
+        # Arrange
+        buffer = FrameBuffer(num_bands=4, slots=2)
+        buffer.publish(buffer.begin_write(), capture_time=1.0)
+        held = buffer.latest  # The slot itself, not the copy read returns
+        sequence = held.sequence
+
+        # Act
+        buffer.publish(buffer.begin_write(), capture_time=2.0)
+        buffer.begin_write()
+
+        # Assert
+        assert not FrameBuffer.is_valid(held, sequence)
+
+    def test_band_amplitudes_are_read_only(self):
+        # Arrange
+        frame = FrameBuffer(num_bands=4).read()
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            frame.band_amplitudes[0] = 1
+
+    def test_read_retries_when_writer_wraps_during_copy(self, mocker):
+        # Arrange
+        buffer = FrameBuffer(num_bands=4)
+
+        def publish(value):
+            frame = buffer.begin_write()
+            frame.bass = value
+            frame.set_band_amplitudes(np.full(4, value))
+            buffer.publish(frame, capture_time=float(value))
+
+        publish(1)
+        copy_from = FeatureFrame.copy_from
+        interleaved = []
+
+        def copy_while_publishing(snapshot, frame):
+            copy_from(snapshot, frame)
+            if not interleaved:
+                # The writer wraps around every slot while the first copy is taken
+                interleaved.append(True)
+                for value in (2, 3, 4):
+                    publish(value)
+
+        mocker.patch.object(FeatureFrame, "copy_from", copy_while_publishing)
+
+        # Act
+        frame = buffer.read()
+
+        # Assert
+        assert frame.sequence == 4
+        assert frame.bass == 4
+        np.testing.assert_array_equal(frame.band_amplitudes, np.full(4, 4))
+
+    def test_read_reuses_one_snapshot_without_tearing(self, mocker):
+        # Arrange
+        buffer = FrameBuffer(num_bands=4)
+        published = [0]
+
+        def publish():
+            published[0] += 1
+            frame = buffer.begin_write()
+            frame.bass = published[0]
+            frame.set_band_amplitudes(np.full(4, published[0]))
+            buffer.publish(frame, capture_time=float(published[0]))
+
+        publish()
+        copy_from = FeatureFrame.copy_from
+        copies = []
+
+        def copy_while_publishing(snapshot, frame):
+            # Every other copy is overtaken by the writer wrapping around every slot
+            copy_from(snapshot, frame)
+            copies.append(frame.sequence)
+            if len(copies) % 2:
+                for _ in range(3):
+                    publish()
+
+        mocker.patch.object(FeatureFrame, "copy_from", copy_while_publishing)
+
+        # Act
+        frames = []
+        for _ in range(5):
+            frame = buffer.read()
+            frames.append((frame, frame.sequence, frame.bass, frame.band_amplitudes.copy()))
+
+        # Assert
+        assert len(copies) == 10  # Every read retried once
+        assert all(frame is buffer.snapshot for frame, *_ in frames)
+        for _, sequence, bass, bands in frames:
+            assert bass == sequence
+            np.testing.assert_array_equal(bands, np.full(4, sequence))
+
+    def test_held_frame_is_unchanged_by_later_publishes(self):
+        # Arrange
+        buffer = FrameBuffer(num_bands=4)
+        first = buffer.begin_write()
+        first.bass = 1
+        first.set_band_amplitudes(np.full(4, 1))
+        buffer.publish(first, capture_time=1.0)
+        held = buffer.read()
+
+        # Act
+        for i in range(2, 8):
+            frame = buffer.begin_write()
+            frame.bass = i
+            frame.set_band_amplitudes(np.full(4, i))
+            buffer.publish(frame, capture_time=float(i))
+
+        # Assert
+        assert held.sequence == 1
+        assert held.bass == 1
+        np.testing.assert_array_equal(held.band_amplitudes, np.full(4, 1))
+        assert buffer.read().bass == 7
@@ -0,0 +1,53 @@
+import math
+import numpy as np
+import pygame
+import pytest
+
+from music_led_streamer.render.globe import GlobeSprite, draw_globe, get_globe_sprite
+
+def reference_globe(screen, center, radius, light_direction, base_color):
+    """The per pixel globe shading the globe show used to draw."""
+    for y in range(-radius, radius):
+        for x in range(-radius, radius):
+            if math.sqrt(x**2 + y**2) <= radius:
+                dot = x / radius * light_direction[0] + y / radius * light_direction[1]
+                shade = max(0, min(255, int(255 * dot)))
+                color = tuple(max(0, min(255, base_color[i] + shade)) for i in range(3))
+                screen.set_at((center[0] + x, center[1] + y), color)
+
+class TestGlobe:
+
+    @pytest.mark.parametrize(
+        "id, radius, angle, base_color",
+        [
+            ("happy_path_small", 5, 0.3, (0, 191, 255)),
+            ("happy_path_base_radius", 15, 2.0, (72, 61, 139)),
+            ("edge_case_light_from_above", 12, -math.pi / 2, (255, 0, 0)),
+        ],
+    )
+    def test_matches_per_pixel_shading(self, id, radius, angle, base_color):
+        # Arrange
+        light = (math.cos(angle), math.sin(angle))
+        expected = pygame.Surface((40, 40))
+        actual = pygame.Surface((40, 40))
+        reference_globe(expected, (20, 20), radius, light, base_color)
+
+        # Act
+        draw_globe(actual, (20, 20), radius, light, base_color)
+
+        # Assert
+        np.testing.assert_array_equal(pygame.surfarray.array3d(actual), pygame.surfarray.array3d(expected))
+
+    def test_outside_disk_is_transparent(self):
+        # Act
+        surface = GlobeSprite(10).render((1, 0), (0, 0, 0))
+
+        # Assert
+        alpha = pygame.surfarray.array_alpha(surface)
+        assert alpha[0, 0] == 0
+        assert alpha[10, 10] == 255
+
+    def test_sprites_are_cached_per_radius(self):
+        # Act / Assert
+        assert get_globe_sprite(8) is get_globe_sprite(8)
+        assert get_globe_sprite(8) is not get_globe_sprite(9)
@@ -0,0 +1,93 @@
+import math
+import pytest
+import pygame
+
+from music_led_streamer.render.kaleidoscope import (
+    WEDGE_ALPHA, draw_kaleidoscope, quantize_angle, rotated_wedge, wedge_sprite
+)
+
+class TestWedgeSprite:
+
+    def test_gradient_and_alpha(self):
+        # Act
+        sprite = wedge_sprite(40, 4, (0, 0, 0), (200, 100, 0))
+
+        # Assert
+        assert sprite.get_size() == (2 * 29 + 1, 81)
+        assert tuple(sprite.get_at((29, 0))) == (200, 100, 0, 255)  # Opaque outline at the tip
+        red, green, blue, alpha = sprite.get_at((29, 40))  # Center
+        assert alpha == WEDGE_ALPHA
+        assert red == pytest.approx(200 * 40 / 68, abs=2)
+        assert tuple(sprite.get_at((0, 0)))[3] == 0  # Outside the wedge
+
+    def test_is_cached(self):
+        # Act & Assert
+        assert rotated_wedge(40, 4, (1, 2, 3), (4, 5, 6), 90) is rotated_wedge(40, 4, (1, 2, 3), (4, 5, 6), 90)
+
+class TestDrawKaleidoscope:
+
+    def test_segments_are_rotated_wedges(self):
+        # Arrange
+        colors = [((255, 0, 0), (255, 128, 128)), ((0, 0, 255), (128, 128, 255))]
+        screen = pygame.Surface((101, 101))
+        composed = pygame.Surface((81, 81), pygame.SRCALPHA)
+        for degrees, (color_tip, color_base) in zip((0, 90, 180, 270), colors * 2):
+            wedge = rotated_wedge(40, 4, color_tip, color_base, degrees)
+            composed.blit(wedge, (40 - wedge.get_width() // 2, 40 - wedge.get_height() // 2))
+        expected = pygame.Surface((101, 101))
+        expected.blit(composed, (10, 10))
+
+        # Act
+        draw_kaleidoscope(screen, (50, 50), 41, 4, 0, colors)
+
+        # Assert
+        assert pygame.image.tobytes(screen, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+    def test_spin_turns_the_whole_kaleidoscope(self):
+        # Arrange
+        colors = [((255, 0, 0), (255, 128, 128)), ((0, 0, 255), (128, 128, 255))]
+        screen = pygame.Surface((101, 101))
+        unturned = pygame.Surface((101, 101))
+        draw_kaleidoscope(unturned, (50, 50), 40, 5, 0, colors)
+        expected = pygame.transform.rotate(unturned, 90)
+
+        # Act
+        draw_kaleidoscope(screen, (50, 50), 40, 5, math.radians(90), colors)
+
+        # Assert
+        assert pygame.image.tobytes(screen, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+    def test_rotates_once_per_frame(self, mocker):
+        # Arrange
+        colors = [((255, 0, 0), (255, 128, 128)), ((0, 255, 0), (128, 255, 128)), ((0, 0, 255), (128, 128, 255))]
+        screen = pygame.Surface((200, 200))
+        draw_kaleidoscope(screen, (100, 100), 80, 12, 0.0, colors)
+        rotate = mocker.spy(pygame.transform, "rotate")
+
+        # Act
+        for frame in range(1, 11):
+            draw_kaleidoscope(screen, (100, 100), 80, 12, frame * 0.05, colors)
+
+        # Assert
+        assert rotate.call_count == 10
+
+    def test_zero_radius_draws_nothing(self):
+        # Arrange
+        screen = pygame.Surface((20, 20))
+
+        # Act
+        draw_kaleidoscope(screen, (10, 10), 1, 4, 0, [((255, 0, 0), (255, 0, 0))])
+
+        # Assert
+        assert pygame.transform.average_color(screen)[:3] == (0, 0, 0)
+
+    @pytest.mark.parametrize(
+        "id, degrees, expected",
+        [
+            ("happy_path_rounds", 45.2, 46),
+            ("edge_case_wraps", 359.5, 0),
+        ],
+    )
+    def test_quantize_angle(self, id, degrees, expected):
+        # Act & Assert
+        assert quantize_angle(degrees) == expected
@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+import pytest
+
+from music_led_streamer.audio.engine import AudioEngine
+from music_led_streamer.audio.ring_buffer import RingBuffer
+from music_led_streamer.audio.stats import AudioStats
+from music_led_streamer.audio.worker import AnalysisWorker
+from music_led_streamer.audio.latency import LatencyController, LATENCY_LADDER, CHECK_INTERVAL, IDLE_SECONDS
+
+class TestLatencyController:
+
+    @pytest.mark.parametrize(
+        "id, blocksize, expected_level",
+        [
+            ("happy_path_exact_step", 1024, 2),
+            ("happy_path_between_steps", 700, 2),
+            ("edge_case_variable_blocks", 0, 0),
+            ("edge_case_above_ladder", 8192, len(LATENCY_LADDER) - 1),
+        ],
+    )
+    def test_starts_at_configured_blocksize(self, id, blocksize, expected_level):
+        # Act
+        controller = LatencyController(blocksize)
+
+        # Assert
+        assert controller.settings() == LATENCY_LADDER[expected_level]
+
+    def test_steps_up_on_xruns(self):
+        # Arrange
+        controller = LatencyController(1024)
+        controller.update(0.0, 0, 0.1)
+
+        # Act
+        early = controller.update(CHECK_INTERVAL / 2, 3, 0.1)
+        settings = controller.update(CHECK_INTERVAL, 3, 0.1)
+
+        # Assert
+        assert early is None
+        assert settings == LATENCY_LADDER[3]
+
+    def test_steps_down_when_idle(self):
+        # Arrange
+        controller = LatencyController(1024)
+        controller.update(0.0, 0, 0.1)
+
+        # Act
+        busy = controller.update(IDLE_SECONDS, 0, 0.5)
+        settings = controller.update(IDLE_SECONDS + CHECK_INTERVAL, 0, 0.1)
+
+        # Assert
+        assert busy is None
+        assert settings == LATENCY_LADDER[1]
+
+    def test_failed_step_down_holds_longer(self):
+        # Arrange
+        controller = LatencyController(1024)
+        controller.update(0.0, 0, 0.1)
+        controller.update(IDLE_SECONDS, 0, 0.1)  # Down to step 1
+
+        # Act
+        up = controller.update(IDLE_SECONDS + CHECK_INTERVAL, 1, 0.1)
+        held = controller.update(2 * IDLE_SECONDS + CHECK_INTERVAL, 1, 0.1)
+        down = controller.update(3 * IDLE_SECONDS + CHECK_INTERVAL, 1, 0.1)
+
+        # Assert
+        assert up == LATENCY_LADDER[2]
+        assert held is None
+        assert down == LATENCY_LADDER[1]
+
+    def test_counter_reset_counts_from_zero(self):
+        # Arrange
+        controller = LatencyController(1024)
+        controller.update(0.0, 10, 0.1)
+
+        # Act
+        settings = controller.update(CHECK_INTERVAL, 2, 0.1)
+
+        # Assert
+        assert settings == LATENCY_LADDER[3]
+
+class TestAdaptiveEngine:
+
+    def create_engine(self, mocker):
+        source = mocker.Mock(channels=1, blocksize=1024, samplerate=44100)
+        engine = AudioEngine(source, adaptive_latency=True)
+        engine.stats = AudioStats(44100, 1024)
+        return engine, source
+
+    def test_reopen_after_overflows_does_not_step_again(self, mocker):
+        # Arrange
+        engine, source = self.create_engine(mocker)
+        mocker.patch.object(AnalysisWorker, "start")  # The test plays the worker's part
+        engine.analysis_worker = True
+        engine.start_stream()
+        monotonic = mocker.patch("music_led_streamer.audio.engine.time.monotonic", return_value=0.0)
+        engine.maintain()
+        for _ in range(3):
+            engine.stats.record_status(SimpleNamespace(input_overflow=True, input_underflow=False))
+        engine.ring.dropped = 500
+        engine.worker.report_drops()
+
+        # Act
+        monotonic.return_value = CHECK_INTERVAL
+        engine.maintain()  # Steps up and reopens with a new worker
+        for check in range(2, 6):
+            engine.worker.report_drops()
+            monotonic.return_value = check * CHECK_INTERVAL
+            engine.maintain()
+
+        # Assert
+        assert source.open.call_count == 1
+        assert engine.blocksize == LATENCY_LADDER[3][0]
+        assert engine.stats.xruns() == 4
+
+    def test_worker_drops_stay_counted_across_reopens(self, mocker):
+        # Arrange
+        engine, _ = self.create_engine(mocker)
+        first = AnalysisWorker(engine, RingBuffer(4096, 1), 1024)
+        first.ring.dropped = 700
+        first.report_drops()
+
+        # Act
+        second = AnalysisWorker(engine, RingBuffer(4096, 1), 1024)  # The stream was reopened
+        second.report_drops()
+        second.ring.dropped = 100
+        second.report_drops()
+
+        # Assert
+        assert engine.stats.dropped == 800
+        assert engine.stats.drop_events == 2
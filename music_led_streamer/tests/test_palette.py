@@ -0,0 +1,117 @@
+import numpy as np
+import pygame
+import pytest
+
+from music_led_streamer.render.palette import (
+    cached_palette, dominant_colors, image_palette, pack_colors, sample_pixels
+)
+
+
+def make_pixels(counts):
+    """Return a (width, 1, 3) pixel array holding each color as many times as counted."""
+    return np.array([color for color, count in counts for _ in range(count)], dtype=np.uint8)[:, np.newaxis]
+
+class TestPackColors:
+
+    @pytest.mark.parametrize(
+        "id, color, bits, expected",
+        [
+            ("full_depth", (1, 2, 3), 8, (1 << 16) | (2 << 8) | 3),
+            ("five_bits", (255, 8, 7), 5, (31 << 10) | (1 << 5) | 0),
+            ("one_bit", (128, 127, 255), 1, 0b101),
+        ],
+    )
+    def test_pack_colors(self, id, color, bits, expected):
+
+        # Act
+        packed = pack_colors(np.array([color]), bits)
+
+        # Assert
+        assert packed.tolist() == [expected]
+
+class TestSamplePixels:
+
+    @pytest.mark.parametrize(
+        "id, size, max_samples, expected",
+        [
+            ("small_image_whole", (10, 10), 1000, 100),
+            ("large_image_strided", (100, 100), 1000, 25 * 25),
+        ],
+    )
+    def test_sample_count(self, id, size, max_samples, expected):
+
+        # Act
+        samples = sample_pixels(np.zeros((*size, 3), dtype=np.uint8), max_samples)
+
+        # Assert
+        assert samples.shape == (expected, 3)
+
+class TestDominantColors:
+
+    @pytest.mark.parametrize(
+        "id, bits",
+        [
+            ("bincount", 5),
+            ("unique", 8),
+        ],
+    )
+    def test_most_common_first(self, id, bits):
+
+        # Arrange
+        pixels = make_pixels([((0, 0, 255), 2), ((255, 0, 0), 5), ((0, 255, 0), 3), ((9, 9, 9), 1)])
+
+        # Act
+        colors = dominant_colors(pixels, num_colors=3, bits=bits)
+
+        # Assert
+        assert colors == [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+
+    def test_close_colors_are_averaged(self):
+
+        # Arrange
+        pixels = make_pixels([((200, 10, 10), 2), ((202, 12, 14), 2), ((0, 0, 0), 3)])
+
+        # Act
+        colors = dominant_colors(pixels, num_colors=2, bits=5)
+
+        # Assert
+        assert colors == [(201, 11, 12), (0, 0, 0)]
+
+    def test_kmeans_refines_centers(self):
+
+        # Arrange
+        pixels = make_pixels([((100, 0, 0), 4), ((104, 0, 0), 4), ((0, 0, 200), 3)])
+
+        # Act
+        colors = dominant_colors(pixels, num_colors=2, bits=8, iterations=3)
+
+        # Assert
+        assert colors == [(102, 0, 0), (0, 0, 200)]
+
+    def test_fewer_colors_than_asked(self):
+
+        # Act
+        colors = dominant_colors(make_pixels([((5, 6, 7), 4)]), num_colors=3)
+
+        # Assert
+        assert colors == [(5, 6, 7)]
+
+class TestImagePalette:
+
+    def test_cached_per_file_content(self, tmp_path, mocker):
+
+        # Arrange
+        image = pygame.Surface((4, 4))
+        image.fill((0, 128, 255))
+        path = str(tmp_path / "image.png")
+        pygame.image.save(image, path)
+        cached_palette.cache_clear()
+        load = mocker.spy(pygame.image, "load")
+
+        # Act
+        first = image_palette(path)
+        second = image_palette(path)
+
+        # Assert
+        assert first == second == [(0, 128, 255)]
+        assert load.call_count == 1
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+import pygame
+
+from music_led_streamer.object.particle_store import ParticleStore
+from music_led_streamer.object.star import draw_star, star_stencil
+from music_led_streamer.render.splat import splat_stencils
+
+class TestParticleStore:
+
+    def test_spawn_broadcasts_values(self):
+        # Arrange
+        store = ParticleStore(fields=("angle",))
+
+        # Act
+        spawned = store.spawn(3, x=5, vx=np.array([1, 2, 3]), color=(10, 20, 30), angle=0.5)
+
+        # Assert
+        assert len(store) == 3
+        assert spawned == slice(0, 3)
+        np.testing.assert_array_equal(store["x"], [5, 5, 5])
+        np.testing.assert_array_equal(store["vx"], [1, 2, 3])
+        np.testing.assert_array_equal(store["color"], [[10, 20, 30]] * 3)
+        np.testing.assert_array_equal(store["angle"], [0.5] * 3)
+        np.testing.assert_array_equal(store["life"], [0, 0, 0])
+
+    def test_spawn_unknown_field(self):
+        # Arrange
+        store = ParticleStore()
+
+        # Act & Assert
+        with pytest.raises(KeyError):
+            store.spawn(1, points=5)
+
+    def test_spawn_grows_capacity(self):
+        # Arrange
+        store = ParticleStore(capacity=4)
+        store.spawn(3, x=np.arange(3))
+
+        # Act
+        store.spawn(6, x=np.arange(3, 9))
+
+        # Assert
+        assert store.capacity() == 16
+        np.testing.assert_array_equal(store["x"], np.arange(9))
+
+    def test_step(self):
+        # Arrange
+        store = ParticleStore()
+        store.spawn(2, x=1, y=2, vx=np.array([1, -1]), vy=0.5, radius=10, growth=-2, life=5)
+
+        # Act
+        store.step(decay=2)
+
+        # Assert
+        np.testing.assert_array_equal(store["x"], [2, 0])
+        np.testing.assert_array_equal(store["y"], [2.5, 2.5])
+        np.testing.assert_array_equal(store["radius"], [8, 8])
+        np.testing.assert_array_equal(store["life"], [3, 3])
+
+    @pytest.mark.parametrize(
+        "id, lives, expected_x",
+        [
+            ("happy_path_keeps_order", [1, 0, 2, 0, 3], [0, 2, 4]),
+            ("edge_case_all_alive", [1, 1, 1, 1, 1], [0, 1, 2, 3, 4]),
+            ("edge_case_all_dead", [0, 0, 0, 0, 0], []),
+        ],
+    )
+    def test_cull(self, id, lives, expected_x):
+        # Arrange
+        store = ParticleStore()
+        store.spawn(5, x=np.arange(5), life=np.array(lives), color=np.arange(15).reshape(5, 3))
+
+        # Act
+        store.cull()
+
+        # Assert
+        np.testing.assert_array_equal(store["x"], expected_x)
+        np.testing.assert_array_equal(store["color"][:, 0], np.array(expected_x, dtype=int) * 3)
+
+    def test_cull_with_mask(self):
+        # Arrange
+        store = ParticleStore()
+        store.spawn(3, x=np.arange(3), life=np.array([1, 0, -1]))
+
+        # Act
+        store.cull(store["life"] >= 0)
+
+        # Assert
+        np.testing.assert_array_equal(store["x"], [0, 1])
+
+    def test_faded_colors(self):
+        # Arrange
+        store = ParticleStore()
+        store.spawn(3, color=(200, 100, 50))
+
+        # Act
+        colors = store.faded_colors(np.array([1, 0.5, -1]))
+
+        # Assert
+        assert colors.tolist() == [[200, 100, 50], [100, 50, 25], [0, 0, 0]]
+
+class TestStarStencil:
+
+    def test_matches_draw_star(self):
+        # Arrange
+        expected = pygame.Surface((100, 100))
+        screen = pygame.Surface((100, 100))
+        draw_star(expected, (255, 255, 255), 50, 40, 7, 30, 15)
+
+        # Act
+        splat_stencils(screen, [50], [40], [(255, 255, 255)], ([7], [30]), star_stencil)
+
+        # Assert
+        assert pygame.image.tobytes(screen, "RGB") == pygame.image.tobytes(expected, "RGB")
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.pitch import PitchEstimator, parabolic_offset
+from music_led_streamer.audio.stft import get_window
+from music_led_streamer.color_music_mapper import ColorSoundMapper
+
+SAMPLERATE = 44100
+FFT_SIZE = 1024
+
+def spectrum(signal):
+    """Magnitude spectrum of a Hann windowed frame, as the analyzer computes it."""
+    return np.abs(np.fft.rfft(signal * get_window("hann", len(signal))))
+
+def note(frequency, harmonics=(1,), length=FFT_SIZE):
+    """A sum of the given harmonics of frequency, each at 1 / harmonic amplitude."""
+    t = np.arange(length) / SAMPLERATE
+    return sum(np.sin(2 * np.pi * frequency * h * t) / h for h in harmonics)
+
+class TestPitchEstimator:
+
+    @pytest.mark.parametrize(
+        "id, frequency, harmonics",
+        [
+            ("happy_path_a4_sine", 440, (1,)),
+            ("happy_path_c4_harmonics", 261.6, (1, 2, 3, 4, 5)),
+            ("happy_path_between_bins", 523.3, (1, 2, 3)),
+            ("edge_case_high_note", 1500, (1, 2)),
+        ],
+    )
+    def test_estimates_pitch_between_bins(self, id, frequency, harmonics):
+        # Arrange
+        estimator = PitchEstimator(SAMPLERATE, FFT_SIZE)
+
+        # Act
+        pitch, confidence = estimator.estimate(spectrum(note(frequency, harmonics)))
+
+        # Assert
+        bin_spacing = SAMPLERATE / FFT_SIZE
+        assert pitch == pytest.approx(frequency, abs=bin_spacing / 20)
+        assert confidence > 0.9
+
+    def test_missing_fundamental_keeps_note(self):
+        # Arrange
+        estimator = PitchEstimator(SAMPLERATE, FFT_SIZE)
+
+        # Act
+        pitch, _ = estimator.estimate(spectrum(note(220, (2, 3, 4, 5))))
+
+        # Assert
+        octaves = np.log2(pitch / 220)
+        assert octaves == pytest.approx(round(octaves), abs=0.01)
+
+    def test_noise_has_low_confidence(self):
+        # Arrange
+        estimator = PitchEstimator(SAMPLERATE, FFT_SIZE)
+        noise = np.random.default_rng(0).normal(0, 0.3, FFT_SIZE)
+
+        # Act
+        _, confidence = estimator.estimate(spectrum(noise))
+
+        # Assert
+        assert confidence < 0.3
+
+    def test_silence_has_no_pitch(self):
+        # Arrange
+        estimator = PitchEstimator(SAMPLERATE, FFT_SIZE)
+
+        # Act
+        result = estimator.estimate(np.zeros(FFT_SIZE // 2 + 1))
+
+        # Assert
+        assert result == (0.0, 0.0)
+
+    @pytest.mark.parametrize(
+        "id, values, expected",
+        [
+            ("happy_path_symmetric", (1.0, 2.0, 1.0), 0.0),
+            ("happy_path_right_lean", (0.0, 2.0, 1.0), 1 / 6),
+            ("edge_case_not_a_peak", (1.0, 1.0, 1.0), 0.0),
+        ],
+    )
+    def test_parabolic_offset(self, id, values, expected):
+        # Act
+        offset = parabolic_offset(np.array(values), 1)
+
+        # Assert
+        assert offset == pytest.approx(expected)
+
+class TestFindByNote:
+
+    @pytest.mark.parametrize(
+        "id, frequency, expected_note",
+        [
+            ("happy_path_in_range", 440.0, "A₄"),
+            ("happy_path_octave_below", 220.0, "A₄"),
+            ("happy_path_two_octaves_above", 1760.0, "A₄"),
+            ("edge_case_lowest_note", 349.2, "F₄"),
+            ("edge_case_slightly_flat_a4", 439.9, "A₄"),
+            ("edge_case_slightly_sharp_a4", 441.0, "A₄"),
+            ("edge_case_slightly_flat_c5", 523.0, "C₅"),
+            ("edge_case_slightly_sharp_c5", 524.5, "C₅"),
+            ("edge_case_slightly_flat_e4", 329.5, "E₅"),
+            ("edge_case_slightly_sharp_e4", 330.2, "E₅"),
+            ("edge_case_flat_of_octave_edge", 348.0, "F₄"),
+        ],
+    )
+    def test_find_by_note(self, id, frequency, expected_note):
+        # Arrange
+        instances = ColorSoundMapper.create_instances()
+
+        # Act
+        match = ColorSoundMapper.find_by_note(instances, frequency)
+
+        # Assert
+        assert match.notes == expected_note
+
+    def test_no_pitch_has_no_note(self):
+        # Act
+        match = ColorSoundMapper.find_by_note(ColorSoundMapper.create_instances(), 0)
+
+        # Assert
+        assert match is None
@@ -0,0 +1,162 @@
+import threading
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.frame import FeatureFrame
+from music_led_streamer.audio.recording import FeatureRecorder, ReplayEngine, load_recording, resample_bands
+
+def write_recording(path, count, num_bands=4):
+    """Record count frames whose bass and bands count up from 0, one every 0.1 seconds."""
+    recorder = FeatureRecorder(str(path), num_bands, 2, 8000)
+    frame = FeatureFrame(num_bands, 2)
+    for i in range(count):
+        frame.capture_time = 5.0 + i / 10
+        frame.bass = i
+        frame.beat_count = i // 2
+        frame.set_band_amplitudes(np.full(num_bands, i))
+        frame.set_channel_band_amplitudes(np.full((2, num_bands), i))
+        recorder.write(frame, num_bands, "geometric")
+    recorder.close()
+
+class TestFeatureRecorder:
+
+    def test_round_trip(self, tmp_path):
+        # Arrange
+        path = tmp_path / "features.mlsf"
+        write_recording(path, 5)
+
+        # Act
+        header, records = load_recording(str(path))
+
+        # Assert
+        assert (header["num_bands"], header["channels"], header["samplerate"]) == (4, 2, 8000)
+        assert len(records) == 5
+        np.testing.assert_allclose(records["time"], np.arange(5) / 10)
+        np.testing.assert_array_equal(records["bass"], np.arange(5))
+        np.testing.assert_array_equal(records["beat_count"], [0, 0, 1, 1, 2])
+        np.testing.assert_array_equal(records["channel_band_amplitudes"][3], np.full((2, 4), 3))
+
+    def test_write_leaves_file_io_to_writer_thread(self, tmp_path, mocker):
+        # Arrange
+        recorder = FeatureRecorder(str(tmp_path / "features.mlsf"), 4, 2, 8000)
+        writes = []
+        file_write = recorder.file.write
+        recorder.file = mocker.Mock(wraps=recorder.file)
+        recorder.file.write.side_effect = lambda data: writes.append(threading.current_thread()) or file_write(data)
+
+        # Act
+        for i in range(3):
+            frame = FeatureFrame(4, 2)
+            frame.capture_time = i / 10
+            recorder.write(frame, 4, "geometric")
+        recorder.close()
+
+        # Assert
+        assert len(writes) == 3
+        assert all(thread is recorder.writer for thread in writes)
+
+    def test_other_bands_are_resampled_on_writer_thread(self, tmp_path, mocker):
+        # Arrange
+        path = tmp_path / "features.mlsf"
+        recorder = FeatureRecorder(str(path), 4, 2, 8000)
+        threads = []
+        resample = resample_bands
+        mocker.patch(
+            "music_led_streamer.audio.recording.resample_bands",
+            side_effect=lambda *args: threads.append(threading.current_thread()) or resample(*args),
+        )
+        frame = FeatureFrame(8, 2)
+        frame.set_band_amplitudes(np.full(8, 3.0))
+        frame.set_channel_band_amplitudes(np.full((2, 8), 3.0))
+
+        # Act
+        recorder.write(frame, 8, "geometric")
+        frame.set_band_amplitudes(np.zeros(8))  # The slot is refilled before the writer gets to it
+        recorder.close()
+
+        # Assert
+        _, records = load_recording(str(path))
+        np.testing.assert_allclose(records["band_amplitudes"][0], np.full(4, 3.0))
+        assert len(threads) == 2
+        assert all(thread is recorder.writer for thread in threads)
+
+    def test_truncated_record_is_ignored(self, tmp_path):
+        # Arrange
+        path = tmp_path / "features.mlsf"
+        write_recording(path, 3)
+        with open(path, "ab") as file:
+            file.write(b"\0" * 10)
+
+        # Act
+        _, records = load_recording(str(path))
+
+        # Assert
+        assert len(records) == 3
+
+    def test_not_a_recording(self, tmp_path):
+        # Arrange
+        path = tmp_path / "features.mlsf"
+        path.write_bytes(b"RIFF" + b"\0" * 60)
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            load_recording(str(path))
+
+class TestResampleBands:
+
+    @pytest.mark.parametrize(
+        "id, from_edges, to_edges, values, expected",
+        [
+            ("happy_path_same_bands", (10, 100, 1000), (10, 100, 1000), [1, 2], [1, 2]),
+            ("happy_path_split_bands", (10, 1000, 100000), (10, 100, 1000, 10000, 100000), [1, 3], [1, 1.5, 2.5, 3]),
+            ("happy_path_per_channel", (10, 1000, 100000), (100, 1000, 10000), [[1, 3], [2, 2]], [[1.5, 2.5], [2, 2]]),
+        ],
+    )
+    def test_resample_bands(self, id, from_edges, to_edges, values, expected):
+        # Act
+        resampled = resample_bands(np.array(values, dtype=float), from_edges, to_edges)
+
+        # Assert
+        np.testing.assert_allclose(resampled, expected)
+
+class TestReplayEngine:
+
+    @pytest.mark.parametrize(
+        "id, loop, reads, expected_bass",
+        [
+            ("happy_path_one_frame_per_read", True, 3, 2),
+            ("happy_path_loops", True, 7, 1),
+            ("edge_case_holds_last_frame", False, 7, 4),
+        ],
+    )
+    def test_flat_out(self, id, loop, reads, expected_bass, tmp_path):
+        # Arrange
+        path = tmp_path / "features.mlsf"
+        write_recording(path, 5)
+        engine = ReplayEngine(str(path), realtime=False, loop=loop)
+        engine.set_num_bands(4)
+        engine.start()
+
+        # Act
+        for _ in range(reads):
+            frame = engine.current_frame()
+
+        # Assert
+        assert frame.bass == expected_bass
+        np.testing.assert_array_equal(frame.band_amplitudes, np.full(4, expected_bass))
+
+    def test_other_bands_are_resampled(self, tmp_path):
+        # Arrange
+        path = tmp_path / "features.mlsf"
+        write_recording(path, 5)
+        engine = ReplayEngine(str(path), realtime=False)
+        engine.start()
+
+        # Act
+        engine.set_num_bands(16, "mel")
+        frame = engine.current_frame()
+
+        # Assert
+        assert frame.band_amplitudes.shape == (16,)
+        assert frame.channel_band_amplitudes.shape == (2, 16)
+        assert len(engine.band_frequencies()) == 17
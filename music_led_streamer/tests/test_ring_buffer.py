@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.ring_buffer import RingBuffer
+
+class TestRingBuffer:
+
+    @pytest.mark.parametrize(
+        "id, capacity, block, blocks",
+        [
+            ("happy_path_exact_blocks", 64, 16, 10),
+            ("happy_path_wrapping_blocks", 50, 16, 10),
+            ("edge_case_single_sample_blocks", 4, 1, 9),
+        ],
+    )
+    def test_write_then_read_preserves_order(self, id, capacity, block, blocks):
+        # Arrange
+        ring = RingBuffer(capacity, channels=2)
+        out = np.zeros((block, 2), dtype=np.float32)
+        samples = np.arange(block * blocks * 2, dtype=np.float32).reshape(-1, 2)
+
+        # Act & Assert
+        for i in range(blocks):
+            chunk = samples[i * block:(i + 1) * block]
+            assert ring.write(chunk) == block
+            assert ring.read(out)
+            np.testing.assert_array_equal(out, chunk)
+        assert ring.available() == 0
+
+    def test_read_waits_for_a_full_block(self):
+        # Arrange
+        ring = RingBuffer(32, channels=1)
+        ring.write(np.ones((8, 1)))
+        out = np.zeros((16, 1), dtype=np.float32)
+
+        # Act & Assert
+        assert not ring.read(out)
+        assert ring.available() == 8
+
+    def test_write_drops_when_full(self):
+        # Arrange
+        ring = RingBuffer(16, channels=1)
+
+        # Act
+        written = ring.write(np.ones((24, 1)))
+
+        # Assert
+        assert written == 16
+        assert ring.dropped == 8
+        assert ring.available() == 16
+
+    def test_skip(self):
+        # Arrange
+        ring = RingBuffer(16, channels=1)
+        ring.write(np.arange(12, dtype=np.float32).reshape(-1, 1))
+        out = np.zeros((4, 1), dtype=np.float32)
+
+        # Act
+        skipped = ring.skip(8)
+        ring.read(out)
+
+        # Assert
+        assert skipped == 8
+        np.testing.assert_array_equal(out[:, 0], [8, 9, 10, 11])
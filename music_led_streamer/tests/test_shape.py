@@ -0,0 +1,110 @@
+import pytest
+import pygame
+
+from music_led_streamer.object.shape import Shape, shape_sprite, rotated_shape_sprite, quantize_angle, quantize_size
+
+SHAPE_TYPES = [
+    'circle', 'star', 'snowflake', 'polygon', 'diamond', 'spiral', 'heart', 'burst', 'wave',
+    'pentagon', 'hexagon', 'cross', 'flower', 'arrow', 'gear', 'cloud',
+]
+
+def make_shape(shape_type, size=20, color=(255, 0, 0)):
+    shape = Shape(50, 50, size, color, lifetime=3, treble=0, midrange=0, bass=0)
+    shape.shape_type = shape_type
+    shape.num_sides = 7 if shape_type == 'polygon' else 0
+    return shape
+
+class TestShape:
+
+    @pytest.mark.parametrize("shape_type", SHAPE_TYPES)
+    def test_draw_matches_direct_drawing(self, shape_type):
+        # Arrange
+        shape = make_shape(shape_type)
+        shape.alpha = 255
+        shape.angle = 0
+        screen = pygame.Surface((100, 100))
+        expected = pygame.Surface((100, 100))
+        direct = pygame.Surface((40, 40), pygame.SRCALPHA)
+        if shape_type == 'polygon':
+            Shape.draw_polygon(direct, 20, (255, 0, 0), 7)
+        else:
+            getattr(Shape, f"draw_{shape_type}")(direct, 20, (255, 0, 0))
+        expected.blit(direct, (30, 30))
+
+        # Act
+        shape.draw(screen)
+
+        # Assert
+        assert pygame.image.tobytes(screen, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+    def test_sprites_are_shared(self):
+        # Arrange
+        first, second = make_shape('star', size=20), make_shape('star', size=21)
+
+        # Act
+        first_sprite = shape_sprite(*first.sprite_key())
+        second_sprite = shape_sprite(*second.sprite_key())
+
+        # Assert
+        assert first_sprite is second_sprite
+
+    def test_alpha_is_applied_at_blit(self):
+        # Arrange
+        shape = make_shape('circle')
+        shape.alpha = 128
+        screen = pygame.Surface((100, 100))
+
+        # Act
+        shape.draw(screen)
+
+        # Assert
+        assert screen.get_at((50, 50))[0] == pytest.approx(128, abs=2)
+
+    def test_rotation_is_centered(self):
+        # Arrange
+        shape = make_shape('wave')
+        shape.alpha = 255
+        shape.angle = 45
+        sprite = rotated_shape_sprite('wave', 20, (255, 0, 0), 0, 48)
+        screen = pygame.Surface((100, 100))
+        expected = pygame.Surface((100, 100))
+        expected.blit(sprite, (50 - sprite.get_width() // 2, 50 - sprite.get_height() // 2))
+
+        # Act
+        shape.draw(screen)
+
+        # Assert
+        assert pygame.image.tobytes(screen, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+    def test_update_wraps_to_screen_size(self):
+        # Arrange
+        shape = make_shape('star')
+        shape.x, shape.dx = 95, 10
+
+        # Act
+        shape.update(0.1, (100, 100))
+
+        # Assert
+        assert shape.x == 5
+
+    @pytest.mark.parametrize(
+        "id, angle, expected",
+        [
+            ("happy_path_rounds_down", 44, 42),
+            ("happy_path_rounds_up", 46, 48),
+            ("edge_case_wraps", 359, 0),
+        ],
+    )
+    def test_quantize_angle(self, id, angle, expected):
+        # Act
+        result = quantize_angle(angle)
+
+        # Assert
+        assert result == expected
+
+    def test_quantize_size(self):
+        # Act
+        sizes = [quantize_size(size) for size in (0, 0.9, 3.2, 21)]
+
+        # Assert
+        assert sizes == [0, 0, 4, 20]
@@ -0,0 +1,108 @@
+import wave
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.source import FileSource, SyntheticSource, ThreadedSource, create_source, read_wav_header
+
+def write_wav(path, samples, samplerate=8000):
+    """Write int16 samples, shaped (frames, channels), to a WAV file."""
+    with wave.open(str(path), "wb") as file:
+        file.setnchannels(samples.shape[1])
+        file.setsampwidth(2)
+        file.setframerate(samplerate)
+        file.writeframes(samples.astype("<i2").tobytes())
+
+class TestThreadedSource:
+
+    def test_subclass_without_fill_block_fails_on_creation(self):
+        # Arrange
+        class IncompleteSource(ThreadedSource):
+            pass
+
+        # Act & Assert
+        with pytest.raises(TypeError):
+            IncompleteSource(8000, 1, 256)
+
+class TestFileSource:
+
+    def test_reads_wav_header(self, tmp_path):
+        # Arrange
+        path = tmp_path / "stereo.wav"
+        write_wav(path, np.zeros((100, 2)), samplerate=22050)
+
+        # Act
+        samplerate, channels, dtype, offset, frames = read_wav_header(str(path))
+
+        # Assert
+        assert (samplerate, channels, dtype, offset, frames) == (22050, 2, np.int16, 44, 100)
+
+    @pytest.mark.parametrize(
+        "id, loop, expected_blocks",
+        [
+            ("happy_path_loops", True, 5),
+            ("edge_case_stops_at_end", False, 3),
+        ],
+    )
+    def test_fill_block(self, id, loop, expected_blocks, tmp_path):
+        # Arrange
+        path = tmp_path / "ramp.wav"
+        ramp = np.arange(10, dtype=np.int16)[:, np.newaxis] * 1024
+        write_wav(path, ramp)
+        source = FileSource(str(path), 44100, 2, blocksize=4, realtime=False, loop=loop)
+        blocks = []
+
+        # Act
+        for _ in range(5):
+            if not source.fill_block(source.block):
+                break
+            source.position += source.blocksize
+            blocks.append(source.block[:, 0].copy())
+
+        # Assert
+        assert (source.samplerate, source.channels) == (8000, 1)
+        assert len(blocks) == expected_blocks
+        expected = ramp[:, 0] / 32768
+        np.testing.assert_allclose(blocks[2], [expected[8], expected[9], *([expected[0], expected[1]] if loop else [0, 0])])
+
+class TestSyntheticSource:
+
+    @pytest.mark.parametrize("id, signal", [("happy_path_sine", "sine"), ("happy_path_sweep", "sweep"),
+                                            ("happy_path_noise", "noise"), ("happy_path_kick", "kick")])
+    def test_fill_block(self, id, signal):
+        # Arrange
+        source = SyntheticSource(signal, 44100, 2, blocksize=512, realtime=False)
+
+        # Act
+        source.fill_block(source.block)
+
+        # Assert
+        assert np.abs(source.block).max() <= 0.5
+        assert np.abs(source.block).max() > 0
+
+    def test_sweep_is_continuous_between_blocks(self):
+        # Arrange
+        source = SyntheticSource("sweep", 44100, 1, blocksize=256, realtime=False)
+        samples = []
+
+        # Act
+        for _ in range(4):
+            source.fill_block(source.block)
+            source.position += source.blocksize
+            samples.append(source.block[:, 0].copy())
+
+        # Assert, a low sweep never jumps between neighboring samples
+        assert np.abs(np.diff(np.concatenate(samples))).max() < 0.01
+
+class TestCreateSource:
+
+    @pytest.mark.parametrize(
+        "id, spec",
+        [
+            ("error_unknown_kind", "microphone"),
+            ("error_unknown_signal", "synth:chirp"),
+        ],
+    )
+    def test_invalid_spec(self, id, spec):
+        # Act & Assert
+        with pytest.raises(ValueError):
+            create_source((44100, 2, 1, 1024, 0.1), spec)
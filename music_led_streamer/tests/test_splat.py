@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import pygame
+
+from music_led_streamer.render.splat import BLEND_ADD, BLEND_MAX, disk_stencil, splat_disks, splat_pixels
+
+class TestSplatDisks:
+
+    @pytest.mark.parametrize(
+        "id, radius, width",
+        [
+            ("happy_path_filled", 5, 0),
+            ("happy_path_ring", 20, 3),
+            ("edge_case_single_pixel", 1, 0),
+            ("edge_case_zero_radius", 0, 0),
+        ],
+    )
+    def test_matches_pygame_circle(self, id, radius, width):
+        # Arrange
+        centers = [(10, 10), (50, 30), (98, 70)]
+        colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+        expected = pygame.Surface((100, 80))
+        screen = pygame.Surface((100, 80))
+        for center, color in zip(centers, colors):
+            pygame.draw.circle(expected, color, center, radius, width)
+
+        # Act
+        x, y = np.array(centers).T
+        splat_disks(screen, x, y, [radius] * 3, colors, [width] * 3)
+
+        # Assert
+        assert pygame.image.tobytes(screen, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+    def test_stencil_is_cached(self):
+        # Act & Assert
+        assert disk_stencil(7) is disk_stencil(7)
+
+class TestSplatPixels:
+
+    @pytest.mark.parametrize(
+        "id, blend, depth, expected",
+        [
+            ("happy_path_replace", "replace", 32, (10, 200, 30)),
+            ("happy_path_max", BLEND_MAX, 32, (100, 200, 100)),
+            ("happy_path_add_saturates", BLEND_ADD, 32, (210, 255, 190)),
+            ("edge_case_24_bit_replace", "replace", 24, (10, 200, 30)),
+            ("edge_case_24_bit_max", BLEND_MAX, 24, (100, 200, 100)),
+            ("edge_case_24_bit_add", BLEND_ADD, 24, (210, 255, 190)),
+        ],
+    )
+    def test_blend(self, id, blend, depth, expected):
+        # Arrange
+        screen = pygame.Surface((4, 4), depth=depth)
+        screen.fill((100, 50, 100))
+        xs, ys = np.array([1, 1]), np.array([2, 2])
+        colors = np.array([(100, 150, 60), (10, 200, 30)], dtype=np.uint8)
+
+        # Act
+        splat_pixels(screen, xs, ys, colors, blend)
+
+        # Assert
+        assert tuple(screen.get_at((1, 2)))[:3] == expected
+        assert tuple(screen.get_at((0, 0)))[:3] == (100, 50, 100)
+
+    def test_skips_pixels_off_screen(self):
+        # Arrange
+        screen = pygame.Surface((4, 4))
+
+        # Act
+        splat_pixels(screen, np.array([-1, 4, 0]), np.array([0, 0, 5]), np.full((3, 3), 255, dtype=np.uint8))
+
+        # Assert
+        assert pygame.surfarray.array3d(screen).max() == 0
+
+    def test_unknown_blend(self):
+        # Act & Assert
+        with pytest.raises(ValueError):
+            splat_pixels(pygame.Surface((4, 4)), np.array([0]), np.array([0]), np.zeros((1, 3), dtype=np.uint8), "screen")
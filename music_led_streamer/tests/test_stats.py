@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+import pytest
+
+from music_led_streamer.audio.stats import AudioStats
+
+class TestAudioStats:
+
+    @pytest.mark.parametrize(
+        "id, status, expected",
+        [
+            ("happy_path_overflow", SimpleNamespace(input_overflow=True, input_underflow=False), (1, 0)),
+            ("happy_path_underflow", SimpleNamespace(input_overflow=False, input_underflow=True), (0, 1)),
+            ("edge_case_no_status", None, (0, 0)),
+        ],
+    )
+    def test_record_status(self, id, status, expected):
+        # Arrange
+        stats = AudioStats(44100, 1024)
+
+        # Act
+        stats.record_status(status)
+
+        # Assert
+        assert (stats.input_overflows, stats.input_underflows) == expected
+        assert stats.xruns() == sum(expected)
+
+    def test_record_arrival_measures_jitter(self):
+        # Arrange
+        stats = AudioStats(1000, 100)
+
+        # Act
+        stats.record_arrival(0.0, 100)
+        stats.record_arrival(0.1, 100)  # On time
+        stats.record_arrival(0.25, 100)  # 50 ms late
+
+        # Assert
+        assert stats.max_jitter == pytest.approx(0.05)
+        assert 0 < stats.jitter < stats.max_jitter
+
+    @pytest.mark.parametrize(
+        "id, drops, expected_events",
+        [
+            ("happy_path_one_drop", (512,), 1),
+            ("happy_path_several_drops", (512, 1024, 3), 3),
+            ("edge_case_nothing_dropped", (0, 0), 0),
+        ],
+    )
+    def test_record_drops_counts_events(self, id, drops, expected_events):
+        # Arrange
+        stats = AudioStats(44100, 1024)
+
+        # Act
+        for samples in drops:
+            stats.record_drops(samples)
+
+        # Assert
+        assert stats.dropped == sum(drops)
+        assert stats.drop_events == expected_events
+        assert stats.xruns() == expected_events
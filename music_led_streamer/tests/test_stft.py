@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from music_led_streamer.audio.stft import StftBuffer, get_window, REFERENCE_FFT_SIZE
+
+class TestStftBuffer:
+
+    @pytest.mark.parametrize(
+        "id, fft_size, hop_size, block_size, expected_offsets",
+        [
+            ("happy_path_hop_equals_block", 8, 8, 8, [[8], [8], [8]]),
+            ("happy_path_overlapping_hops", 8, 4, 8, [[4, 8], [4, 8], [4, 8]]),
+            ("edge_case_hop_spans_blocks", 8, 12, 8, [[], [4], [8]]),
+        ],
+    )
+    def test_push_yields_every_hop(self, id, fft_size, hop_size, block_size, expected_offsets):
+        # Arrange
+        stft = StftBuffer(fft_size, hop_size, channels=1)
+        samples = np.arange(block_size * 3, dtype=np.float32).reshape(-1, 1)
+
+        # Act & Assert
+        for i, expected in enumerate(expected_offsets):
+            block = samples[i * block_size:(i + 1) * block_size]
+            offsets = []
+            for offset in stft.push(block):
+                offsets.append(offset)
+                # The frame always ends with the newest sample pushed so far
+                newest = i * block_size + offset
+                np.testing.assert_array_equal(stft.samples[-min(newest, fft_size):, 0], samples[max(0, newest - fft_size):newest, 0])
+            assert offsets == expected
+
+class TestGetWindow:
+
+    @pytest.mark.parametrize("id, name", [("happy_path_hann", "hann"), ("happy_path_boxcar", "boxcar")])
+    @pytest.mark.parametrize("fft_size", [1024, 4096])
+    def test_sine_peak_is_independent_of_window_and_size(self, id, name, fft_size):
+        # Arrange
+        bin_index = fft_size // 16
+        sine = np.sin(2 * np.pi * bin_index * np.arange(fft_size) / fft_size)
+        # A unit sine peaks at half the FFT size without a window
+        reference = REFERENCE_FFT_SIZE / 2
+
+        # Act
+        peak = np.abs(np.fft.rfft(sine * get_window(name, fft_size))).max()
+
+        # Assert
+        assert peak == pytest.approx(reference)
+
+    def test_unknown_window(self):
+        # Act & Assert
+        with pytest.raises(ValueError):
+            get_window("triangle", 1024)
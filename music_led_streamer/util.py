@@ -46,12 +46,15 @@ screen = None
 SHOWS_PATH = Path(__file__).parent / "show"
 CONFIG_FILENAME = "MusicLEDStreamer.json"
 
+def get_config_path(config_file_location: str):
+    """Return the configuration file path, the packaged MusicLEDStreamer.json when none is given."""
+    if config_file_location is not None:
+        return config_file_location
+    return os.path.join(os.path.dirname(__file__), CONFIG_FILENAME)
+
 def load_config(config_file_location: str):
     """Load configuration from a JSON file if it exists."""
-    if config_file_location is not None:
-        config_path = config_file_location
-    else:
-        config_path = os.path.join(os.path.dirname(__file__), CONFIG_FILENAME)
+    config_path = get_config_path(config_file_location)
 
     print(f"Looking for configuration from: {config_path}")
     if os.path.exists(config_path):
@@ -59,6 +62,14 @@ def load_config(config_file_location: str):
             return json.load(file)  # Load JSON into dictionary
     return None
 
+def save_config(config_file_location: str, config: dict):
+    """Write the configuration to the JSON file load_config reads."""
+    config_path = get_config_path(config_file_location)
+    print(f"Saving configuration to: {config_path}")
+    with open(config_path, "w") as file:
+        json.dump(config, file, indent=2)
+        file.write("\n")
+
 def setup_display(display: str, video_driver: str, screen_width: int, screen_height: int):
     """
     Set up the display environment and initialize pygame.